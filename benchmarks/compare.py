@@ -0,0 +1,60 @@
+"""
+Compare two benchmarks.run result files and flag regressions.
+
+Every metric is "lower is better". A metric regresses when it grows by more
+than --threshold (relative) and by more than --min-delta (absolute, to ignore
+noise on sub-millisecond timings). Exits with 1 if anything regressed.
+
+    python -m benchmarks.compare base.json new.json --threshold 0.1
+"""
+
+import argparse
+import json
+import sys
+
+
+def compare(
+    base: dict[str, float], new: dict[str, float], threshold: float, min_delta: float
+) -> list[tuple[str, float, float, float, bool]]:
+    rows = []
+    for name in sorted(set(base) | set(new)):
+        if name not in base or name not in new:
+            continue
+        old, cur = base[name], new[name]
+        change = (cur - old) / old if old else 0.0
+        regressed = change > threshold and cur - old > min_delta
+        rows.append((name, old, cur, change, regressed))
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("base")
+    parser.add_argument("new")
+    parser.add_argument("--threshold", type=float, default=0.1)
+    parser.add_argument("--min-delta", type=float, default=1.0)
+    args = parser.parse_args()
+
+    with open(args.base, encoding="utf-8") as f:
+        base = json.load(f)
+    with open(args.new, encoding="utf-8") as f:
+        new = json.load(f)
+
+    rows = compare(base["metrics"], new["metrics"], args.threshold, args.min_delta)
+    print(f"{base['meta']['revision']} -> {new['meta']['revision']}")
+    print(f"{'metric':<40} {'base':>10} {'new':>10} {'change':>8}")
+    for name, old, cur, change, regressed in rows:
+        flag = "  REGRESSION" if regressed else ""
+        print(f"{name:<40} {old:>10.2f} {cur:>10.2f} {change:>+8.1%}{flag}")
+
+    only = sorted(set(base["metrics"]) ^ set(new["metrics"]))
+    if only:
+        print(f"not in both runs: {', '.join(only)}")
+
+    regressions = [row for row in rows if row[4]]
+    print(f"{len(regressions)} regression(s)")
+    sys.exit(1 if regressions else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""
+How many concurrent interviews can one worker sustain on a single event loop?
+
+Every agent runs on the offline "fake" backend, which sleeps for a fixed
+"network" latency and answers with schema-valid JSON, so the numbers reflect
+orchestration overhead, not the provider.
+
+    python -m benchmarks.concurrency --sessions 1 10 50 100 200 --turns 5
+"""
+
+import argparse
+import asyncio
+import time
+
+from langchain_core.messages import HumanMessage
+
+from benchmarks.common import percentiles
+from src.llm.registry import use_backend
+from src.state import initial_state, stage_for_turn
+
+
+async def run_session(graph_app, turns: int, latencies: list[float]):
+    state = initial_state()
+    for turn in range(1, turns + 1):
+        state["messages"] = state["messages"] + [
+            HumanMessage(content=f"Ответ кандидата номер {turn}")
+        ]
+        state["turn_count"] = turn
+        state["interview_stage"] = stage_for_turn(turn)
+        started = time.perf_counter()
+        state = await graph_app.ainvoke(state)
+        latencies.append(time.perf_counter() - started)
+
+
+async def run_level(graph_app, sessions: int, turns: int) -> dict[str, float]:
+    latencies: list[float] = []
+    started = time.perf_counter()
+    await asyncio.gather(
+        *(run_session(graph_app, turns, latencies) for _ in range(sessions))
+    )
+    elapsed = time.perf_counter() - started
+    return {
+        "sessions": sessions,
+        "turns_per_sec": len(latencies) / elapsed,
+        **percentiles(latencies),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sessions", type=int, nargs="+", default=[1, 10, 50, 100])
+    parser.add_argument("--turns", type=int, default=5)
+    parser.add_argument("--latency", type=float, default=0.2, help="fake LLM seconds")
+    parser.add_argument(
+        "--slo",
+        type=float,
+        default=1.5,
+        help="a level is sustained while p95 <= slo * single-session p95",
+    )
+    args = parser.parse_args()
+
+    use_backend("fake", latency=args.latency)
+    from src.graph import app as graph_app
+
+    baseline = None
+    sustained = 0
+    print(f"{'sessions':>8} {'turns/s':>9} {'p50 ms':>8} {'p95 ms':>8}")
+    for level in args.sessions:
+        row = asyncio.run(run_level(graph_app, level, args.turns))
+        baseline = baseline or row["p95_ms"]
+        if row["p95_ms"] <= args.slo * baseline:
+            sustained = level
+        print(
+            f"{row['sessions']:>8} {row['turns_per_sec']:>9.1f} "
+            f"{row['p50_ms']:>8.0f} {row['p95_ms']:>8.0f}"
+        )
+    print(f"sustained sessions per worker (p95 <= {args.slo}x baseline): {sustained}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+"""
+How far do stalls and errors of the LLM backend stretch the turn latency tail?
+
+Concurrent sessions play turns through the graph on the offline "fake"
+model, with a share of calls failing (--error-rate) or stalling for
+--stall-seconds (--stall-rate). "unguarded" lets every call run to the
+end, as the agents used to; "guarded" applies the per-agent latency budget
+(--timeout), hedging after the p95 and the circuit breaker
+(src/llm/resilience.py). Fallbacks are agent results replaced after an
+error.
+
+    python -m benchmarks.faults --sessions 20 --turns 5 --stall-rate 0.03
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import time
+
+from langchain_core.messages import HumanMessage
+
+from benchmarks.common import percentiles
+from benchmarks.topology import ANSWERS
+from src.llm.registry import use_backend
+from src.llm.resilience import reset_resilience, resilience_stats
+from src.state import initial_state, stage_for_turn
+
+
+async def run_session(graph_app, index: int, turns: int, results: dict):
+    state = initial_state()
+    for turn in range(1, turns + 1):
+        answer = ANSWERS[(index + turn) % len(ANSWERS)]
+        state["messages"] = state["messages"] + [HumanMessage(content=answer)]
+        state["turn_count"] = turn
+        state["interview_stage"] = stage_for_turn(turn)
+        state["node_metrics"] = {}  # this turn's nodes only
+        started = time.perf_counter()
+        state = await graph_app.ainvoke(state)
+        results["turns"].append(time.perf_counter() - started)
+        for metrics in (state.get("node_metrics") or {}).values():
+            results["fallbacks"] += metrics.get("fallbacks", 0)
+            results["hedges"] += metrics.get("hedges", 0)
+
+
+async def run_mode(graph_app, mode: str, args) -> dict[str, float]:
+    guarded = mode == "guarded"
+    os.environ["LLM_TIMEOUT"] = str(args.timeout if guarded else 0)
+    os.environ["LLM_HEDGE_RATIO"] = str(args.hedge_ratio if guarded else 0)
+    os.environ["LLM_BREAKER_FAILURES"] = "5" if guarded else "1000000"
+    reset_resilience()
+
+    results = {"turns": [], "fallbacks": 0, "hedges": 0}
+    await asyncio.gather(
+        *(run_session(graph_app, i, args.turns, results) for i in range(args.sessions))
+    )
+    breaker = resilience_stats()["breakers"].get("fake", {})
+    return {
+        "mode": mode,
+        **percentiles(results["turns"]),
+        "max_ms": max(results["turns"]) * 1000,
+        "fallbacks": results["fallbacks"],
+        "hedges": results["hedges"],
+        "trips": breaker.get("trips", 0),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sessions", type=int, default=20)
+    parser.add_argument("--turns", type=int, default=5)
+    parser.add_argument("--latency", type=float, default=0.2, help="fake LLM seconds")
+    parser.add_argument("--jitter", type=float, default=0.1)
+    parser.add_argument("--error-rate", type=float, default=0.02)
+    parser.add_argument("--stall-rate", type=float, default=0.03)
+    parser.add_argument("--stall-seconds", type=float, default=10.0)
+    parser.add_argument("--timeout", type=float, default=2.0, help="guarded budget")
+    parser.add_argument("--hedge-ratio", type=float, default=0.1)
+    args = parser.parse_args()
+
+    # The agents log every fallback; there will be many.
+    logging.getLogger("src.metrics").setLevel(logging.ERROR)
+    os.environ["LLM_CACHE"] = "off"
+    use_backend(
+        "fake",
+        latency=args.latency,
+        jitter=args.jitter,
+        error_rate=args.error_rate,
+        stall_rate=args.stall_rate,
+        stall_seconds=args.stall_seconds,
+    )
+    from src.graph import app as graph_app
+
+    print(
+        f"{'mode':>9} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'max ms':>8} "
+        f"{'fallbacks':>9} {'hedges':>7} {'trips':>6}"
+    )
+    for mode in ("unguarded", "guarded"):
+        row = asyncio.run(run_mode(graph_app, mode, args))
+        print(
+            f"{row['mode']:>9} {row['p50_ms']:>8.0f} {row['p95_ms']:>8.0f} "
+            f"{row['p99_ms']:>8.0f} {row['max_ms']:>8.0f} {row['fallbacks']:>9} "
+            f"{row['hedges']:>7} {row['trips']:>6}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,184 @@
+"""
+Load test of the interview API server (src/server.py) on the offline fake model.
+
+Starts the server in-process on a free port, or targets --url (a server
+started with LLM_BACKEND=fake), and runs each level's candidates at once:
+every candidate starts a session, plays --turns turns through the streaming
+turn endpoint and asks for the final report. "reply" is the time to the
+first token or reply event of a turn, "turn" the whole streamed response.
+
+With --workers the in-process server runs sessions in a WorkerPool of each
+size given (0: in the server process).
+
+    python -m benchmarks.load_test --sessions 1 10 50 --turns 4
+    python -m benchmarks.load_test --sessions 32 --workers 1 2 4 8 --latency 0
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import tempfile
+import time
+
+from tornado.httpclient import AsyncHTTPClient, HTTPClientError
+from tornado.httpserver import HTTPServer
+from tornado.testing import bind_unused_port
+
+from benchmarks.common import percentiles
+from benchmarks.topology import ANSWERS
+from src.logger import get_log_writer
+
+FIRST_EVENTS = (b'"event": "token"', b'"event": "reply"')
+
+
+async def candidate(
+    client: AsyncHTTPClient, base: str, index: int, turns: int, results: dict
+):
+    try:
+        response = await client.fetch(f"{base}/sessions", method="POST", body="{}")
+        session_id = json.loads(response.body)["session_id"]
+        for turn in range(turns):
+            body = json.dumps({"message": ANSWERS[(index + turn) % len(ANSWERS)]})
+            started = time.perf_counter()
+            first = None
+            chunks: list[bytes] = []
+
+            def on_chunk(chunk: bytes):
+                nonlocal first
+                chunks.append(chunk)
+                if first is None and any(e in chunk for e in FIRST_EVENTS):
+                    first = time.perf_counter() - started
+
+            await client.fetch(
+                f"{base}/sessions/{session_id}/turns",
+                method="POST",
+                body=body,
+                streaming_callback=on_chunk,
+                request_timeout=300,
+            )
+            total = time.perf_counter() - started
+            last = json.loads(b"".join(chunks).strip().splitlines()[-1])
+            if last.get("event") != "reply":
+                results["errors"] += 1
+                continue
+            results["reply"].append(first if first is not None else total)
+            results["turn"].append(total)
+
+        started = time.perf_counter()
+        await client.fetch(
+            f"{base}/sessions/{session_id}/finish",
+            method="POST",
+            body="{}",
+            request_timeout=300,
+        )
+        results["finish"].append(time.perf_counter() - started)
+    except (HTTPClientError, OSError, ValueError):
+        results["errors"] += 1
+
+
+async def run_level(
+    client, base: str, sessions: int, turns: int, workers: int
+) -> dict[str, float]:
+    results = {"reply": [], "turn": [], "finish": [], "errors": 0}
+    started = time.perf_counter()
+    await asyncio.gather(
+        *(candidate(client, base, i, turns, results) for i in range(sessions))
+    )
+    elapsed = time.perf_counter() - started
+    return {
+        "workers": workers,
+        "sessions": sessions,
+        "turns_per_sec": len(results["turn"]) / elapsed,
+        **{f"reply.{k}": v for k, v in percentiles(results["reply"]).items()},
+        **{f"turn.{k}": v for k, v in percentiles(results["turn"]).items()},
+        **{f"finish.{k}": v for k, v in percentiles(results["finish"]).items()},
+        "errors": results["errors"],
+    }
+
+
+async def run_server(args, workers: int) -> list[dict[str, float]]:
+    from src.server import make_app
+    from src.service import InterviewService
+    from src.session_store import get_session_store
+    from src.workers import WorkerPool
+
+    if workers:
+        service = WorkerPool(workers, store=args.store, log_dir=args.log_dir)
+        await service.start_workers()
+    else:
+        service = InterviewService(
+            store=get_session_store(args.store), log_dir=args.log_dir
+        )
+    sock, port = bind_unused_port()
+    server = HTTPServer(make_app(service))
+    server.add_sockets([sock])
+    try:
+        return await run_levels(args, f"http://127.0.0.1:{port}", workers)
+    finally:
+        server.stop()
+        if workers:
+            await service.close()
+
+
+async def run_levels(args, base: str, workers: int) -> list[dict[str, float]]:
+    AsyncHTTPClient.configure(None, max_clients=max(args.sessions))
+    client = AsyncHTTPClient()
+    rows = [
+        await run_level(client, base.rstrip("/"), level, args.turns, workers)
+        for level in args.sessions
+    ]
+    client.close()
+    return rows
+
+
+async def run(args) -> list[dict[str, float]]:
+    if args.url is not None:
+        rows = await run_levels(args, args.url, workers=0)
+    else:
+        rows = []
+        for workers in args.workers:
+            rows += await run_server(args, workers)
+    writer = get_log_writer()
+    if writer is not None:
+        writer.flush()
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sessions", type=int, nargs="+", default=[1, 10, 50])
+    parser.add_argument("--turns", type=int, default=4)
+    parser.add_argument("--url", default=None, help="server to test instead")
+    parser.add_argument("--store", default="checkpoint", help="checkpoint | memory")
+    parser.add_argument("--latency", type=float, default=0.2, help="fake LLM seconds")
+    parser.add_argument("--workers", type=int, nargs="+", default=[0])
+    args = parser.parse_args()
+
+    tmp = tempfile.TemporaryDirectory()
+    args.log_dir = os.path.join(tmp.name, "logs")
+    if args.url is None:
+        # Set through the environment so that worker processes see it too.
+        os.environ["LLM_CACHE"] = "off"
+        os.environ["LLM_BACKEND"] = "fake"
+        os.environ["LLM_FAKE_LATENCY"] = str(args.latency)
+        os.environ.setdefault(
+            "CHECKPOINT_PATH", os.path.join(tmp.name, "checkpoints.sqlite")
+        )
+
+    rows = asyncio.run(run(args))
+    print(
+        f"{'workers':>7} {'sessions':>8} {'turns/s':>8} {'reply_p50':>10} "
+        f"{'reply_p95':>10} {'turn_p95':>9} {'finish_p95':>11} {'errors':>7}"
+    )
+    for r in rows:
+        print(
+            f"{r['workers']:>7} {r['sessions']:>8} {r['turns_per_sec']:>8.1f} "
+            f"{r['reply.p50_ms']:>10.0f} {r['reply.p95_ms']:>10.0f} "
+            f"{r['turn.p95_ms']:>9.0f} {r['finish.p95_ms']:>11.0f} {r['errors']:>7}"
+        )
+    tmp.cleanup()
+
+
+if __name__ == "__main__":
+    main()
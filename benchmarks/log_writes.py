@@ -0,0 +1,82 @@
+"""
+Bytes written by SessionLogger as a session grows: rewriting the whole JSON
+document after every event (the pre-event-log behaviour) against the
+append-only event log plus one compaction at the end.
+
+Write amplification is bytes written divided by the size of the final
+interview_log.json.
+
+    python -m benchmarks.log_writes --turns 10 50 200
+"""
+
+import argparse
+import os
+import tempfile
+import time
+
+from benchmarks.run import ANSWER, QUESTION
+from src.logger import InterviewSession, SessionLogger, TurnLog
+
+THOUGHTS = "мысли агентов " * 20
+
+
+def rewrite_every_event(path: str, turns: int) -> tuple[int, float]:
+    """Re-serialize the whole session on each event, as save_log used to."""
+    session = InterviewSession(participant_name="Candidate")
+    written = 0
+    started = time.perf_counter()
+    for turn in range(1, turns + 1):
+        session.turns.append(
+            TurnLog(
+                turn_id=turn,
+                agent_visible_message=QUESTION,
+                user_message=ANSWER,
+                internal_thoughts=THOUGHTS,
+            )
+        )
+        payload = session.model_dump_json(indent=2, exclude_none=True)
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(payload)
+        written += len(payload.encode("utf-8"))
+    return written, time.perf_counter() - started
+
+
+def append_only(path: str, turns: int, fsync: str) -> tuple[int, float]:
+    logger = SessionLogger(path, fsync=fsync)
+    started = time.perf_counter()
+    for turn in range(1, turns + 1):
+        logger.log_turn(turn, QUESTION, ANSWER, THOUGHTS)
+    logger.save_log()
+    logger.close()
+    return logger.bytes_written, time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--turns", type=int, nargs="+", default=[10, 50, 200])
+    parser.add_argument(
+        "--fsync", choices=["never", "batch", "always"], default="batch"
+    )
+    args = parser.parse_args()
+
+    print(
+        f"{'turns':>6} {'final_kb':>9} {'rewrite_kb':>11} {'amp':>6} "
+        f"{'append_kb':>10} {'amp':>6} {'rewrite_ms':>11} {'append_ms':>10}"
+    )
+    with tempfile.TemporaryDirectory() as tmp:
+        for turns in args.turns:
+            legacy_path = os.path.join(tmp, f"legacy_{turns}.json")
+            legacy_bytes, legacy_s = rewrite_every_event(legacy_path, turns)
+            path = os.path.join(tmp, f"events_{turns}.json")
+            append_bytes, append_s = append_only(path, turns, args.fsync)
+            final = os.path.getsize(path)
+            print(
+                f"{turns:>6} {final / 1024:>9.1f} {legacy_bytes / 1024:>11.1f} "
+                f"{legacy_bytes / final:>6.1f} {append_bytes / 1024:>10.1f} "
+                f"{append_bytes / final:>6.1f} {legacy_s * 1000:>11.1f} "
+                f"{append_s * 1000:>10.1f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""
+User-perceived turn latency of the split, fused and pipelined graphs.
+
+"reply" is the time until the interviewer's message is available to the
+candidate: its first streamed token or, for a committed draft, the
+interviewer node's update. "turn" is the whole graph, including work that
+only prepares the next turn. "preempted" is the share of pipelined turns
+whose draft was replaced by a hallucination correction; the fake backend
+flags hallucinations far more often than a real model would.
+
+    python -m benchmarks.pipeline --sessions 3 --turns 6
+"""
+
+import argparse
+import os
+import time
+
+from langchain_core.messages import HumanMessage
+
+from benchmarks.common import percentiles
+from benchmarks.topology import ANSWERS
+from src.llm.registry import use_backend
+from src.state import initial_state, stage_for_turn
+
+
+def run(topology: str, sessions: int, turns: int) -> dict[str, float]:
+    from src.graph import STREAM_MODES, _turn_event, build_graph
+
+    graph = build_graph(topology)
+    reply, total, preempted = [], [], 0
+    for session in range(sessions):
+        state = initial_state()
+        for turn in range(1, turns + 1):
+            answer = ANSWERS[(session + turn - 1) % len(ANSWERS)]
+            state["messages"] = state["messages"] + [HumanMessage(content=answer)]
+            state["turn_count"] = turn
+            state["interview_stage"] = stage_for_turn(turn)
+
+            started = time.perf_counter()
+            first = None
+            for mode, payload in graph.stream(state, stream_mode=STREAM_MODES):
+                for kind, value in _turn_event(mode, payload):
+                    if kind == "values":
+                        state = value
+                    elif first is None and (kind == "token" or value == "interviewer"):
+                        first = time.perf_counter() - started
+            total.append(time.perf_counter() - started)
+            reply.append(first if first is not None else total[-1])
+            preempted += bool(state.get("reply_preempted"))
+
+    return {
+        **{f"reply.{k}": v for k, v in percentiles(reply).items()},
+        **{f"turn.{k}": v for k, v in percentiles(total).items()},
+        "preempted": preempted / len(total),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sessions", type=int, default=3)
+    parser.add_argument("--turns", type=int, default=6)
+    parser.add_argument(
+        "--topologies", nargs="+", default=["split", "fused", "pipelined"]
+    )
+    parser.add_argument("--latency", type=float, default=0.2, help="fake LLM seconds")
+    parser.add_argument(
+        "--prompt-latency", type=float, default=0.02, help="seconds per 1k chars"
+    )
+    args = parser.parse_args()
+
+    os.environ["LLM_CACHE"] = "off"
+    use_backend("fake", latency=args.latency, prompt_latency=args.prompt_latency)
+
+    print(
+        f"{'topology':<10} {'reply_p50':>10} {'reply_p95':>10} "
+        f"{'turn_p50':>9} {'preempted':>10}"
+    )
+    for topology in args.topologies:
+        r = run(topology, args.sessions, args.turns)
+        print(
+            f"{topology:<10} {r['reply.p50_ms']:>10.1f} {r['reply.p95_ms']:>10.1f} "
+            f"{r['turn.p50_ms']:>9.1f} {r['preempted']:>10.0%}"
+        )
+
+
+if __name__ == "__main__":
+    main()
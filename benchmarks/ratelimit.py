@@ -0,0 +1,122 @@
+"""
+Do live interviews keep their latency when feedback reports burst under a rate limit?
+
+Live sessions play turns through the graph while a burst of final reports
+is generated at the same time, all on the offline "fake" model behind one
+RateLimiter. "priority" is the limiter as configured (interviewer first,
+feedback last); "fifo" runs every call in one class, served in arrival
+order. The queue-wait columns are the limiter's average wait per call.
+
+    python -m benchmarks.ratelimit --sessions 10 --reports 20 --rpm 1200
+"""
+
+import argparse
+import asyncio
+import time
+
+from langchain_core.messages import AIMessage, HumanMessage
+
+from benchmarks.common import percentiles
+from benchmarks.topology import ANSWERS
+from src.llm.ratelimit import (
+    PRIORITIES,
+    RateLimiter,
+    TokenBucket,
+    priority,
+    set_rate_limiter,
+)
+from src.llm.registry import use_backend
+from src.state import initial_state, stage_for_turn
+
+
+async def live_session(graph_app, index: int, turns: int, latencies: list[float]):
+    state = initial_state()
+    for turn in range(1, turns + 1):
+        answer = ANSWERS[(index + turn) % len(ANSWERS)]
+        state["messages"] = state["messages"] + [HumanMessage(content=answer)]
+        state["turn_count"] = turn
+        state["interview_stage"] = stage_for_turn(turn)
+        started = time.perf_counter()
+        state = await graph_app.ainvoke(state)
+        latencies.append(time.perf_counter() - started)
+
+
+async def report(feedback, index: int, latencies: list[float]):
+    state = initial_state()
+    state["messages"] = state["messages"] + [
+        m
+        for answer in ANSWERS
+        for m in (AIMessage("Расскажите подробнее."), HumanMessage(answer))
+    ]
+    started = time.perf_counter()
+    await feedback.agenerate(state)
+    latencies.append(time.perf_counter() - started)
+
+
+async def run_mode(graph_app, feedback, limiter, mode: str, args) -> dict[str, float]:
+    limiter.reset()
+    turns: list[float] = []
+    reports: list[float] = []
+
+    async def everything():
+        await asyncio.gather(
+            *(report(feedback, i, reports) for i in range(args.reports)),
+            *(
+                live_session(graph_app, i, args.turns, turns)
+                for i in range(args.sessions)
+            ),
+        )
+
+    started = time.perf_counter()
+    if mode == "fifo":
+        with priority("analysis"):
+            await everything()
+    else:
+        await everything()
+    elapsed = time.perf_counter() - started
+    stats = limiter.stats()
+    return {
+        "mode": mode,
+        "elapsed_s": elapsed,
+        **{f"turn.{k}": v for k, v in percentiles(turns).items()},
+        **{f"report.{k}": v for k, v in percentiles(reports).items()},
+        **{f"wait.{name}": stats[name]["avg_wait_ms"] for name in PRIORITIES},
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sessions", type=int, default=10)
+    parser.add_argument("--turns", type=int, default=3)
+    parser.add_argument("--reports", type=int, default=20)
+    parser.add_argument("--rpm", type=float, default=1200)
+    parser.add_argument("--tpm", type=float, default=None)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--latency", type=float, default=0.2, help="fake LLM seconds")
+    args = parser.parse_args()
+
+    use_backend("fake", latency=args.latency)
+    limiter = RateLimiter(
+        TokenBucket(args.rpm, args.tpm), max_concurrency=args.concurrency
+    )
+    set_rate_limiter(limiter)
+    from src.agents.feedback import FeedbackGenerator
+    from src.graph import app as graph_app
+
+    feedback = FeedbackGenerator()
+    print(
+        f"{'mode':>8} {'turn_p50':>9} {'turn_p95':>9} {'report_p95':>11} "
+        f"{'wait_int':>9} {'wait_ana':>9} {'wait_bg':>8} {'total_s':>8}"
+    )
+    for mode in ("fifo", "priority"):
+        row = asyncio.run(run_mode(graph_app, feedback, limiter, mode, args))
+        print(
+            f"{row['mode']:>8} {row['turn.p50_ms']:>9.0f} {row['turn.p95_ms']:>9.0f} "
+            f"{row['report.p95_ms']:>11.0f} {row['wait.interactive']:>9.0f} "
+            f"{row['wait.analysis']:>9.0f} {row['wait.background']:>8.0f} "
+            f"{row['elapsed_s']:>8.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
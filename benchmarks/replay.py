@@ -0,0 +1,78 @@
+"""
+Re-run a recorded interview through the current graph from its cassette.
+
+Sessions are recorded by starting the app with LLM_CASSETTE_DIR set. The
+replay feeds the candidate's messages back turn by turn, while every agent
+gets its recorded reply. The run takes milliseconds with --latency zero. A
+non-zero exit code means the pipeline asked for calls that were never
+recorded. "drift" counts calls whose prompt differs from the recording.
+
+    python -m benchmarks.replay cassettes/<session_id>.json --latency zero
+"""
+
+import argparse
+import os
+import sys
+import time
+
+from langchain_core.messages import HumanMessage
+
+from src.llm.cassette import Cassette
+from src.llm.registry import use_backend
+from src.profile_parser import update_profile_from_message
+from src.state import initial_state, stage_for_turn
+
+
+def replay(path: str, latency: str) -> Cassette:
+    # Replayed calls never reach the backend; the fake one just keeps the
+    # run offline if something slips past the cassette.
+    use_backend("fake")
+    from src.agents.feedback import FeedbackGenerator
+    from src.graph import app as graph_app
+
+    directory, filename = os.path.split(path)
+    session_id = filename.removesuffix(".json")
+    cassette = Cassette(session_id, directory=directory, mode="replay", latency=latency)
+
+    state = initial_state()
+    total_started = time.perf_counter()
+    print(f"{'turn':>4} {'ms':>8}")
+    for turn in sorted(cassette.inputs, key=int):
+        turn_id = int(turn)
+        message = cassette.inputs[turn]
+        state["messages"] = state["messages"] + [HumanMessage(content=message)]
+        state["turn_count"] = turn_id
+        state["interview_stage"] = stage_for_turn(turn_id)
+        if turn_id <= 2:
+            state["candidate_profile"] = update_profile_from_message(
+                state.get("candidate_profile", {}), message
+            )
+
+        started = time.perf_counter()
+        with cassette.turn(turn_id):
+            state = graph_app.invoke(state)
+        print(f"{turn_id:>4} {(time.perf_counter() - started) * 1000:>8.1f}")
+
+    if any(key.startswith("feedback/") for key in cassette.data["calls"]):
+        started = time.perf_counter()
+        with cassette.turn("feedback"):
+            FeedbackGenerator().generate(state)
+        print(f"{'fb':>4} {(time.perf_counter() - started) * 1000:>8.1f}")
+
+    print(f"total {(time.perf_counter() - total_started) * 1000:.1f} ms")
+    print(cassette.stats())
+    return cassette
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("cassette", help="path to <session_id>.json")
+    parser.add_argument("--latency", choices=["original", "zero"], default="zero")
+    args = parser.parse_args()
+
+    cassette = replay(args.cassette, args.latency)
+    sys.exit(1 if cassette.misses else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+"""
+Does adaptive model routing hold the turn latency when a model slows down?
+
+Concurrent sessions play turns through the graph on the offline "fake"
+backend, where each model tier has its own latency. In the middle phase
+the default model (--slow-model) becomes --slow-factor times slower, then
+recovers. "static" keeps every agent on its routed model; "adaptive" moves
+agents over their SLO (--slo, in seconds) to the next faster tier and back
+(src/llm/routing.py). "on base" is the share of calls served by the model
+the routing table asked for.
+
+    python -m benchmarks.routing --sessions 10 --turns-per-phase 5
+"""
+
+import argparse
+import asyncio
+import os
+import time
+
+from langchain_core.messages import HumanMessage
+
+from benchmarks.common import percentiles
+from benchmarks.topology import ANSWERS
+from src.llm.fake import FakeChatModel
+from src.llm.registry import use_backend
+from src.llm.routing import DEFAULT_SLOS, DEFAULT_TIERS, Router, set_router
+from src.state import initial_state, stage_for_turn
+
+PHASES = ("normal", "slow", "recovered")
+
+
+def fake_models(model) -> list[FakeChatModel]:
+    """The fake backend models below an agent's wrappers."""
+    if isinstance(model, FakeChatModel):
+        return [model]
+    found = []
+    inners = [getattr(model, "inner", None), *getattr(model, "models", {}).values()]
+    for inner in inners:
+        if inner is not None:
+            found += fake_models(inner)
+    return found
+
+
+async def run_session(graph_app, session: dict, turns: int, phase: dict):
+    state = session["state"]
+    for _ in range(turns):
+        turn = state["turn_count"] + 1
+        answer = ANSWERS[(session["index"] + turn) % len(ANSWERS)]
+        state["messages"] = state["messages"] + [HumanMessage(content=answer)]
+        state["turn_count"] = turn
+        state["interview_stage"] = stage_for_turn(turn)
+        state["node_metrics"] = {}  # this turn's nodes only
+        started = time.perf_counter()
+        state = await graph_app.ainvoke(state)
+        phase["turns"].append(time.perf_counter() - started)
+        for metrics in state["node_metrics"].values():
+            routes = metrics.get("routes", [])
+            phase["calls"] += len(routes)
+            phase["on_base"] += sum(1 for route in routes if "(" not in route)
+    session["state"] = state
+
+
+async def run_mode(graph_app, agents, mode: str, args) -> list[dict]:
+    router = Router(
+        slos=dict.fromkeys(DEFAULT_SLOS, args.slo), adaptive=mode == "adaptive"
+    )
+    for agent in agents:
+        agent.llm.inner.router = router
+    sessions = [{"index": i, "state": initial_state()} for i in range(args.sessions)]
+    models = [m for agent in agents for m in fake_models(agent.llm)]
+
+    rows = []
+    for name in PHASES:
+        factor = args.slow_factor if name == "slow" else 1.0
+        for model in models:
+            if model.model == args.slow_model:
+                model.latency = args.latency * factor
+        phase = {"turns": [], "calls": 0, "on_base": 0}
+        await asyncio.gather(
+            *(run_session(graph_app, s, args.turns_per_phase, phase) for s in sessions)
+        )
+        rows.append(
+            {
+                "mode": mode,
+                "phase": name,
+                **percentiles(phase["turns"]),
+                "on_base": phase["on_base"] / max(phase["calls"], 1),
+                "downgrades": router.downgrades,
+                "recoveries": router.recoveries,
+            }
+        )
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sessions", type=int, default=10)
+    parser.add_argument("--turns-per-phase", type=int, default=5)
+    parser.add_argument("--latency", type=float, default=0.3, help="default model")
+    parser.add_argument("--slow-model", default="codestral-latest")
+    parser.add_argument("--slow-factor", type=float, default=5.0)
+    parser.add_argument("--slo", type=float, default=1.0)
+    args = parser.parse_args()
+
+    # Tiers from slow to fast; the default model in the middle.
+    os.environ["LLM_CACHE"] = "off"
+    latencies = dict(zip(DEFAULT_TIERS, (args.latency * 3, args.latency, 0.1)))
+    use_backend("fake", model_latency=latencies)
+    set_router(Router(adaptive=True))  # build every tier's model
+    from src.graph import app as graph_app
+    from src.graph import behav_agent, interviewer_agent, strategy_agent, tech_agent
+
+    agents = [tech_agent, behav_agent, strategy_agent, interviewer_agent]
+    print(
+        f"{'mode':>8} {'phase':>9} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} "
+        f"{'on base':>8} {'down':>5} {'up':>4}"
+    )
+    for mode in ("static", "adaptive"):
+        for row in asyncio.run(run_mode(graph_app, agents, mode, args)):
+            print(
+                f"{row['mode']:>8} {row['phase']:>9} {row['p50_ms']:>8.0f} "
+                f"{row['p95_ms']:>8.0f} {row['p99_ms']:>8.0f} {row['on_base']:>8.0%} "
+                f"{row['downgrades']:>5} {row['recoveries']:>4}"
+            )
+
+
+if __name__ == "__main__":
+    main()
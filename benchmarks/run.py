@@ -0,0 +1,385 @@
+"""
+Benchmark suite for the interview pipeline, driven by the offline fake model.
+
+Measures end-to-end turn latency, per-node latency, FeedbackGenerator cost
+against transcript length, prompt history size per agent, SessionLogger
+cost against turn count, message storage, checkpoint storage and memory
+per session. The results are written as flat JSON metrics that
+benchmarks.compare can diff across commits.
+
+    python -m benchmarks.run --out benchmarks/results/$(git rev-parse --short HEAD).json
+"""
+
+import argparse
+import json
+import os
+import tempfile
+import time
+import tracemalloc
+import uuid
+from datetime import datetime, timezone
+from typing import Any
+
+from langchain_core.messages import AIMessage, HumanMessage
+
+from benchmarks.common import git_revision, peak_rss_mb, percentiles
+from src.llm.registry import use_backend
+from src.state import initial_state, stage_for_turn
+
+ANSWER = (
+    "Генератор — это функция с yield, которая лениво отдаёт значения и хранит "
+    "своё состояние между вызовами next(). Это экономит память на больших "
+    "последовательностях, например при чтении файла построчно. "
+)
+QUESTION = "Хорошо. А чем генератор отличается от итератора и где вы их применяли?"
+
+
+def transcript(turns: int) -> list:
+    messages = []
+    for turn in range(turns):
+        messages.append(HumanMessage(content=f"{ANSWER} (ход {turn + 1})"))
+        messages.append(AIMessage(content=QUESTION))
+    return messages
+
+
+def run_session(graph_app, turns: int) -> tuple[list[float], list[dict], Any]:
+    state = initial_state()
+    latencies, node_timings = [], []
+    for turn in range(1, turns + 1):
+        state["messages"] = state["messages"] + [
+            HumanMessage(content=f"{ANSWER} (ход {turn})")
+        ]
+        state["turn_count"] = turn
+        state["interview_stage"] = stage_for_turn(turn)
+        started = time.perf_counter()
+        state = graph_app.invoke(state)
+        latencies.append(time.perf_counter() - started)
+        node_timings.append(state["node_metrics"])
+    return latencies, node_timings, state
+
+
+def bench_turns(graph_app, sessions: int, turns: int) -> dict[str, float]:
+    latencies, node_timings = [], []
+    for _ in range(sessions):
+        session_latencies, session_nodes, _ = run_session(graph_app, turns)
+        latencies += session_latencies
+        node_timings += session_nodes
+
+    metrics = {f"turn.{k}": v for k, v in percentiles(latencies).items()}
+    for node in ("technical", "behavioral", "strategy", "interviewer"):
+        values = [t[node]["wall_ms"] / 1000 for t in node_timings if node in t]
+        for k, v in percentiles(values).items():
+            metrics[f"node.{node}.{k}"] = v
+    # Share of strategy decisions that still needed the LLM (see
+    # decide_by_rules); with the fake backend it follows the sampled analyses.
+    decisions = [t["strategy"] for t in node_timings if "strategy" in t]
+    if decisions:
+        fast = sum(m.get("fast_path", 0) for m in decisions)
+        metrics["strategy.llm_path_ratio"] = round(1 - fast / len(decisions), 3)
+    return metrics
+
+
+def ledger_for(turns: int, seed: int = 0) -> dict[str, Any]:
+    """Evidence ledger as the graph would build it, from sampled analyses."""
+    import random
+
+    from src.agents.behavioral import BehavioralEvaluation
+    from src.agents.technical import TechEvaluation
+    from src.ledger import update_ledger
+    from src.llm.fake import sample_schema
+
+    rng = random.Random(seed)
+    ledger = None
+    for turn in range(1, turns + 1):
+        ledger = update_ledger(
+            ledger,
+            turn,
+            f"{ANSWER} (ход {turn})",
+            sample_schema(TechEvaluation, rng),
+            sample_schema(BehavioralEvaluation, rng),
+        )
+    return ledger
+
+
+def bench_feedback(lengths: list[int], repeats: int) -> dict[str, float]:
+    from src.agents.feedback import FeedbackGenerator
+
+    generators = {
+        "single": FeedbackGenerator(mode="single"),
+        "map_reduce": FeedbackGenerator(mode="map_reduce"),
+        "ledger": FeedbackGenerator(mode="auto"),
+    }
+    metrics = {}
+    for turns in lengths:
+        state = {**initial_state(), "messages": transcript(turns)}
+        for mode, generator in generators.items():
+            if mode == "ledger":
+                state = {**state, "evidence_ledger": ledger_for(turns)}
+            latencies = []
+            for _ in range(repeats):
+                started = time.perf_counter()
+                generator.generate(state)
+                latencies.append(time.perf_counter() - started)
+            metrics[f"feedback.{mode}.turns_{turns}.p50_ms"] = percentiles(latencies)[
+                "p50_ms"
+            ]
+    return metrics
+
+
+def bench_context(lengths: list[int]) -> dict[str, float]:
+    """Prompt history size per agent as the transcript grows."""
+    from src.utils.context import DEFAULT_BUDGETS, budget_for, render_history
+    from src.utils.tokens import estimate_tokens
+
+    metrics = {}
+    pasted = HumanMessage(content="def handler(event):\n    return event\n" * 500)
+    for turns in lengths:
+        messages = transcript(turns) + [pasted]
+        for agent in DEFAULT_BUDGETS:
+            history = render_history(messages, budget_for(agent))
+            metrics[f"context.{agent}.turns_{turns}.tokens"] = estimate_tokens(history)
+    return metrics
+
+
+def bench_transcript(lengths: list[int]) -> dict[str, float]:
+    """History formatting cost per turn: every agent's window plus the size check."""
+    from src.utils.context import budget_for, render_history
+    from src.utils.transcript import transcript_for
+
+    metrics = {}
+    for turns in lengths:
+        messages = []
+        started = time.perf_counter()
+        for message in transcript(turns):
+            messages = messages + [message]
+            for agent in ("technical", "behavioral", "interviewer"):
+                render_history(messages, budget_for(agent))
+            transcript_for(messages).total_tokens
+        elapsed = time.perf_counter() - started
+        metrics[f"transcript.turns_{turns}.per_turn_us"] = round(
+            elapsed / turns * 1e6, 1
+        )
+    return metrics
+
+
+def model_reply(turn: int) -> AIMessage:
+    """An interviewer reply as a chat model returns it, metadata included."""
+    usage = {"input_tokens": 900, "output_tokens": 60, "total_tokens": 960}
+    return AIMessage(
+        content=f"{QUESTION} ({turn})",
+        id=f"run-{uuid.uuid4()}-0",
+        response_metadata={
+            "token_usage": {
+                "prompt_tokens": 900,
+                "completion_tokens": 60,
+                "total_tokens": 960,
+            },
+            "model_name": "gpt-4o-mini",
+            "system_fingerprint": "fp_0000000000",
+            "finish_reason": "stop",
+        },
+        usage_metadata=usage,
+    )
+
+
+def bench_messages(lengths: list[int]) -> dict[str, float]:
+    """
+    Session message memory and append cost: the former plain list, grown by
+    concatenation and mirrored into a chat_history list for the UI, against
+    the MessageView store both now read.
+    """
+    from src.message_store import MessageView, append_messages
+
+    def as_list(pairs):
+        messages, chat_history = [], []
+        for answer, reply in pairs:
+            chat_history.append({"role": "user", "content": answer.content})
+            messages = messages + [answer]
+            messages = messages + [reply]
+            chat_history.append({"role": "assistant", "content": reply.content})
+        return messages, chat_history
+
+    def as_store(pairs):
+        messages = MessageView()
+        for answer, reply in pairs:
+            messages += [answer]
+            messages = append_messages(messages, [reply])
+        return messages
+
+    def session(turns: int):
+        return [
+            (HumanMessage(content=f"{ANSWER} (ход {turn})"), model_reply(turn))
+            for turn in range(1, turns + 1)
+        ]
+
+    metrics = {}
+    for turns in lengths:
+        for name, build in (("list", as_list), ("store", as_store)):
+            elapsed = []
+            for _ in range(3):
+                pairs = session(turns)
+                started = time.perf_counter()
+                build(pairs)
+                elapsed.append(time.perf_counter() - started)
+            tracemalloc.start()
+            # The model's message objects are created inside the trace: the
+            # list keeps them, the store keeps only their records.
+            kept = build(session(turns))
+            retained, _ = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            del kept
+            prefix = f"messages.turns_{turns}.{name}"
+            metrics[f"{prefix}.session_kb"] = round(retained / 1024, 1)
+            metrics[f"{prefix}.append_us_per_turn"] = round(
+                min(elapsed) / turns * 1e6, 1
+            )
+    return metrics
+
+
+def bench_checkpoints(turns: int) -> dict[str, float]:
+    """
+    SQLite checkpoint storage for one session and the cost of resuming it.
+    "inline_kb" estimates the same checkpoints with the message history
+    serialized into each of them, as LangGraph would store it by default.
+    """
+    from langgraph.checkpoint.serde.jsonplus import JsonPlusSerializer
+
+    from src.checkpoint import SessionCheckpointer
+    from src.graph import build_graph, session_config
+
+    def stored_bytes(cur) -> tuple[int, int]:
+        checkpoints = cur.execute(
+            "SELECT COUNT(*), COALESCE(SUM(LENGTH(checkpoint)), 0) FROM checkpoints"
+        ).fetchone()
+        (messages,) = cur.execute(
+            "SELECT COALESCE(SUM(LENGTH(id) + LENGTH(type) + LENGTH(content)), 0) "
+            "FROM messages"
+        ).fetchone()
+        return checkpoints[0], checkpoints[1] + messages
+
+    serde = JsonPlusSerializer()
+    with tempfile.TemporaryDirectory() as tmp:
+        saver = SessionCheckpointer(os.path.join(tmp, "checkpoints.sqlite"))
+        graph = build_graph(checkpointer=saver)
+        config = session_config("bench")
+        inline = 0
+        rows = 0
+        for turn in range(1, turns + 1):
+            update = {
+                "messages": [HumanMessage(content=f"{ANSWER} (ход {turn})")],
+                "turn_count": turn,
+                "interview_stage": stage_for_turn(turn),
+            }
+            if turn == 1:
+                update = {**initial_state(), **update}
+            state = graph.invoke(update, config)
+            with saver.cursor(transaction=False) as cur:
+                count, stored = stored_bytes(cur)
+            history = len(serde.dumps_typed(state["messages"].to_messages())[1])
+            inline += (count - rows) * history
+            rows = count
+
+        started = time.perf_counter()
+        graph.get_state(config)
+        warm = time.perf_counter() - started
+        saver.evict("bench")
+        started = time.perf_counter()
+        graph.get_state(config)
+        cold = time.perf_counter() - started
+        saver.conn.close()
+
+    prefix = f"checkpoints.turns_{turns}"
+    return {
+        f"{prefix}.stored_kb": round(stored / 1024, 1),
+        f"{prefix}.inline_kb": round((stored + inline) / 1024, 1),
+        f"{prefix}.resume_warm_ms": round(warm * 1000, 2),
+        f"{prefix}.resume_cold_ms": round(cold * 1000, 2),
+    }
+
+
+def bench_session_log(turn_counts: list[int]) -> dict[str, float]:
+    """Time spent inside the logging calls, writing inline and via LogWriter."""
+    from src.logger import LogWriter, SessionLogger
+
+    metrics = {}
+    writer = LogWriter()
+    with tempfile.TemporaryDirectory() as tmp:
+        for mode in ("sync", "background"):
+            for turns in turn_counts:
+                logger = SessionLogger(
+                    os.path.join(tmp, f"log_{mode}_{turns}.json"),
+                    writer=writer if mode == "background" else None,
+                )
+                started = time.perf_counter()
+                for turn in range(1, turns + 1):
+                    logger.log_turn(turn, QUESTION, ANSWER, "мысли агентов " * 20)
+                logger.save_log()
+                total = time.perf_counter() - started
+                logger.close()
+                key = f"session_log.{mode}.turns_{turns}"
+                metrics[f"{key}.total_ms"] = round(total * 1000, 2)
+                metrics[f"{key}.written_kb"] = round(logger.bytes_written / 1024, 1)
+    return metrics
+
+
+def bench_memory(graph_app, turns: int) -> dict[str, float]:
+    tracemalloc.start()
+    _, _, state = run_session(graph_app, turns)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {
+        "memory.session_peak_kb": round(peak / 1024, 1),
+        "memory.process_peak_rss_mb": peak_rss_mb(),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--out", default=None, help="write results JSON here")
+    parser.add_argument("--sessions", type=int, default=5)
+    parser.add_argument("--turns", type=int, default=8)
+    parser.add_argument("--latency", type=float, default=0.05)
+    parser.add_argument("--jitter", type=float, default=0.01)
+    parser.add_argument(
+        "--prompt-latency", type=float, default=0.01, help="seconds per 1k chars"
+    )
+    args = parser.parse_args()
+
+    # Cached replies would hide the cost of the calls being measured.
+    os.environ["LLM_CACHE"] = "off"
+    config = {
+        "latency": args.latency,
+        "jitter": args.jitter,
+        "prompt_latency": args.prompt_latency,
+    }
+    use_backend("fake", **config)
+    from src.graph import app as graph_app
+
+    metrics: dict[str, float] = {}
+    metrics.update(bench_turns(graph_app, args.sessions, args.turns))
+    metrics.update(bench_feedback([4, 8, 16, 32, 64], repeats=3))
+    metrics.update(bench_context([8, 64]))
+    metrics.update(bench_transcript([50, 200]))
+    metrics.update(bench_messages([50, 200]))
+    metrics.update(bench_checkpoints(50))
+    metrics.update(bench_session_log([10, 50, 200]))
+    metrics.update(bench_memory(graph_app, args.turns))
+
+    results = {
+        "meta": {
+            "revision": git_revision(),
+            "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "config": {**config, "sessions": args.sessions, "turns": args.turns},
+        },
+        "metrics": metrics,
+    }
+    payload = json.dumps(results, indent=2)
+    if args.out:
+        os.makedirs(os.path.dirname(args.out) or ".", exist_ok=True)
+        with open(args.out, "w", encoding="utf-8") as f:
+            f.write(payload)
+    print(payload)
+
+
+if __name__ == "__main__":
+    main()
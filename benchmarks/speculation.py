@@ -0,0 +1,114 @@
+"""
+Effect of speculative follow-ups on reply latency, and what they cost.
+
+Sessions are played with a pause between turns standing in for the
+candidate's typing time. With speculation on, the replies for the
+correct / wrong branches are generated during that pause, and the interviewer takes the one matching the analysis. Reports
+reply latency with and without speculation, the hit rate, and the extra
+calls that were thrown away (wasted: finished unused; cancelled: stopped
+early). With the fake backend, branch outcomes and topics are random (half
+the answers are flagged as hallucinations), so the hit rate is a lower
+bound on what consistent analyses would give. --steady pins those flags
+to false, keeps the topic and has every answer judged correct, with the
+director asking a harder question, as a strong candidate's interview
+mostly goes. A reply is only served when the director took the step the
+branch assumed.
+
+    python -m benchmarks.speculation --sessions 3 --turns 6 --typing 0.5
+"""
+
+import argparse
+import os
+import time
+
+from langchain_core.messages import HumanMessage
+
+from benchmarks.common import percentiles
+from benchmarks.topology import ANSWERS
+from src.llm.registry import use_backend
+from src.state import initial_state, stage_for_turn
+
+# Analyses of an interview that stays on topic: no hallucinations, no
+# questions about the job, no off-topic answers; correct answers that the
+# director follows up with a harder question.
+STEADY = {
+    "hallucination_detected": False,
+    "candidate_question": False,
+    "off_topic_attempt": False,
+    "topic": "Python",
+    "is_correct": True,
+    "next_step": "ask_question",
+    "difficulty_change": 1,
+}
+
+
+def run(sessions: int, turns: int, typing: float, speculate: bool) -> dict:
+    from src.graph import STREAM_MODES, _turn_event, build_graph, interviewer_agent
+    from src.speculation import Speculator
+
+    graph = build_graph("split")
+    speculator = Speculator(interviewer_agent.acompose)
+    reply = []
+    for session in range(sessions):
+        state = initial_state()
+        for turn in range(1, turns + 1):
+            answer = ANSWERS[(session + turn - 1) % len(ANSWERS)]
+            state["messages"] = state["messages"] + [HumanMessage(content=answer)]
+            state["turn_count"] = turn
+            state["interview_stage"] = stage_for_turn(turn)
+
+            started = time.perf_counter()
+            first = None
+            with speculator.serving():
+                for mode, payload in graph.stream(state, stream_mode=STREAM_MODES):
+                    for kind, value in _turn_event(mode, payload):
+                        if kind == "values":
+                            state = value
+                        elif first is None and (
+                            kind == "token" or value == "interviewer"
+                        ):
+                            first = time.perf_counter() - started
+            reply.append(first if first is not None else time.perf_counter() - started)
+
+            if speculate:
+                speculator.start(state)
+            time.sleep(typing)
+        speculator.cancel()
+    return {**percentiles(reply), **speculator.stats()}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sessions", type=int, default=3)
+    parser.add_argument("--turns", type=int, default=6)
+    parser.add_argument("--typing", type=float, default=0.5, help="seconds")
+    parser.add_argument("--latency", type=float, default=0.2, help="fake LLM seconds")
+    parser.add_argument(
+        "--prompt-latency", type=float, default=0.02, help="seconds per 1k chars"
+    )
+    parser.add_argument("--steady", action="store_true", help="no random flags")
+    args = parser.parse_args()
+
+    os.environ["LLM_CACHE"] = "off"
+    use_backend(
+        "fake",
+        latency=args.latency,
+        prompt_latency=args.prompt_latency,
+        fixed_fields=STEADY if args.steady else {},
+    )
+
+    print(
+        f"{'speculation':<12} {'p50_ms':>8} {'p95_ms':>8} {'hit_rate':>9} "
+        f"{'started':>8} {'wasted':>7} {'cancelled':>10}"
+    )
+    for speculate in (False, True):
+        r = run(args.sessions, args.turns, args.typing, speculate)
+        print(
+            f"{'on' if speculate else 'off':<12} {r['p50_ms']:>8.1f} "
+            f"{r['p95_ms']:>8.1f} {r['hit_rate']:>9.0%} {r['started']:>8} "
+            f"{r['wasted']:>7} {r['cancelled']:>10}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+"""
+Compare the "split" (four-node) and "fused" (single analysis call) graphs.
+
+Both graphs see the same sequence of states: each turn is run through the
+split graph, whose result carries the session forward, and the same
+pre-turn state is also run through the fused graph. Reports turn latency
+for each topology and how often the fused analysis agrees with the split
+one on the decisions that drive the interview.
+
+With the default fake backend the latency numbers are meaningful (call
+count and prompt size), the agreement ones are not: its replies depend only
+on a hash of the prompt. Run with --backend mistral for real agreement.
+
+    python -m benchmarks.topology --sessions 3 --turns 6
+"""
+
+import argparse
+import os
+import time
+from typing import Any
+
+from langchain_core.messages import HumanMessage
+
+from benchmarks.common import percentiles
+from src.llm.registry import use_backend
+from src.state import initial_state, stage_for_turn
+
+ANSWERS = [
+    "Привет, я Алекс, претендую на позицию Junior Python разработчика.",
+    "Список изменяемый, а кортеж нет, поэтому кортеж можно использовать как ключ словаря.",
+    "Честно говоря, не знаю, как работает GIL, не сталкивался.",
+    "В Python 4.0 убрали GIL и добавили статическую типизацию по умолчанию.",
+    "Декоратор — это функция, которая принимает функцию и возвращает новую функцию.",
+    "А какие задачи будут на испытательном сроке?",
+    "Индекс в SQL ускоряет поиск, но замедляет вставку, обычно это B-дерево.",
+    "Кстати, какая сегодня погода у вас в офисе?",
+]
+
+# field -> how to read it from the state after a turn
+DECISIONS = {
+    "next_step": lambda s: s.get("strategy_next_step"),
+    "difficulty": lambda s: s.get("difficulty_level"),
+    "is_correct": lambda s: (s.get("tech_analysis") or {}).get("is_correct"),
+    "hallucination": lambda s: (s.get("tech_analysis") or {}).get(
+        "hallucination_detected"
+    ),
+    "honesty": lambda s: str(
+        (s.get("behavioral_analysis") or {}).get("honesty_flag", "")
+    ).lower(),
+    "candidate_question": lambda s: (s.get("behavioral_analysis") or {}).get(
+        "candidate_question"
+    ),
+    "off_topic": lambda s: (s.get("behavioral_analysis") or {}).get(
+        "off_topic_attempt"
+    ),
+}
+
+
+def run(sessions: int, turns: int) -> dict[str, Any]:
+    from src.graph import build_graph
+
+    graphs = {"split": build_graph("split"), "fused": build_graph("fused")}
+    latencies: dict[str, list[float]] = {name: [] for name in graphs}
+    agree = dict.fromkeys(DECISIONS, 0)
+    compared = 0
+
+    for session in range(sessions):
+        state = initial_state()
+        for turn in range(1, turns + 1):
+            answer = ANSWERS[(session + turn - 1) % len(ANSWERS)]
+            state["messages"] = state["messages"] + [HumanMessage(content=answer)]
+            state["turn_count"] = turn
+            state["interview_stage"] = stage_for_turn(turn)
+
+            results = {}
+            for name, graph in graphs.items():
+                started = time.perf_counter()
+                results[name] = graph.invoke(state)
+                latencies[name].append(time.perf_counter() - started)
+
+            compared += 1
+            for field, read in DECISIONS.items():
+                agree[field] += read(results["split"]) == read(results["fused"])
+            state = results["split"]
+
+    return {
+        "latency": {name: percentiles(values) for name, values in latencies.items()},
+        "agreement": {field: agree[field] / compared for field in DECISIONS},
+        "turns": compared,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sessions", type=int, default=3)
+    parser.add_argument("--turns", type=int, default=6)
+    parser.add_argument("--backend", default="fake")
+    parser.add_argument("--latency", type=float, default=0.2, help="fake LLM seconds")
+    parser.add_argument(
+        "--prompt-latency", type=float, default=0.02, help="seconds per 1k chars"
+    )
+    args = parser.parse_args()
+
+    os.environ["LLM_CACHE"] = "off"
+    if args.backend == "fake":
+        use_backend("fake", latency=args.latency, prompt_latency=args.prompt_latency)
+    else:
+        use_backend(args.backend)
+
+    results = run(args.sessions, args.turns)
+    print(f"{'topology':<8} {'p50_ms':>8} {'p95_ms':>8} {'p99_ms':>8}")
+    for name, stats in results["latency"].items():
+        print(
+            f"{name:<8} {stats['p50_ms']:>8.1f} {stats['p95_ms']:>8.1f} "
+            f"{stats['p99_ms']:>8.1f}"
+        )
+    print(f"\nagreement over {results['turns']} turns")
+    for field, rate in results["agreement"].items():
+        print(f"  {field:<20} {rate:>6.0%}")
+
+
+if __name__ == "__main__":
+    main()
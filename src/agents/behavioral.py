@@ -1,10 +1,12 @@
 from typing import Any
 from langchain_core.prompts import ChatPromptTemplate
-from langchain_mistralai import ChatMistralAI
 from langchain_core.output_parsers import JsonOutputParser
 from pydantic import BaseModel, Field
 
+from src.llm.registry import get_chat_model
+from src.metrics import record_error
 from src.state import InterviewState
+from src.utils.context import budget_for, clip, render_history
 
 
 class BehavioralEvaluation(BaseModel):
@@ -22,8 +24,10 @@ class BehavioralEvaluation(BaseModel):
 
 
 class BehavioralAnalyst:
-    def __init__(self, model_name: str = "codestral-latest"):
-        self.llm = ChatMistralAI(model=model_name, temperature=0.5)
+    def __init__(self, model_name: str | None = None):
+        self.llm = get_chat_model(
+            "behavioral", model_name, temperature=0.5, schema=BehavioralEvaluation
+        )
         self.parser = JsonOutputParser(pydantic_object=BehavioralEvaluation)
 
         self.system_prompt = """
@@ -57,24 +61,43 @@ class BehavioralAnalyst:
 
         self.chain = self.prompt | self.llm | self.parser
 
-    def analyze(self, state: InterviewState) -> dict[str, Any]:
+    def _prepare(self, state: InterviewState) -> dict[str, Any] | None:
         messages = state.get("messages", [])
         if not messages:
+            return None
+
+        budget = budget_for("behavioral")
+        last_user_msg = clip(messages[-1].content, budget // 2)
+        # Recent turns verbatim for context awareness, older ones summarized
+        history_str = render_history(messages, budget)
+
+        return {"history": history_str, "last_message": last_user_msg}
+
+    def _fallback(self, error: Exception) -> dict[str, Any]:
+        record_error(error, "behavioral")
+        return {
+            "behavioral_analysis": {
+                "error": str(error),
+                "observation": "Failed to analyze",
+            }
+        }
+
+    def analyze(self, state: InterviewState) -> dict[str, Any]:
+        inputs = self._prepare(state)
+        if inputs is None:
             return {"behavioral_analysis": None}
 
-        last_user_msg = messages[-1].content
-        # Use 6 messages (3 full turns) for better context awareness
-        history_str = "\n".join([f"{m.type}: {m.content}" for m in messages[-6:]])
+        try:
+            return {"behavioral_analysis": self.chain.invoke(inputs)}
+        except Exception as e:
+            return self._fallback(e)
+
+    async def aanalyze(self, state: InterviewState) -> dict[str, Any]:
+        inputs = self._prepare(state)
+        if inputs is None:
+            return {"behavioral_analysis": None}
 
         try:
-            result = self.chain.invoke(
-                {"history": history_str, "last_message": last_user_msg}
-            )
-            return {"behavioral_analysis": result}
+            return {"behavioral_analysis": await self.chain.ainvoke(inputs)}
         except Exception as e:
-            return {
-                "behavioral_analysis": {
-                    "error": str(e),
-                    "observation": "Failed to analyze",
-                }
-            }
+            return self._fallback(e)
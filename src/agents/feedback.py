@@ -1,10 +1,17 @@
+import os
 from typing import Any, Literal
 from langchain_core.prompts import ChatPromptTemplate
-from langchain_mistralai import ChatMistralAI
 from langchain_core.output_parsers import JsonOutputParser
 from pydantic import BaseModel, Field
 
-from src.state import InterviewState
+from src.ledger import render_ledger
+from src.llm.registry import get_chat_model
+from src.metrics import record_error, record_partial_failure
+from src.state import InterviewState, last_answer
+from src.utils.context import budget_for, render_history
+from src.utils.transcript import transcript_for
+
+FeedbackMode = Literal["auto", "single", "map_reduce"]
 
 
 class SkillDetail(BaseModel):
@@ -82,9 +89,57 @@ class FinalFeedback(BaseModel):
     )
 
 
+class ChunkEvidence(BaseModel):
+    """Report material extracted from one window of the transcript."""
+
+    confirmed_skills: list[SkillDetail] = Field(
+        description="Skills the candidate demonstrated in this part"
+    )
+    knowledge_gaps: list[GapDetail] = Field(
+        description="Wrong or incomplete answers in this part WITH correct answers"
+    )
+    soft_skills_notes: str = Field(
+        description="Observations on clarity, honesty and engagement in this part"
+    )
+
+
 class FeedbackGenerator:
-    def __init__(self, model_name: str = "codestral-latest"):
-        self.llm = ChatMistralAI(model=model_name, temperature=0.2)
+    """
+    Builds the final report in one of three ways:
+    - "ledger": from the evidence ledger kept during the interview;
+    - "single": one call over the whole transcript;
+    - "map_reduce": the transcript is split into turn windows that are
+      summarized concurrently, then merged into the report by one call.
+
+    With mode="auto" (FEEDBACK_MODE, default) the ledger is used when it
+    covers every answered turn, as it does for sessions run through the
+    graph. Otherwise (no ledger, or one that missed turns) transcripts
+    above `map_reduce_tokens` estimated tokens go through map-reduce and
+    shorter ones through a single call.
+    """
+
+    def __init__(
+        self,
+        model_name: str | None = None,
+        mode: FeedbackMode | None = None,
+        map_reduce_tokens: int | None = None,
+        chunk_tokens: int | None = None,
+        max_concurrency: int | None = None,
+    ):
+        self.mode = mode or os.getenv("FEEDBACK_MODE", "auto")
+        self.map_reduce_tokens = map_reduce_tokens or int(
+            os.getenv("FEEDBACK_MAP_REDUCE_TOKENS", "6000")
+        )
+        self.chunk_tokens = chunk_tokens or int(
+            os.getenv("FEEDBACK_CHUNK_TOKENS", "1500")
+        )
+        self.max_concurrency = max_concurrency or int(
+            os.getenv("FEEDBACK_MAX_CONCURRENCY", "4")
+        )
+
+        self.llm = get_chat_model(
+            "feedback", model_name, temperature=0.2, schema=FinalFeedback
+        )
         self.parser = JsonOutputParser(pydantic_object=FinalFeedback)
 
         self.system_prompt = """
@@ -152,6 +207,52 @@ class FeedbackGenerator:
 
         self.chain = self.prompt | self.llm | self.parser
 
+        # Same report, built from condensed evidence: the ledger collected turn
+        # by turn (src/ledger.py) or the merged map-step output. The ledger's
+        # size is capped, so this call costs about the same for a 5-turn and a
+        # 50-turn interview.
+        self.evidence_prompt = ChatPromptTemplate.from_messages(
+            [
+                ("system", self.system_prompt),
+                (
+                    "human",
+                    "Evidence collected during the interview (quotes are the "
+                    "candidate's own words):\n{evidence}\n\n"
+                    "Generate the feedback report as JSON.",
+                ),
+            ]
+        )
+        self.evidence_chain = self.evidence_prompt | self.llm | self.parser
+
+        self.map_llm = get_chat_model(
+            "feedback_map", model_name, temperature=0.2, schema=ChunkEvidence
+        )
+        self.map_parser = JsonOutputParser(pydantic_object=ChunkEvidence)
+        self.map_prompt = ChatPromptTemplate.from_messages(
+            [
+                (
+                    "system",
+                    """
+        You are a Hiring Committee member reviewing ONE PART ({part}) of a
+        technical interview. Other members review the other parts.
+
+        Extract from this part only:
+        - confirmed_skills: skills the candidate demonstrated, with a quote as evidence;
+        - knowledge_gaps: wrong or incomplete answers, quoting the candidate and
+          giving the correct answer;
+        - soft_skills_notes: a few sentences on clarity, honesty (did they admit
+          not knowing?) and engagement.
+
+        OUTPUT MUST BE VALID JSON with EXACTLY the fields
+        "confirmed_skills", "knowledge_gaps", "soft_skills_notes".
+        Output ONLY the JSON object, no markdown or extra text.
+        """,
+                ),
+                ("human", "Interview part:\n{chunk}"),
+            ]
+        )
+        self.map_chain = self.map_prompt | self.map_llm | self.map_parser
+
     def _normalize_response(self, result: dict[str, Any]) -> dict[str, Any]:
         """Normalize LLM response to ensure consistent field names."""
         if not result:
@@ -229,51 +330,183 @@ class FeedbackGenerator:
 
         return normalized
 
-    def generate(self, state: InterviewState) -> dict[str, Any]:
+    def _empty_report(self) -> dict[str, Any]:
+        return {
+            "feedback_report": {
+                "grade": "N/A",
+                "hiring_recommendation": "No Hire",
+                "confidence_score": 0,
+                "confirmed_skills": [],
+                "knowledge_gaps": [],
+                "soft_skills": {
+                    "clarity": 0,
+                    "honesty": "N/A",
+                    "engagement": "N/A",
+                    "summary": "Интервью было завершено до начала содержательной беседы. Недостаточно данных для оценки.",
+                },
+                "roadmap": [],
+            }
+        }
+
+    def _fallback(self, error: Exception) -> dict[str, Any]:
+        record_error(error, "feedback")
+        return {
+            "feedback_report": {
+                "error": str(error),
+                "grade": "Junior",
+                "hiring_recommendation": "No Hire",
+                "confidence_score": 0,
+                "confirmed_skills": [],
+                "knowledge_gaps": [],
+                "soft_skills": {
+                    "clarity": 5,
+                    "honesty": "Honest",
+                    "engagement": "Medium",
+                    "summary": "Не удалось оценить из-за ошибки.",
+                },
+                "roadmap": [],
+            }
+        }
+
+    def _chunks(self, messages: list) -> list[str]:
+        """Split the transcript into windows of whole turns of ~chunk_tokens."""
+        transcript = transcript_for(messages)
+        with transcript.lock:
+            transcript.sync(messages)
+            rendered = list(zip(transcript.lines, transcript.tokens))
+
+        chunks, current, size = [], [], 0
+        for m, (line, tokens) in zip(messages, rendered):
+            # Start a new window at a candidate message, so question and
+            # answer pairs are not split apart.
+            if current and m.type == "human" and size + tokens > self.chunk_tokens:
+                chunks.append("\n".join(current))
+                current, size = [], 0
+            current.append(line)
+            size += tokens
+        if current:
+            chunks.append("\n".join(current))
+        return chunks
+
+    def _map_inputs(self, chunks: list[str]) -> list[dict[str, str]]:
+        return [
+            {"part": f"part {i} of {len(chunks)}", "chunk": chunk}
+            for i, chunk in enumerate(chunks, 1)
+        ]
+
+    def _reduce_inputs(self, name: str, parts: list[Any]) -> dict[str, str]:
+        """
+        Merge map-step results into evidence text for the report call. Raises
+        the first error if no part succeeded: a report on no evidence at all
+        would read as a confident one.
+        """
+        failures = [part for part in parts if isinstance(part, Exception)]
+        if len(failures) == len(parts):
+            raise failures[0]
+        skills: dict[str, str] = {}
+        gaps: list[str] = []
+        notes: list[str] = []
+        for i, part in enumerate(parts, 1):
+            if isinstance(part, Exception):
+                record_partial_failure(part, "feedback_map")
+                continue
+            for skill in part.get("confirmed_skills") or []:
+                skills.setdefault(
+                    skill.get("skill_name", ""), skill.get("evidence", "")
+                )
+            for gap in part.get("knowledge_gaps") or []:
+                gaps.append(
+                    f"- {gap.get('topic', '')}: candidate said "
+                    f'"{gap.get("candidate_response", "")}"; correct answer: '
+                    f"{gap.get('correct_answer', '')}"
+                )
+            if part.get("soft_skills_notes"):
+                notes.append(f"- part {i}: {part['soft_skills_notes']}")
+
+        lines = ["CONFIRMED SKILLS:"]
+        lines += [f'- {k}: "{v}"' for k, v in skills.items() if k] or ["- none"]
+        lines += ["", "KNOWLEDGE GAPS:", *(gaps or ["- none"])]
+        lines += ["", "SOFT SKILLS:", *notes]
+        return {"name": name, "evidence": "\n".join(lines)}
+
+    def _plan(self, state: InterviewState) -> tuple[str, dict[str, Any]] | None:
+        """Pick the report mode and its inputs, or None if there is nothing to rate."""
         messages = state.get("messages", [])
         candidate_profile = state.get("candidate_profile", {})
         candidate_name = candidate_profile.get("name", "Кандидат")
 
-        user_messages = [m for m in messages if m.type == "human"]
-        if len(user_messages) < 1:
-            return {
-                "feedback_report": {
-                    "grade": "N/A",
-                    "hiring_recommendation": "No Hire",
-                    "confidence_score": 0,
-                    "confirmed_skills": [],
-                    "knowledge_gaps": [],
-                    "soft_skills": {
-                        "clarity": 0,
-                        "honesty": "N/A",
-                        "engagement": "N/A",
-                        "summary": "Интервью было завершено до начала содержательной беседы. Недостаточно данных для оценки.",
-                    },
-                    "roadmap": [],
-                }
+        if last_answer(messages) is None:
+            return None
+
+        ledger = state.get("evidence_ledger") or {}
+        turns = ledger.get("turns", 0)
+        if self.mode == "auto" and turns and turns >= state.get("turn_count", 0):
+            return "ledger", {
+                "name": candidate_name,
+                "evidence": render_ledger(ledger),
             }
 
-        history_str = "\n".join([f"{m.type}: {m.content}" for m in messages])
+        mode = self.mode
+        if mode == "auto":
+            tokens = transcript_for(messages).total_tokens
+            mode = "map_reduce" if tokens > self.map_reduce_tokens else "single"
+        if mode == "map_reduce":
+            return mode, {"name": candidate_name, "chunks": self._chunks(messages)}
+        # A forced single call on a long transcript still gets a bounded
+        # prompt: the oldest turns are summarized or dropped.
+        history_str = render_history(messages, budget_for("feedback"))
+        return "single", {"name": candidate_name, "history": history_str}
 
+    def generate(self, state: InterviewState) -> dict[str, Any]:
+        plan = self._plan(state)
+        if plan is None:
+            return self._empty_report()
+
+        mode, inputs = plan
         try:
-            result = self.chain.invoke({"name": candidate_name, "history": history_str})
-            normalized = self._normalize_response(result)
-            return {"feedback_report": normalized}
+            if mode == "map_reduce":
+                parts = self.map_chain.batch(
+                    self._map_inputs(inputs["chunks"]),
+                    config={"max_concurrency": self.max_concurrency},
+                    return_exceptions=True,
+                )
+                result = self.evidence_chain.invoke(
+                    self._reduce_inputs(inputs["name"], parts)
+                )
+            elif mode == "ledger":
+                result = self.evidence_chain.invoke(inputs)
+            else:
+                result = self.chain.invoke(inputs)
+            return {
+                "feedback_report": self._normalize_response(result),
+                "feedback_mode": mode,
+            }
         except Exception as e:
+            return self._fallback(e)
+
+    async def agenerate(self, state: InterviewState) -> dict[str, Any]:
+        plan = self._plan(state)
+        if plan is None:
+            return self._empty_report()
+
+        mode, inputs = plan
+        try:
+            if mode == "map_reduce":
+                parts = await self.map_chain.abatch(
+                    self._map_inputs(inputs["chunks"]),
+                    config={"max_concurrency": self.max_concurrency},
+                    return_exceptions=True,
+                )
+                result = await self.evidence_chain.ainvoke(
+                    self._reduce_inputs(inputs["name"], parts)
+                )
+            elif mode == "ledger":
+                result = await self.evidence_chain.ainvoke(inputs)
+            else:
+                result = await self.chain.ainvoke(inputs)
             return {
-                "feedback_report": {
-                    "error": str(e),
-                    "grade": "Junior",
-                    "hiring_recommendation": "No Hire",
-                    "confidence_score": 0,
-                    "confirmed_skills": [],
-                    "knowledge_gaps": [],
-                    "soft_skills": {
-                        "clarity": 5,
-                        "honesty": "Honest",
-                        "engagement": "Medium",
-                        "summary": "Не удалось оценить из-за ошибки.",
-                    },
-                    "roadmap": [],
-                }
+                "feedback_report": self._normalize_response(result),
+                "feedback_mode": mode,
             }
+        except Exception as e:
+            return self._fallback(e)
@@ -0,0 +1,152 @@
+from typing import Any
+from langchain_core.prompts import ChatPromptTemplate
+from langchain_core.output_parsers import JsonOutputParser
+from pydantic import BaseModel, Field
+
+from src.agents.behavioral import BehavioralEvaluation
+from src.agents.strategy import StrategyDecision
+from src.agents.technical import TechEvaluation
+from src.llm.registry import get_chat_model
+from src.metrics import record_error
+from src.state import InterviewState
+from src.utils.context import budget_for, clip, render_history
+
+
+class FusedAnalysis(BaseModel):
+    technical: TechEvaluation = Field(
+        description="Technical evaluation of the candidate's last answer"
+    )
+    behavioral: BehavioralEvaluation = Field(
+        description="Behavioral evaluation of the candidate's last answer"
+    )
+    strategy: StrategyDecision = Field(
+        description="Next move for the interviewer, based on both evaluations"
+    )
+
+
+class FusedAnalyzer:
+    """
+    Technical, behavioral and strategy analysis of a turn in one structured
+    call, replacing the three separate agents in the "fused" graph topology.
+    """
+
+    def __init__(self, model_name: str | None = None):
+        self.llm = get_chat_model(
+            "fused", model_name, temperature=0.2, schema=FusedAnalysis
+        )
+        self.parser = JsonOutputParser(pydantic_object=FusedAnalysis)
+
+        self.system_prompt = """
+        You are the Interview Committee: a Technical Evaluator, a Behavioral
+        Analyst and the Director of the Interview working together.
+
+        Current Topic: {topic}
+        Difficulty Level: {difficulty} (scale 1-5)
+        Turns: {turn_count}
+
+        History:
+        {history}
+
+        Analyze the LAST user message and answer in three parts.
+
+        1. "technical" (Technical Evaluator):
+           - Check for factual errors.
+           - Check for "Hallucinations" (confident but wrong claims, e.g. "Python 4.0").
+           - Identify missing key concepts and the topics covered.
+
+        2. "behavioral" (Behavioral Analyst): HOW the candidate answers.
+           - Confidence (are they hedging? "Maybe", "I think") and clarity.
+           - Honesty: 'honest', 'evasive' or 'deceptive'. Engagement: 'high', 'medium', 'low'.
+           - off_topic_attempt = TRUE only for irrelevant topics (weather, politics, jokes).
+           - candidate_question = TRUE when the candidate asks about the job, company,
+             team, stack or trial period. This is NOT off-topic.
+
+        3. "strategy" (Director), using parts 1 and 2, rules in priority order:
+           - candidate_question → "answer_candidate_question": answer, then a follow-up technical question.
+           - hallucination_detected → "dig_deeper", difficulty_change 0: politely correct the false claim and verify understanding.
+           - correct and confident → "ask_question" or "change_topic", difficulty_change +1.
+           - wrong or uncertain → "hint" or a simpler "ask_question", difficulty_change -1.
+           - off-topic → "ask_question": gently redirect back to the interview topic.
+           - turns > 10 → "wrap_up": thank the candidate and conclude the interview.
+
+        CRITICAL: Output ONLY valid JSON with the keys "technical", "behavioral"
+        and "strategy", each matching its schema.
+        """
+
+        self.prompt = ChatPromptTemplate.from_messages(
+            [("system", self.system_prompt), ("human", "{last_message}")]
+        )
+
+        self.chain = self.prompt | self.llm | self.parser
+
+    def _prepare(self, state: InterviewState) -> dict[str, Any] | None:
+        messages = state.get("messages", [])
+        if not messages:
+            return None
+
+        budget = budget_for("fused")
+        history_str = render_history(messages, budget)
+
+        return {
+            "topic": state.get("current_topic", "General"),
+            "difficulty": state.get("difficulty_level", 1),
+            "turn_count": state.get("turn_count", 0),
+            "history": history_str,
+            "last_message": clip(messages[-1].content, budget // 2),
+        }
+
+    def _apply(self, result: dict[str, Any], state: InterviewState) -> dict[str, Any]:
+        strategy = result["strategy"]
+        current_difficulty = state.get("difficulty_level", 1)
+        difficulty_change = strategy.get("difficulty_change", 0)
+        new_difficulty = max(1, min(5, current_difficulty + difficulty_change))
+
+        return {
+            "tech_analysis": result["technical"],
+            "behavioral_analysis": result["behavioral"],
+            "strategy_directive": strategy["directive"],
+            "strategy_next_step": strategy.get("next_step"),
+            "current_topic": strategy["topic"],
+            "difficulty_level": new_difficulty,
+            "strategy_reasoning": strategy.get("reasoning", "N/A"),
+        }
+
+    def _fallback(self, error: Exception, state: InterviewState) -> dict[str, Any]:
+        record_error(error, "fused")
+        return {
+            "tech_analysis": {
+                "error": str(error),
+                "is_correct": False,
+                "hallucination_detected": False,
+                "reasoning": "Failed to analyze",
+            },
+            "behavioral_analysis": {
+                "error": str(error),
+                "observation": "Failed to analyze",
+            },
+            "strategy_directive": "Ask the next technical question based on candidate profile. Do not repeat introduction.",
+            "strategy_next_step": "ask_question",
+            "current_topic": "General Technical",
+            "difficulty_level": state.get("difficulty_level", 1),
+            "strategy_reasoning": f"Error occurred: {str(error)}",
+        }
+
+    def analyze(self, state: InterviewState) -> dict[str, Any]:
+        inputs = self._prepare(state)
+        if inputs is None:
+            return {"tech_analysis": None, "behavioral_analysis": None}
+
+        try:
+            return self._apply(self.chain.invoke(inputs), state)
+        except Exception as e:
+            return self._fallback(e, state)
+
+    async def aanalyze(self, state: InterviewState) -> dict[str, Any]:
+        inputs = self._prepare(state)
+        if inputs is None:
+            return {"tech_analysis": None, "behavioral_analysis": None}
+
+        try:
+            return self._apply(await self.chain.ainvoke(inputs), state)
+        except Exception as e:
+            return self._fallback(e, state)
@@ -1,14 +1,18 @@
 from typing import Any
 from langchain_core.prompts import ChatPromptTemplate
-from langchain_mistralai import ChatMistralAI
 from langchain_core.messages import AIMessage
 
+from src.agents.strategy import correction_directive
+from src.llm.registry import get_chat_model
+from src.metrics import record_error
+from src.speculation import atake_speculation, take_speculation
 from src.state import InterviewState
+from src.utils.context import budget_for, clip, render_history
 
 
 class InterviewerAgent:
-    def __init__(self, model_name: str = "codestral-latest"):
-        self.llm = ChatMistralAI(model=model_name, temperature=0.7)
+    def __init__(self, model_name: str | None = None):
+        self.llm = get_chat_model("interviewer", model_name, temperature=0.7)
 
         self.system_prompt = """
         You are a Professional Technical Interviewer.
@@ -62,32 +66,98 @@ class InterviewerAgent:
 
         self.chain = self.prompt | self.llm
 
-    def generate_response(self, state: InterviewState) -> dict[str, Any]:
+    def _prepare(self, state: InterviewState) -> dict[str, Any]:
         directive = state.get("strategy_directive", "Ask a standard question.")
         topic = state.get("current_topic", "General")
         difficulty = state.get("difficulty_level", 1)
 
         messages = state.get("messages", [])
-        last_message = messages[-1].content if messages else "Hello"
+        budget = budget_for("interviewer")
+        last_message = clip(messages[-1].content, budget // 2) if messages else "Hello"
 
-        history_str = "\n".join([f"{m.type}: {m.content}" for m in messages[-8:]])
+        history_str = render_history(messages, budget)
 
         profile = state.get("candidate_profile", {})
         profile_str = f"Name: {profile.get('name', 'Unknown')}, Position: {profile.get('position', 'N/A')}, Grade: {profile.get('grade', 'N/A')}, Skills: {profile.get('skills', [])}"
 
+        return {
+            "directive": directive,
+            "topic": topic,
+            "difficulty": difficulty,
+            "last_message": last_message,
+            "history": history_str,
+            "profile": profile_str,
+        }
+
+    def _fallback(self, error: Exception) -> dict[str, Any]:
+        record_error(error, "interviewer")
+        fallback = "Could you please clarify?"
+        return {"messages": [AIMessage(content=fallback)]}
+
+    def compose(self, state: InterviewState) -> dict[str, Any]:
+        """Write the reply with the LLM."""
         try:
-            response = self.chain.invoke(
-                {
-                    "directive": directive,
-                    "topic": topic,
-                    "difficulty": difficulty,
-                    "last_message": last_message,
-                    "history": history_str,
-                    "profile": profile_str,
-                }
-            )
+            response = self.chain.invoke(self._prepare(state))
+            return {"messages": [response]}
+        except Exception as e:
+            return self._fallback(e)
 
+    async def acompose(self, state: InterviewState) -> dict[str, Any]:
+        try:
+            response = await self.chain.ainvoke(self._prepare(state))
             return {"messages": [response]}
-        except Exception:
-            fallback = "Could you please clarify?"
-            return {"messages": [AIMessage(content=fallback)]}
+        except Exception as e:
+            return self._fallback(e)
+
+    def generate_response(self, state: InterviewState) -> dict[str, Any]:
+        """Reply to the turn, using a speculated reply if one matches it."""
+        return take_speculation(state) or self.compose(state)
+
+    async def agenerate_response(self, state: InterviewState) -> dict[str, Any]:
+        return await atake_speculation(state) or await self.acompose(state)
+
+    # Pipelined topology: the reply is drafted from the previous turn's
+    # directive while this turn is being analyzed, then committed.
+
+    def draft(self, state: InterviewState) -> dict[str, Any]:
+        response = self.compose(state)["messages"][0]
+        return {"draft_reply": response.content}
+
+    async def adraft(self, state: InterviewState) -> dict[str, Any]:
+        response = (await self.acompose(state))["messages"][0]
+        return {"draft_reply": response.content}
+
+    def _preempting_state(self, state: InterviewState) -> InterviewState | None:
+        """State to regenerate the reply from, if the analysis overrules the draft."""
+        tech = state.get("tech_analysis") or {}
+        if not tech.get("hallucination_detected"):
+            return None
+        topic = state.get("current_topic") or "General"
+        return {**state, "strategy_directive": correction_directive(topic, tech)}
+
+    def _accept_draft(self, state: InterviewState) -> dict[str, Any]:
+        return {
+            "messages": [AIMessage(content=state.get("draft_reply") or "")],
+            "draft_reply": None,
+            "reply_preempted": False,
+        }
+
+    def commit(self, state: InterviewState) -> dict[str, Any]:
+        preempting = self._preempting_state(state)
+        if preempting is None:
+            return self._accept_draft(state)
+        return {
+            **self.compose(preempting),
+            "draft_reply": None,
+            "reply_preempted": True,
+        }
+
+    async def acommit(self, state: InterviewState) -> dict[str, Any]:
+        preempting = self._preempting_state(state)
+        if preempting is None:
+            return self._accept_draft(state)
+        return {
+            **(await self.acompose(preempting)),
+            "draft_reply": None,
+            "reply_preempted": True,
+        }
@@ -1,9 +1,11 @@
+import os
 from typing import Any, Literal
 from langchain_core.prompts import ChatPromptTemplate
-from langchain_mistralai import ChatMistralAI
 from langchain_core.output_parsers import JsonOutputParser
 from pydantic import BaseModel, Field
 
+from src.llm.registry import get_chat_model
+from src.metrics import record_error, record_fast_path
 from src.state import InterviewState
 
 
@@ -24,9 +26,129 @@ class StrategyDecision(BaseModel):
     reasoning: str = Field(description="Why this decision was made")
 
 
+# Topics that are placeholders rather than something to ask about: leaving
+# them needs a free-form topic choice, which is the LLM's job.
+OPEN_TOPICS = {"", "Знакомство", "General", "General Technical"}
+
+
+def correction_directive(topic: str, tech: dict[str, Any]) -> str:
+    """Directive for answering a hallucination: correct it, then verify."""
+    errors = "; ".join(tech.get("factual_errors") or [])
+    return (
+        f"Politely correct the false claim about {topic}"
+        + (f" ({errors})" if errors else "")
+        + ". Explain the truth. Ask a follow-up to verify understanding."
+    )
+
+
+def decide_by_rules(state: InterviewState) -> dict[str, Any] | None:
+    """
+    The DECISION RULES of StrategyDirector's prompt as code. Returns a
+    StrategyDecision-shaped dict, or None when the signals are ambiguous or
+    the next step needs a new topic to be chosen.
+    """
+    tech = state.get("tech_analysis") or {}
+    behav = state.get("behavioral_analysis") or {}
+    if not tech or not behav or "error" in tech or "error" in behav:
+        return None
+
+    topic = state.get("current_topic") or ""
+    turns = state.get("turn_count", 0)
+    difficulty = state.get("difficulty_level", 1)
+
+    def decision(next_step, difficulty_change, directive, reasoning):
+        return {
+            "next_step": next_step,
+            "topic": topic,
+            "difficulty_change": difficulty_change,
+            "directive": directive,
+            "reasoning": f"Rule: {reasoning}",
+        }
+
+    if topic in OPEN_TOPICS:
+        return None
+
+    if behav.get("candidate_question"):
+        return decision(
+            "answer_candidate_question",
+            0,
+            "Answer the candidate's question about the job, then ask a follow-up "
+            f"technical question about {topic}",
+            "candidate asked about the job",
+        )
+
+    if tech.get("hallucination_detected"):
+        return decision(
+            "dig_deeper",
+            0,
+            correction_directive(topic, tech),
+            "hallucination detected",
+        )
+
+    if behav.get("off_topic_attempt"):
+        return decision(
+            "ask_question",
+            0,
+            f"Gently redirect back to the interview topic: {topic}",
+            "off-topic attempt",
+        )
+
+    if turns > 10:
+        return decision(
+            "wrap_up",
+            0,
+            "Thank the candidate and conclude the interview",
+            "more than 10 turns",
+        )
+
+    tech_confidence = tech.get("confidence_score") or 0.0
+    behav_confidence = behav.get("confidence_score") or 0
+    if tech.get("is_correct") and tech_confidence >= 0.7 and behav_confidence >= 6:
+        if difficulty >= 5:
+            # Already at the top of the scale: time for another topic.
+            return None
+        return decision(
+            "ask_question",
+            1,
+            f"The candidate answered well. Ask a harder question about {topic}.",
+            "correct and confident",
+        )
+
+    if (
+        tech.get("is_correct") is False
+        or tech_confidence < 0.4
+        or behav_confidence <= 3
+    ):
+        if difficulty <= 1:
+            # Can't go easier on this topic: time for another one.
+            return None
+        missing = ", ".join(tech.get("missing_concepts") or [])
+        return decision(
+            "hint",
+            -1,
+            f"The candidate is struggling with {topic}. Give a short hint"
+            + (f" (towards: {missing})" if missing else "")
+            + " and ask a simpler question.",
+            "wrong or uncertain answer",
+        )
+
+    return None
+
+
 class StrategyDirector:
-    def __init__(self, model_name: str = "codestral-latest"):
-        self.llm = ChatMistralAI(model=model_name, temperature=0.7)
+    """
+    Decides the next step of the interview. Unambiguous cases are settled
+    locally by decide_by_rules; the LLM is called for the rest. Set
+    STRATEGY_RULES=off (or use_rules=False) to always ask the LLM.
+    """
+
+    def __init__(self, model_name: str | None = None, use_rules: bool | None = None):
+        if use_rules is None:
+            use_rules = os.getenv("STRATEGY_RULES", "on").strip().lower() != "off"
+        self.use_rules = use_rules
+        self.llm = get_chat_model(
+            "strategy", model_name, temperature=0.7, schema=StrategyDecision
+        )
         self.parser = JsonOutputParser(pydantic_object=StrategyDecision)
 
         self.system_prompt = """
@@ -75,35 +197,68 @@ class StrategyDirector:
 
         self.chain = self.prompt | self.llm | self.parser
 
-    def decide(self, state: InterviewState) -> dict[str, Any]:
+    def _prepare(self, state: InterviewState) -> dict[str, Any]:
         tech = state.get("tech_analysis", {})
         behav = state.get("behavioral_analysis", {})
+
+        return {
+            "tech_analysis": str(tech),
+            "behavioral_analysis": str(behav),
+            "current_topic": state.get("current_topic", "General"),
+            "turn_count": state.get("turn_count", 0),
+        }
+
+    def _apply(self, result: dict[str, Any], state: InterviewState) -> dict[str, Any]:
         current_difficulty = state.get("difficulty_level", 1)
+        difficulty_change = result.get("difficulty_change", 0)
+        new_difficulty = max(1, min(5, current_difficulty + difficulty_change))
+
+        return {
+            "strategy_directive": result["directive"],
+            "strategy_next_step": result.get("next_step"),
+            "current_topic": result["topic"],
+            "difficulty_level": new_difficulty,
+            "strategy_reasoning": result.get("reasoning", "N/A"),
+        }
+
+    def _fallback(self, error: Exception, state: InterviewState) -> dict[str, Any]:
+        record_error(error, "strategy")
+        return {
+            "strategy_directive": "Ask the next technical question based on candidate profile. Do not repeat introduction.",
+            "strategy_next_step": "ask_question",
+            "current_topic": "General Technical",
+            "difficulty_level": state.get("difficulty_level", 1),
+            "strategy_reasoning": f"Error occurred: {str(error)}",
+            "error": str(error),
+        }
+
+    def _fast_path(self, state: InterviewState) -> dict[str, Any] | None:
+        if not self.use_rules:
+            return None
+        result = decide_by_rules(state)
+        if result is None:
+            return None
+        record_fast_path()
+        return self._apply(result, state)
+
+    def decide(self, state: InterviewState) -> dict[str, Any]:
+        fast = self._fast_path(state)
+        if fast is not None:
+            return fast
+
+        try:
+            result = self.chain.invoke(self._prepare(state))
+            return self._apply(result, state)
+        except Exception as e:
+            return self._fallback(e, state)
+
+    async def adecide(self, state: InterviewState) -> dict[str, Any]:
+        fast = self._fast_path(state)
+        if fast is not None:
+            return fast
 
         try:
-            result = self.chain.invoke(
-                {
-                    "tech_analysis": str(tech),
-                    "behavioral_analysis": str(behav),
-                    "current_topic": state.get("current_topic", "General"),
-                    "turn_count": state.get("turn_count", 0),
-                }
-            )
-
-            difficulty_change = result.get("difficulty_change", 0)
-            new_difficulty = max(1, min(5, current_difficulty + difficulty_change))
-
-            return {
-                "strategy_directive": result["directive"],
-                "current_topic": result["topic"],
-                "difficulty_level": new_difficulty,
-                "strategy_reasoning": result.get("reasoning", "N/A"),
-            }
+            result = await self.chain.ainvoke(self._prepare(state))
+            return self._apply(result, state)
         except Exception as e:
-            return {
-                "strategy_directive": "Ask the next technical question based on candidate profile. Do not repeat introduction.",
-                "current_topic": "General Technical",
-                "difficulty_level": current_difficulty,
-                "strategy_reasoning": f"Error occurred: {str(e)}",
-                "error": str(e),
-            }
+            return self._fallback(e, state)
@@ -1,10 +1,12 @@
 from typing import Any
 from langchain_core.prompts import ChatPromptTemplate
-from langchain_mistralai import ChatMistralAI
 from langchain_core.output_parsers import JsonOutputParser
 from pydantic import BaseModel, Field
 
+from src.llm.registry import get_chat_model
+from src.metrics import record_error
 from src.state import InterviewState
+from src.utils.context import budget_for, clip, render_history
 
 
 class TechEvaluation(BaseModel):
@@ -28,8 +30,10 @@ class TechEvaluation(BaseModel):
 
 
 class TechnicalEvaluator:
-    def __init__(self, model_name: str = "codestral-latest"):
-        self.llm = ChatMistralAI(model=model_name, temperature=0.0)
+    def __init__(self, model_name: str | None = None):
+        self.llm = get_chat_model(
+            "technical", model_name, temperature=0.0, schema=TechEvaluation
+        )
         self.parser = JsonOutputParser(pydantic_object=TechEvaluation)
 
         self.system_prompt = """
@@ -56,31 +60,50 @@ class TechnicalEvaluator:
 
         self.chain = self.prompt | self.llm | self.parser
 
-    def analyze(self, state: InterviewState) -> dict[str, Any]:
+    def _prepare(self, state: InterviewState) -> dict[str, Any] | None:
         messages = state.get("messages", [])
         if not messages:
+            return None
+
+        budget = budget_for("technical")
+        last_user_msg = clip(messages[-1].content, budget // 2)
+
+        history_str = render_history(messages, budget)
+
+        return {
+            "topic": state.get("current_topic", "General"),
+            "difficulty": state.get("difficulty_level", 1),
+            "history": history_str,
+            "last_message": last_user_msg,
+        }
+
+    def _fallback(self, error: Exception) -> dict[str, Any]:
+        record_error(error, "technical")
+        return {
+            "tech_analysis": {
+                "error": str(error),
+                "is_correct": False,
+                "hallucination_detected": False,
+                "reasoning": "Failed to analyze",
+            }
+        }
+
+    def analyze(self, state: InterviewState) -> dict[str, Any]:
+        inputs = self._prepare(state)
+        if inputs is None:
             return {"tech_analysis": None}
 
-        last_user_msg = messages[-1].content
+        try:
+            return {"tech_analysis": self.chain.invoke(inputs)}
+        except Exception as e:
+            return self._fallback(e)
 
-        history_str = "\n".join([f"{m.type}: {m.content}" for m in messages[-6:]])
+    async def aanalyze(self, state: InterviewState) -> dict[str, Any]:
+        inputs = self._prepare(state)
+        if inputs is None:
+            return {"tech_analysis": None}
 
         try:
-            result = self.chain.invoke(
-                {
-                    "topic": state.get("current_topic", "General"),
-                    "difficulty": state.get("difficulty_level", 1),
-                    "history": history_str,
-                    "last_message": last_user_msg,
-                }
-            )
-            return {"tech_analysis": result}
+            return {"tech_analysis": await self.chain.ainvoke(inputs)}
         except Exception as e:
-            return {
-                "tech_analysis": {
-                    "error": str(e),
-                    "is_correct": False,
-                    "hallucination_detected": False,
-                    "reasoning": "Failed to analyze",
-                }
-            }
+            return self._fallback(e)
@@ -1,7 +1,11 @@
+import asyncio
+import contextlib
 import streamlit as st
 import sys
 import os
 import json
+import time
+import uuid
 from dotenv import load_dotenv
 from langchain_core.messages import HumanMessage
 
@@ -9,38 +13,115 @@ load_dotenv()
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from src.graph import app as graph_app
-from src.logger import SessionLogger
+from src.checkpoint import get_checkpointer
+from src.graph import astream_turn, critical_path_ms, interviewer_agent, load_session
+from src.llm.cache import get_shared_cache
+from src.llm.cassette import Cassette
+from src.llm.ratelimit import get_rate_limiter
+from src.llm.resilience import resilience_stats
+from src.llm.routing import get_router
+from src.logger import SessionLogger, format_internal_thoughts, get_log_writer
+from src.metrics import registry as metrics_registry, track
 from src.agents.feedback import FeedbackGenerator
+from src.speculation import Speculator
 from src.profile_parser import update_profile_from_message
+from src.state import initial_state, stage_for_turn
 from src.utils.formatter import beautify_log_file
 
 st.set_page_config(page_title="AI Интервьюер", layout="wide")
 
-if "chat_history" not in st.session_state:
-    st.session_state.chat_history = []
-if "interview_state" not in st.session_state:
-    st.session_state.interview_state = {
-        "messages": [],
-        "candidate_profile": {},
-        "interview_stage": "intro",
-        "current_topic": "Знакомство",
-        "turn_count": 0,
-        "difficulty_level": 1,
-        "tech_analysis": {},
-        "behavioral_analysis": {},
-        "strategy_directive": "Ожидание представления кандидата...",
-        "strategy_reasoning": None,
-    }
-if "turn_id" not in st.session_state:
-    st.session_state.turn_id = 1
-if "logger" not in st.session_state:
-    base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-    log_path = os.path.join(base_dir, "interview_log.json")
-    st.session_state.logger = SessionLogger(log_path)
-    st.session_state.logger.start_session("Кандидат")
+NODE_LABELS = {
+    "technical": "Технический анализ готов",
+    "behavioral": "Поведенческий анализ готов",
+    "strategy": "Стратегия выбрана",
+    "interviewer": "Ответ сформирован",
+    "ledger": "Журнал доказательств обновлён",
+    "analysis": "Анализ и стратегия готовы",
+    "draft": "Черновик ответа готов",
+}
+
+if "thread_id" not in st.session_state:
+    # The session id lives in the URL, so a refresh or a restarted server
+    # picks the interview up from its last checkpoint.
+    st.session_state.thread_id = st.query_params.get("session") or uuid.uuid4().hex
+    st.query_params["session"] = st.session_state.thread_id
 if "feedback_gen" not in st.session_state:
     st.session_state.feedback_gen = FeedbackGenerator()
+if "speculator" not in st.session_state:
+    st.session_state.speculator = (
+        Speculator(interviewer_agent.acompose)
+        if os.getenv("SPECULATION", "off").strip().lower() == "on"
+        else None
+    )
+
+# Only the active session's state is loaded, from its checkpoint, on every
+# rerun; between reruns Streamlit holds nothing but the thread id.
+resumed_state = load_session(st.session_state.thread_id)
+interview_state = resumed_state or initial_state()
+turn_id = interview_state["turn_count"] + 1
+
+
+@st.cache_resource
+def open_session_logs() -> dict[str, SessionLogger]:
+    """The session logs this process has open, by thread id."""
+    return {}
+
+
+def close_session_log(thread_id: str, logger: SessionLogger):
+    """Write out everything `logger` has pending and close its files."""
+    open_logs = open_session_logs()
+    if open_logs.get(thread_id) is logger:
+        del open_logs[thread_id]
+    logger.close()
+
+
+if "logger" not in st.session_state:
+    # One log per session, like the API server's, so browser tabs don't
+    # overwrite each other; a resumed session appends to its own log.
+    # Streamlit doesn't say when a browser session ends, so a log left open
+    # by an earlier one (a refresh, a restart of the tab) is closed here,
+    # before its events are read back.
+    previous = open_session_logs().get(st.session_state.thread_id)
+    if previous is not None:
+        close_session_log(st.session_state.thread_id, previous)
+    log_dir = os.getenv("SESSION_LOG_DIR", "logs")
+    os.makedirs(log_dir, exist_ok=True)
+    st.session_state.logger = SessionLogger(
+        os.path.join(log_dir, f"{st.session_state.thread_id}.json"),
+        writer=get_log_writer(),
+        resume=bool(resumed_state),
+    )
+    open_session_logs()[st.session_state.thread_id] = st.session_state.logger
+    if not resumed_state:
+        st.session_state.logger.start_session("Кандидат")
+
+if "cassette" not in st.session_state:
+    # Same for the recording: a resumed session's cassette replays from its
+    # first turn.
+    cassette_dir = os.getenv("LLM_CASSETTE_DIR")
+    st.session_state.cassette = (
+        Cassette(
+            st.session_state.thread_id,
+            directory=cassette_dir,
+            resume=bool(resumed_state),
+        )
+        if cassette_dir
+        else None
+    )
+
+
+def llm_turn(turn, user_message=None):
+    """Attribute LLM calls to a cassette turn when session recording is on."""
+    if st.session_state.cassette is None:
+        return contextlib.nullcontext()
+    return st.session_state.cassette.turn(turn, user_message=user_message)
+
+
+def speculation_served():
+    """Let the interviewer use replies speculated while the candidate typed."""
+    if st.session_state.speculator is None:
+        return contextlib.nullcontext()
+    return st.session_state.speculator.serving()
 
 
 def normalize_feedback(report):
@@ -107,58 +188,169 @@ def normalize_feedback(report):
     return normalized
 
 
+def finish_interview():
+    """Generate the final report, persist it to the session log and rerun."""
+    if st.session_state.speculator is not None:
+        st.session_state.speculator.cancel()
+    with st.spinner("Генерация итогового отчёта..."):
+        with llm_turn("feedback"), track("feedback") as metrics:
+            report = asyncio.run(
+                st.session_state.feedback_gen.agenerate(interview_state)
+            )
+        st.session_state.final_report = report.get("feedback_report")
+
+        if st.session_state.final_report:
+            st.session_state.logger.log_feedback(
+                json.dumps(st.session_state.final_report, indent=2, ensure_ascii=False),
+                metrics=metrics,
+            )
+            logger = st.session_state.logger
+            logger.save_log()
+            logger.submit(lambda: beautify_log_file(logger.filename))
+            # The interview is over: wait for the export and close the log.
+            logger.flush()
+            close_session_log(st.session_state.thread_id, logger)
+    st.rerun()
+
+
+async def run_turn(state, status, placeholder):
+    """
+    Stream one graph turn of this session on the event loop, rendering stage
+    progress and reply tokens as they arrive. Returns the final state and the time to
+    the first visible token in ms (None if nothing was streamed).
+    """
+    started = time.perf_counter()
+    ttft_ms = None
+    streamed = ""
+    final_state = None
+
+    async for kind, payload in astream_turn(state, st.session_state.thread_id):
+        if kind == "node":
+            status.write(f"✓ {NODE_LABELS.get(payload, payload)}")
+        elif kind == "token":
+            if ttft_ms is None:
+                ttft_ms = (time.perf_counter() - started) * 1000
+            streamed += payload
+            placeholder.markdown(streamed + "▌")
+        else:
+            final_state = payload
+
+    return final_state, ttft_ms
+
+
 with st.sidebar:
     st.header("Мысли агента")
 
     st.subheader("Директива стратегии")
-    directive = st.session_state.interview_state.get("strategy_directive")
+    directive = interview_state.get("strategy_directive")
     st.info(directive if directive else "Ожидание начала...")
 
     col1, col2 = st.columns(2)
     with col1:
         st.subheader("Тема")
-        st.write(st.session_state.interview_state.get("current_topic", "Н/Д"))
+        st.write(interview_state.get("current_topic", "Н/Д"))
     with col2:
         st.subheader("Сложность")
-        st.write(
-            f"Уровень {st.session_state.interview_state.get('difficulty_level', 1)}/5"
-        )
+        st.write(f"Уровень {interview_state.get('difficulty_level', 1)}/5")
 
     with st.expander("Технический анализ", expanded=True):
-        tech = st.session_state.interview_state.get("tech_analysis")
+        tech = interview_state.get("tech_analysis")
         if tech and isinstance(tech, dict) and len(tech) > 0:
             st.json(tech)
         else:
             st.caption("_Ожидание первого ответа..._")
 
     with st.expander("Поведенческий анализ", expanded=True):
-        behav = st.session_state.interview_state.get("behavioral_analysis")
+        behav = interview_state.get("behavioral_analysis")
         if behav and isinstance(behav, dict) and len(behav) > 0:
             st.json(behav)
         else:
             st.caption("_Ожидание первого ответа..._")
 
-    profile = st.session_state.interview_state.get("candidate_profile", {})
+    node_metrics = interview_state.get("node_metrics")
+    if node_metrics:
+        with st.expander("Метрики узлов", expanded=False):
+            for node, m in node_metrics.items():
+                failures = m["parse_failures"] + m["llm_errors"]
+                st.write(
+                    f"{node}: {m['wall_ms']:.0f} мс, "
+                    f"токены {m['prompt_tokens']} → {m['completion_tokens']}"
+                    + (f", сбоев: {failures}" if failures else "")
+                    + (" (правила, без LLM)" if m.get("fast_path") else "")
+                    + (f", модель: {', '.join(m['routes'])}" if m.get("routes") else "")
+                )
+            total_ms = sum(m["wall_ms"] for m in node_metrics.values())
+            st.caption(
+                f"Критический путь: {critical_path_ms(node_metrics):.0f} мс, "
+                f"сумма узлов: {total_ms:.0f} мс, "
+                f"весь граф: {st.session_state.get('last_graph_ms', 0):.0f} мс, "
+                f"первый токен: {st.session_state.get('last_ttft_ms', 0):.0f} мс"
+            )
+            strategy_totals = metrics_registry.snapshot().get("strategy")
+            if strategy_totals:
+                st.caption(
+                    f"Стратег без LLM: {strategy_totals['fast_path']:.0f} из "
+                    f"{strategy_totals['runs']} решений"
+                )
+            if st.session_state.speculator is not None:
+                spec = st.session_state.speculator.stats()
+                st.caption(
+                    f"Упреждающие ответы: {spec['hits']} использовано из "
+                    f"{spec['hits'] + spec['misses']} ходов ({spec['hit_rate']:.0%}), "
+                    f"впустую {spec['wasted']}, отменено {spec['cancelled']}"
+                )
+            cache = get_shared_cache().stats()
+            st.caption(
+                f"Кэш LLM: {cache['hits']} попаданий, {cache['misses']} промахов "
+                f"({cache['hit_rate']:.0%})"
+            )
+            checkpoints = get_checkpointer().stats()
+            st.caption(
+                f"Сессия {st.session_state.thread_id[:8]}: сессий в памяти "
+                f"{checkpoints['cached_threads']}, выгружено {checkpoints['evictions']}"
+            )
+            limiter = get_rate_limiter()
+            if limiter is not None:
+                limits = limiter.stats()
+                waits = ", ".join(
+                    f"{name} {limits[name]['avg_wait_ms']:.0f} мс"
+                    for name in ("interactive", "analysis", "background")
+                )
+                st.caption(
+                    f"Лимит LLM: в очереди {limits['waiting']}, "
+                    f"выполняется {limits['active']}; среднее ожидание: {waits}"
+                )
+            resilience = resilience_stats()
+            if resilience["agents"]:
+                calls = resilience["agents"].values()
+                breakers = ", ".join(
+                    f"{name} {b['state']}" for name, b in resilience["breakers"].items()
+                )
+                st.caption(
+                    f"Устойчивость LLM: таймаутов {sum(c['timeouts'] for c in calls)}, "
+                    f"повторных запросов {sum(c['hedges'] for c in calls)} "
+                    f"(успешных {sum(c['hedge_wins'] for c in calls)}); "
+                    f"предохранитель: {breakers}"
+                )
+            routing = get_router().stats()
+            if routing["levels"]:
+                downgraded = ", ".join(
+                    f"{route} −{level}" for route, level in routing["levels"].items()
+                )
+                st.caption(
+                    f"Модели понижены ради задержки: {downgraded}; "
+                    f"понижений {routing['downgrades']}, "
+                    f"возвратов {routing['recoveries']}"
+                )
+
+    profile = interview_state.get("candidate_profile", {})
     if profile and any(profile.values()):
         with st.expander("Профиль кандидата", expanded=False):
             st.json(profile)
 
     st.markdown("---")
     if st.button("🏁 Завершить и получить отчёт", type="primary"):
-        with st.spinner("Генерация итогового отчёта..."):
-            report = st.session_state.feedback_gen.generate(
-                st.session_state.interview_state
-            )
-            st.session_state.final_report = report.get("feedback_report")
-
-            if st.session_state.final_report:
-                st.session_state.logger.log_feedback(
-                    json.dumps(
-                        st.session_state.final_report, indent=2, ensure_ascii=False
-                    )
-                )
-                beautify_log_file(st.session_state.logger.filename)
-        st.rerun()
+        finish_interview()
 
 if "final_report" in st.session_state and st.session_state.final_report:
     st.balloons()
@@ -307,9 +499,9 @@ st.caption(
     "Представьтесь и расскажите о своих навыках. Для завершения введите 'стоп интервью'"
 )
 
-for msg in st.session_state.chat_history:
-    with st.chat_message(msg["role"]):
-        st.markdown(msg["content"])
+for msg in interview_state["messages"]:
+    with st.chat_message(msg.role):
+        st.markdown(msg.content)
 
 if prompt := st.chat_input("Ваш ответ..."):
     STOP_COMMANDS = [
@@ -326,77 +518,67 @@ if prompt := st.chat_input("Ваш ответ..."):
     ]
     is_stop = any(cmd in prompt.lower() for cmd in STOP_COMMANDS)
 
-    st.session_state.chat_history.append({"role": "user", "content": prompt})
     with st.chat_message("user"):
         st.markdown(prompt)
 
     if is_stop:
-        with st.spinner("Генерация итогового отчёта..."):
-            report = st.session_state.feedback_gen.generate(
-                st.session_state.interview_state
-            )
-            st.session_state.final_report = report.get("feedback_report")
-
-            if st.session_state.final_report:
-                st.session_state.logger.log_feedback(
-                    json.dumps(
-                        st.session_state.final_report, indent=2, ensure_ascii=False
-                    )
-                )
-                beautify_log_file(st.session_state.logger.filename)
-        st.rerun()
+        finish_interview()
     else:
-        st.session_state.interview_state["messages"].append(
-            HumanMessage(content=prompt)
-        )
-        st.session_state.interview_state["turn_count"] = st.session_state.turn_id
-
-        if st.session_state.turn_id <= 2:
-            st.session_state.interview_state["candidate_profile"] = (
-                update_profile_from_message(
-                    st.session_state.interview_state.get("candidate_profile", {}),
-                    prompt,
-                )
+        # The checkpointed graph resumes the session's state, so the turn
+        # only sends what changed; a new session starts from initial_state.
+        update = {
+            "messages": [HumanMessage(content=prompt)],
+            "turn_count": turn_id,
+            "interview_stage": stage_for_turn(turn_id),
+        }
+        if turn_id <= 2:
+            profile = update_profile_from_message(
+                interview_state.get("candidate_profile", {}),
+                prompt,
             )
-            profile = st.session_state.interview_state["candidate_profile"]
+            update["candidate_profile"] = profile
             if profile.get("name"):
-                st.session_state.logger.session.participant_name = profile["name"]
-                st.session_state.logger.save_log()
-
-        turn = st.session_state.turn_id
-        if turn == 1:
-            st.session_state.interview_state["interview_stage"] = "intro"
-        elif turn <= 5:
-            st.session_state.interview_state["interview_stage"] = "main"
-        elif turn <= 8:
-            st.session_state.interview_state["interview_stage"] = "behavioral"
-        else:
-            st.session_state.interview_state["interview_stage"] = "closing"
+                st.session_state.logger.set_participant(profile["name"])
+        if resumed_state is None:
+            update = {**initial_state(), **update}
 
-        with st.spinner("Анализ ответа и генерация вопроса..."):
+        with st.chat_message("assistant"):
+            status = st.status("Анализ ответа и генерация вопроса...")
+            placeholder = st.empty()
             try:
-                final_state = graph_app.invoke(st.session_state.interview_state)
+                started = time.perf_counter()
+                with (
+                    llm_turn(turn_id, user_message=prompt),
+                    speculation_served(),
+                ):
+                    final_state, ttft_ms = asyncio.run(
+                        run_turn(update, status, placeholder)
+                    )
+                st.session_state.last_graph_ms = (time.perf_counter() - started) * 1000
+                if ttft_ms is None:
+                    # Nothing was streamed (e.g. fallback reply), so the first
+                    # visible token is the whole message at the end of the turn.
+                    ttft_ms = st.session_state.last_graph_ms
+                st.session_state.last_ttft_ms = ttft_ms
+                status.update(
+                    label=f"Первый токен через {ttft_ms / 1000:.1f} с",
+                    state="complete",
+                )
 
                 agent_msg = final_state["messages"][-1].content
-
-                st.session_state.interview_state = final_state
-
-                tech_analysis = final_state.get("tech_analysis") or {}
-                behav_analysis = final_state.get("behavioral_analysis") or {}
-                strategy = final_state.get("strategy_directive", "Н/Д")
-
-                internal_thoughts = f"""[Наблюдатель/Технический]: {tech_analysis.get("reasoning", "Н/Д") if isinstance(tech_analysis, dict) else "Н/Д"} - Галлюцинация: {tech_analysis.get("hallucination_detected", False) if isinstance(tech_analysis, dict) else False} - Пропущенные концепции: {tech_analysis.get("missing_concepts", []) if isinstance(tech_analysis, dict) else []} [Наблюдатель/Поведенческий]: {behav_analysis.get("observation", "Н/Д") if isinstance(behav_analysis, dict) else "Н/Д"} - Честность: {behav_analysis.get("honesty_flag", "Н/Д") if isinstance(behav_analysis, dict) else "Н/Д"} - Оффтопик: {behav_analysis.get("off_topic_attempt", False) if isinstance(behav_analysis, dict) else False} [Стратег → Интервьюер]: {strategy}"""
+                placeholder.markdown(agent_msg)
 
                 st.session_state.logger.log_turn(
-                    st.session_state.turn_id, agent_msg, prompt, internal_thoughts
-                )
-                st.session_state.turn_id += 1
-
-                st.session_state.chat_history.append(
-                    {"role": "assistant", "content": agent_msg}
+                    turn_id,
+                    agent_msg,
+                    prompt,
+                    format_internal_thoughts(final_state),
+                    ttft_ms=round(ttft_ms, 1),
+                    metrics=final_state.get("node_metrics"),
                 )
-                with st.chat_message("assistant"):
-                    st.markdown(agent_msg)
+                if st.session_state.speculator is not None:
+                    st.session_state.speculator.start(final_state)
 
             except Exception as e:
+                status.update(state="error")
                 st.error(f"Ошибка: {str(e)}")
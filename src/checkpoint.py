@@ -0,0 +1,265 @@
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import AsyncIterator, Sequence
+from typing import Any
+
+from langchain_core.runnables import RunnableConfig
+from langgraph.checkpoint.base import (
+    ChannelVersions,
+    Checkpoint,
+    CheckpointMetadata,
+    CheckpointTuple,
+)
+from langgraph.checkpoint.sqlite import SqliteSaver
+
+from src.message_store import MessageStore, MessageView, StoredMessage
+
+# Stands in for the messages channel in a stored checkpoint: the length of
+# the thread's message view. The records live in the messages table.
+_VIEW_REF = "__message_view__"
+
+
+class _Thread:
+    __slots__ = ("store", "persisted", "touched")
+
+    def __init__(self, store: MessageStore, persisted: int):
+        self.store = store
+        self.persisted = persisted  # records of `store` already in the table
+        self.touched = time.monotonic()
+
+
+class SessionCheckpointer(SqliteSaver):
+    """
+    SQLite checkpointer for interview sessions, one thread per session.
+
+    LangGraph stores the whole state with every checkpoint, several per turn.
+    Here the message history is kept out of it: each message is written
+    once, to an append-only messages table, and the checkpoint only records
+    how many of the thread's messages its state saw. Loading a checkpoint
+    rebuilds a MessageView over the thread's records, kept in memory while
+    the session is active and dropped after `idle_seconds` without use.
+
+    The async methods run the sync ones: the database is local and each call
+    is a few short statements.
+    """
+
+    def __init__(
+        self,
+        path: str = ".checkpoints.sqlite",
+        idle_seconds: float | None = 1800,
+    ):
+        super().__init__(sqlite3.connect(path, check_same_thread=False))
+        self.path = path
+        self.idle_seconds = idle_seconds
+        self.evictions = 0
+        self._threads: OrderedDict[str, _Thread] = OrderedDict()
+        self._threads_lock = threading.RLock()
+
+    def setup(self) -> None:
+        # Called by cursor() with self.lock held.
+        if self.is_setup:
+            return
+        super().setup()
+        self.conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS messages (
+                thread_id TEXT NOT NULL,
+                seq INTEGER NOT NULL,
+                id TEXT NOT NULL,
+                type TEXT NOT NULL,
+                content TEXT NOT NULL,
+                PRIMARY KEY (thread_id, seq)
+            )
+            """
+        )
+        self.conn.commit()
+
+    # --- message records ---------------------------------------------------
+
+    def _touch(self, thread_id: str, thread: _Thread) -> _Thread:
+        thread.touched = time.monotonic()
+        self._threads[thread_id] = thread
+        self._threads.move_to_end(thread_id)
+        self.evict_idle()
+        return thread
+
+    def _load_thread(self, thread_id: str) -> _Thread:
+        with self.cursor(transaction=False) as cur:
+            rows = cur.execute(
+                "SELECT id, type, content FROM messages "
+                "WHERE thread_id = ? ORDER BY seq",
+                (thread_id,),
+            ).fetchall()
+        store = MessageStore(StoredMessage(*row) for row in rows)
+        return _Thread(store, len(rows))
+
+    def _view(self, thread_id: str, length: int) -> MessageView:
+        with self._threads_lock:
+            thread = self._threads.get(thread_id)
+            if thread is None or thread.persisted < length:
+                thread = self._load_thread(thread_id)
+            return MessageView.over(self._touch(thread_id, thread).store, length)
+
+    def _save_messages(self, thread_id: str, view: MessageView):
+        with self._threads_lock:
+            thread = self._threads.get(thread_id)
+            if thread is None:
+                thread = self._load_thread(thread_id)
+            if view.store is not thread.store:
+                # A fork of the thread's history (or a view built elsewhere):
+                # keep the records both share, replace the rest.
+                k = min(thread.persisted, len(view))
+                old = thread.store.records
+                while k and view[k - 1].id != old[k - 1].id:
+                    k -= 1
+                thread = _Thread(view.store, k)
+                with self.cursor() as cur:
+                    cur.execute(
+                        "DELETE FROM messages WHERE thread_id = ? AND seq >= ?",
+                        (thread_id, k),
+                    )
+            new = view[thread.persisted :]
+            if new:
+                with self.cursor() as cur:
+                    cur.executemany(
+                        "INSERT OR REPLACE INTO messages VALUES (?, ?, ?, ?, ?)",
+                        [
+                            (thread_id, seq, r.id, r.type, r.content)
+                            for seq, r in enumerate(new, start=thread.persisted)
+                        ],
+                    )
+                thread.persisted = len(view)
+            self._touch(thread_id, thread)
+
+    def _rehydrate(self, tuple_: CheckpointTuple | None) -> CheckpointTuple | None:
+        if tuple_ is None:
+            return None
+        values = tuple_.checkpoint.get("channel_values", {})
+        ref = values.get("messages")
+        if isinstance(ref, dict) and _VIEW_REF in ref:
+            thread_id = tuple_.config["configurable"]["thread_id"]
+            values["messages"] = self._view(thread_id, ref[_VIEW_REF])
+        return tuple_
+
+    def evict_idle(self) -> int:
+        """Drop the in-memory records of threads idle for `idle_seconds`."""
+        if self.idle_seconds is None:
+            return 0
+        cutoff = time.monotonic() - self.idle_seconds
+        evicted = 0
+        with self._threads_lock:
+            while self._threads:
+                thread_id, thread = next(iter(self._threads.items()))
+                if thread.touched > cutoff:
+                    break
+                del self._threads[thread_id]
+                evicted += 1
+        self.evictions += evicted
+        return evicted
+
+    def evict(self, thread_id: str):
+        with self._threads_lock:
+            self._threads.pop(thread_id, None)
+
+    def cached_threads(self) -> int:
+        return len(self._threads)
+
+    # --- BaseCheckpointSaver -----------------------------------------------
+
+    def get_tuple(self, config: RunnableConfig) -> CheckpointTuple | None:
+        return self._rehydrate(super().get_tuple(config))
+
+    def list(self, config, *, filter=None, before=None, limit=None):
+        for tuple_ in super().list(config, filter=filter, before=before, limit=limit):
+            yield self._rehydrate(tuple_)
+
+    def put(
+        self,
+        config: RunnableConfig,
+        checkpoint: Checkpoint,
+        metadata: CheckpointMetadata,
+        new_versions: ChannelVersions,
+    ) -> RunnableConfig:
+        values = checkpoint.get("channel_values", {})
+        view = values.get("messages")
+        if isinstance(view, MessageView):
+            self._save_messages(config["configurable"]["thread_id"], view)
+            checkpoint = {
+                **checkpoint,
+                "channel_values": {**values, "messages": {_VIEW_REF: len(view)}},
+            }
+        return super().put(config, checkpoint, metadata, new_versions)
+
+    def put_writes(
+        self,
+        config: RunnableConfig,
+        writes: Sequence[tuple[str, Any]],
+        task_id: str,
+        task_path: str = "",
+    ) -> None:
+        # Node outputs are lists of new messages; a whole view only shows up
+        # as the input of a thread's first turn.
+        writes = [
+            (channel, value.to_messages() if isinstance(value, MessageView) else value)
+            for channel, value in writes
+        ]
+        super().put_writes(config, writes, task_id, task_path)
+
+    def delete_thread(self, thread_id: str) -> None:
+        super().delete_thread(thread_id)
+        with self.cursor() as cur:
+            cur.execute("DELETE FROM messages WHERE thread_id = ?", (str(thread_id),))
+        self.evict(str(thread_id))
+
+    async def aget_tuple(self, config: RunnableConfig) -> CheckpointTuple | None:
+        return self.get_tuple(config)
+
+    async def alist(
+        self, config, *, filter=None, before=None, limit=None
+    ) -> AsyncIterator[CheckpointTuple]:
+        for tuple_ in self.list(config, filter=filter, before=before, limit=limit):
+            yield tuple_
+
+    async def aput(
+        self,
+        config: RunnableConfig,
+        checkpoint: Checkpoint,
+        metadata: CheckpointMetadata,
+        new_versions: ChannelVersions,
+    ) -> RunnableConfig:
+        return self.put(config, checkpoint, metadata, new_versions)
+
+    async def aput_writes(
+        self,
+        config: RunnableConfig,
+        writes: Sequence[tuple[str, Any]],
+        task_id: str,
+        task_path: str = "",
+    ) -> None:
+        self.put_writes(config, writes, task_id, task_path)
+
+    async def adelete_thread(self, thread_id: str) -> None:
+        self.delete_thread(thread_id)
+
+    def stats(self) -> dict[str, Any]:
+        return {"cached_threads": self.cached_threads(), "evictions": self.evictions}
+
+
+_shared: SessionCheckpointer | None = None
+_shared_lock = threading.Lock()
+
+
+def get_checkpointer() -> SessionCheckpointer:
+    """Process-wide checkpointer configured from CHECKPOINT_PATH / _IDLE_SECONDS."""
+    global _shared
+    with _shared_lock:
+        if _shared is None:
+            idle = os.getenv("CHECKPOINT_IDLE_SECONDS")
+            _shared = SessionCheckpointer(
+                path=os.getenv("CHECKPOINT_PATH", ".checkpoints.sqlite"),
+                idle_seconds=float(idle) if idle else 1800,
+            )
+    return _shared
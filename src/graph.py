@@ -1,10 +1,21 @@
-from langgraph.graph import StateGraph, END
+import os
+from typing import Any, AsyncIterator, Awaitable, Callable, Iterator, Literal
 
+from langchain_core.runnables import RunnableConfig, RunnableLambda
+from langgraph.checkpoint.base import BaseCheckpointSaver
+from langgraph.graph import StateGraph, START, END
+
+from src.ledger import arecord_turn, record_turn
+from src.llm.routing import stage
+from src.metrics import track
 from src.state import InterviewState
 from src.agents.technical import TechnicalEvaluator
 from src.agents.behavioral import BehavioralAnalyst
 from src.agents.strategy import StrategyDirector
 from src.agents.interviewer import InterviewerAgent
+from src.agents.fused import FusedAnalyzer
+
+Topology = Literal["split", "fused", "pipelined"]
 
 tech_agent = TechnicalEvaluator()
 behav_agent = BehavioralAnalyst()
@@ -12,34 +23,221 @@ strategy_agent = StrategyDirector()
 interviewer_agent = InterviewerAgent()
 
 
-def node_technical(state: InterviewState):
-    return tech_agent.analyze(state)
-
-
-def node_behavioral(state: InterviewState):
-    return behav_agent.analyze(state)
-
-
-def node_strategy(state: InterviewState):
-    return strategy_agent.decide(state)
-
-
-def node_interviewer(state: InterviewState):
-    return interviewer_agent.generate_response(state)
-
-
-workflow = StateGraph(InterviewState)
-
-workflow.add_node("technical", node_technical)
-workflow.add_node("behavioral", node_behavioral)
-workflow.add_node("strategy", node_strategy)
-workflow.add_node("interviewer", node_interviewer)
-
-workflow.set_entry_point("technical")
-
-workflow.add_edge("technical", "behavioral")
-workflow.add_edge("behavioral", "strategy")
-workflow.add_edge("strategy", "interviewer")
-workflow.add_edge("interviewer", END)
-
-app = workflow.compile()
+def timed(
+    name: str,
+    node: Callable[[InterviewState], dict[str, Any]],
+    anode: Callable[[InterviewState], Awaitable[dict[str, Any]]],
+) -> RunnableLambda:
+    """
+    Build a graph node from a sync/async pair of agent methods, reporting its
+    metrics (wall time, LLM usage, failures, model routes) under node_metrics.
+    LLM calls are routed for the state's interview stage. The graph
+    picks the sync variant for invoke/stream and the async one for
+    ainvoke/astream.
+    """
+
+    def wrapper(state: InterviewState) -> dict[str, Any]:
+        with track(name) as metrics, stage(state.get("interview_stage")):
+            result = node(state)
+        return {**result, "node_metrics": {name: metrics.model_dump()}}
+
+    async def awrapper(state: InterviewState) -> dict[str, Any]:
+        with track(name) as metrics, stage(state.get("interview_stage")):
+            result = await anode(state)
+        return {**result, "node_metrics": {name: metrics.model_dump()}}
+
+    return RunnableLambda(wrapper, afunc=awrapper, name=name)
+
+
+def critical_path_ms(node_metrics: dict[str, dict[str, Any]]) -> float:
+    """
+    Expected turn latency given per-node metrics: the two analyzers run
+    side by side, so only the slower of them sits on the critical path.
+    """
+    timings = {node: m.get("wall_ms", 0.0) for node, m in node_metrics.items()}
+    if "analysis" in timings:
+        return timings["analysis"] + timings.get("interviewer", 0.0)
+    if "draft" in timings:
+        # Pipelined: strategy only feeds the next turn.
+        analysis = max(
+            timings.get("technical", 0.0),
+            timings.get("behavioral", 0.0),
+            timings["draft"],
+        )
+        return analysis + timings.get("interviewer", 0.0)
+    analysis = max(timings.get("technical", 0.0), timings.get("behavioral", 0.0))
+    return analysis + timings.get("strategy", 0.0) + timings.get("interviewer", 0.0)
+
+
+def build_graph(
+    topology: Topology | None = None,
+    checkpointer: BaseCheckpointSaver | None = None,
+):
+    """
+    Compile the turn graph. GRAPH_TOPOLOGY (default "split") picks the
+    topology when none is given:
+    - "split": technical and behavioral analyzers in parallel, then the
+      strategy node and the interviewer (three LLM calls on the critical path);
+    - "fused": a single FusedAnalyzer call covering all three analyses, then
+      the interviewer (two);
+    - "pipelined": the reply is drafted from the previous turn's directive
+      while both analyzers run, and the strategy node only prepares the next
+      turn. The interviewer node commits the draft, or regenerates it with a
+      correction directive when a hallucination was detected (one LLM call
+      on the critical path, two when preempted).
+
+    With a checkpointer, the graph keeps each session's state itself, under
+    the thread id in the run config, and a turn's input only carries what
+    the turn changes.
+    """
+    topology = topology or os.getenv("GRAPH_TOPOLOGY", "split")
+    workflow = StateGraph(InterviewState)
+
+    if topology == "pipelined":
+        interviewer = timed(
+            "interviewer", interviewer_agent.commit, interviewer_agent.acommit
+        )
+    else:
+        interviewer = timed(
+            "interviewer",
+            interviewer_agent.generate_response,
+            interviewer_agent.agenerate_response,
+        )
+    workflow.add_node("interviewer", interviewer)
+    workflow.add_node("ledger", timed("ledger", record_turn, arecord_turn))
+
+    if topology == "fused":
+        fused_agent = FusedAnalyzer()
+        workflow.add_node(
+            "analysis", timed("analysis", fused_agent.analyze, fused_agent.aanalyze)
+        )
+        workflow.add_edge(START, "analysis")
+        workflow.add_edge("analysis", "interviewer")
+        workflow.add_edge("analysis", "ledger")
+    elif topology in ("split", "pipelined"):
+        workflow.add_node(
+            "technical", timed("technical", tech_agent.analyze, tech_agent.aanalyze)
+        )
+        workflow.add_node(
+            "behavioral",
+            timed("behavioral", behav_agent.analyze, behav_agent.aanalyze),
+        )
+        workflow.add_node(
+            "strategy",
+            timed("strategy", strategy_agent.decide, strategy_agent.adecide),
+        )
+
+        # Both analyzers read the same state and write disjoint keys, so they
+        # fan out from the entry point and the strategy node waits for both.
+        workflow.add_edge(START, "technical")
+        workflow.add_edge(START, "behavioral")
+        workflow.add_edge(["technical", "behavioral"], "strategy")
+        # Bookkeeping for the final report, off the path to the reply.
+        workflow.add_edge(["technical", "behavioral"], "ledger")
+
+        if topology == "pipelined":
+            workflow.add_node(
+                "draft",
+                timed("draft", interviewer_agent.draft, interviewer_agent.adraft),
+            )
+            workflow.add_edge(START, "draft")
+            workflow.add_edge(["technical", "behavioral", "draft"], "interviewer")
+            workflow.add_edge("strategy", END)
+        else:
+            workflow.add_edge("strategy", "interviewer")
+    else:
+        raise ValueError(f"Unknown graph topology: {topology!r}")
+
+    workflow.add_edge("interviewer", END)
+    workflow.add_edge("ledger", END)
+    return workflow.compile(checkpointer=checkpointer)
+
+
+# Stateless: callers pass the whole state in and keep the result.
+app = build_graph()
+
+_session_app = None
+
+
+def session_graph():
+    """The turn graph checkpointed to SQLite (src/checkpoint.py), built on first use."""
+    global _session_app
+    if _session_app is None:
+        from src.checkpoint import get_checkpointer
+
+        _session_app = build_graph(checkpointer=get_checkpointer())
+    return _session_app
+
+
+def session_config(thread_id: str) -> RunnableConfig:
+    return {"configurable": {"thread_id": thread_id}}
+
+
+def load_session(thread_id: str) -> InterviewState | None:
+    """The latest checkpointed state of a session, or None for a new one."""
+    snapshot = session_graph().get_state(session_config(thread_id))
+    return snapshot.values or None
+
+
+STREAM_MODES = ["updates", "messages", "values"]
+
+
+def _turn_event(mode: str, payload: Any) -> list[tuple[str, Any]]:
+    if mode == "messages":
+        chunk, metadata = payload
+        # Analyzer and strategy models stream too, but only the
+        # interviewer's tokens are meant for the candidate. In the pipelined
+        # topology a draft may still be thrown away, so it is not streamed;
+        # an accepted draft arrives with the interviewer's update.
+        if metadata.get("langgraph_node") != "interviewer":
+            return []
+        if isinstance(chunk.content, str) and chunk.content:
+            return [("token", chunk.content)]
+        return []
+    if mode == "updates":
+        return [("node", node) for node in payload]
+    return [("values", payload)]
+
+
+def _graph_for(thread_id: str | None) -> tuple[Any, RunnableConfig | None]:
+    if thread_id is None:
+        return app, None
+    return session_graph(), session_config(thread_id)
+
+
+def stream_turn(
+    state: InterviewState, thread_id: str | None = None
+) -> Iterator[tuple[str, Any]]:
+    """
+    Run one turn through the graph, yielding events as they happen:
+    ("node", name) when a node finishes, ("token", text) for every chunk of
+    the interviewer's reply and finally ("state", final_state).
+
+    With a thread_id the turn runs on the checkpointed graph, which resumes
+    the session's last state: `state` then only needs this turn's updates
+    (the new message, counters), or the full initial state for a new session.
+    """
+    graph, config = _graph_for(thread_id)
+    final_state = None
+    for mode, payload in graph.stream(state, config, stream_mode=STREAM_MODES):
+        for kind, value in _turn_event(mode, payload):
+            if kind == "values":
+                final_state = value
+            else:
+                yield kind, value
+    yield "state", final_state
+
+
+async def astream_turn(
+    state: InterviewState, thread_id: str | None = None
+) -> AsyncIterator[tuple[str, Any]]:
+    """Async counterpart of stream_turn, running every agent on the event loop."""
+    graph, config = _graph_for(thread_id)
+    final_state = None
+    async for mode, payload in graph.astream(state, config, stream_mode=STREAM_MODES):
+        for kind, value in _turn_event(mode, payload):
+            if kind == "values":
+                final_state = value
+            else:
+                yield kind, value
+    yield "state", final_state
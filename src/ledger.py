@@ -0,0 +1,215 @@
+from typing import Any
+
+from src.state import InterviewState, last_answer
+
+# Caps keep the ledger (and the feedback prompt built from it) bounded no
+# matter how long the interview runs.
+MAX_SKILLS = 15
+MAX_GAPS = 15
+MAX_OBSERVATIONS = 6
+MAX_QUOTE_CHARS = 300
+MAX_DETAILS = 6
+
+
+def empty_ledger() -> dict[str, Any]:
+    return {
+        "turns": 0,
+        "confirmed_skills": {},  # skill -> {"evidence", "turns"}
+        "gaps": {},  # topic -> {"quote", "errors", "missing", "hallucination", "turns"}
+        "soft_skills": {
+            "clarity_sum": 0,
+            "confidence_sum": 0,
+            "scored_turns": 0,
+            "honesty": {},
+            "engagement": {},
+            "off_topic": 0,
+            "candidate_questions": 0,
+            "observations": [],
+        },
+    }
+
+
+def _quote(text: str) -> str:
+    text = " ".join(text.split())
+    if len(text) <= MAX_QUOTE_CHARS:
+        return text
+    return text[: MAX_QUOTE_CHARS - 1] + "…"
+
+
+def _merge_details(existing: list[str], new: list[str]) -> list[str]:
+    merged = list(existing)
+    for item in new:
+        if item and item not in merged:
+            merged.append(item)
+    return merged[-MAX_DETAILS:]
+
+
+def _record_skill(skills: dict[str, Any], skill: str, answer: str, turn: int):
+    entry = skills.get(skill)
+    if entry is None:
+        if len(skills) >= MAX_SKILLS:
+            return
+        skills[skill] = {"evidence": _quote(answer), "turns": [turn]}
+    elif turn not in entry["turns"]:
+        entry["turns"].append(turn)
+
+
+def _record_gap(
+    gaps: dict[str, Any], topic: str, answer: str, tech: dict[str, Any], turn: int
+):
+    entry = gaps.get(topic)
+    if entry is None:
+        if len(gaps) >= MAX_GAPS:
+            return
+        entry = gaps[topic] = {
+            "quote": _quote(answer),
+            "errors": [],
+            "missing": [],
+            "hallucination": False,
+            "turns": [],
+        }
+    entry["errors"] = _merge_details(entry["errors"], tech.get("factual_errors") or [])
+    entry["missing"] = _merge_details(
+        entry["missing"], tech.get("missing_concepts") or []
+    )
+    entry["hallucination"] = entry["hallucination"] or bool(
+        tech.get("hallucination_detected")
+    )
+    if turn not in entry["turns"]:
+        entry["turns"].append(turn)
+
+
+def _count(counter: dict[str, int], value: Any):
+    if isinstance(value, str) and value:
+        key = value.strip().lower()
+        counter[key] = counter.get(key, 0) + 1
+
+
+def update_ledger(
+    ledger: dict[str, Any] | None,
+    turn: int,
+    answer: str,
+    tech: dict[str, Any] | None,
+    behav: dict[str, Any] | None,
+    topic: str | None = None,
+) -> dict[str, Any]:
+    """
+    Fold one turn's analyzer output into the ledger. Returns a new ledger;
+    the one passed in is left untouched. An analyzer's fallback result
+    (one with "error") is not evidence and is left out.
+    """
+    ledger = _copy(ledger or empty_ledger())
+    ledger["turns"] += 1
+    tech = tech if isinstance(tech, dict) and "error" not in tech else {}
+    behav = behav if isinstance(behav, dict) and "error" not in behav else {}
+
+    topics = [t for t in tech.get("topics_covered") or [] if t] or (
+        [topic] if topic else []
+    )
+    has_gap = bool(
+        tech.get("factual_errors")
+        or tech.get("missing_concepts")
+        or tech.get("hallucination_detected")
+    )
+    if tech.get("is_correct") and not tech.get("hallucination_detected"):
+        for skill in topics:
+            _record_skill(ledger["confirmed_skills"], skill, answer, turn)
+    if has_gap or tech.get("is_correct") is False:
+        for gap_topic in topics[:1] or ["Общее"]:
+            _record_gap(ledger["gaps"], gap_topic, answer, tech, turn)
+
+    soft = ledger["soft_skills"]
+    if isinstance(behav.get("clarity_score"), (int, float)):
+        soft["clarity_sum"] += behav["clarity_score"]
+        soft["confidence_sum"] += behav.get("confidence_score") or 0
+        soft["scored_turns"] += 1
+    _count(soft["honesty"], behav.get("honesty_flag"))
+    _count(soft["engagement"], behav.get("engagement_level"))
+    soft["off_topic"] += bool(behav.get("off_topic_attempt"))
+    soft["candidate_questions"] += bool(behav.get("candidate_question"))
+    if behav.get("observation"):
+        soft["observations"] = (
+            soft["observations"] + [f"[{turn}] {_quote(behav['observation'])}"]
+        )[-MAX_OBSERVATIONS:]
+    return ledger
+
+
+def _copy(ledger: dict[str, Any]) -> dict[str, Any]:
+    soft = ledger["soft_skills"]
+    return {
+        "turns": ledger["turns"],
+        "confirmed_skills": {
+            k: {**v, "turns": list(v["turns"])}
+            for k, v in ledger["confirmed_skills"].items()
+        },
+        "gaps": {
+            k: {**v, "turns": list(v["turns"])} for k, v in ledger["gaps"].items()
+        },
+        "soft_skills": {
+            **soft,
+            "honesty": dict(soft["honesty"]),
+            "engagement": dict(soft["engagement"]),
+        },
+    }
+
+
+def render_ledger(ledger: dict[str, Any]) -> str:
+    """Compact text form of the ledger for the feedback prompt."""
+    lines = [f"Turns analyzed: {ledger['turns']}", "", "CONFIRMED SKILLS:"]
+    for skill, entry in ledger["confirmed_skills"].items():
+        turns = ", ".join(map(str, entry["turns"]))
+        lines.append(f'- {skill} (turns {turns}): "{entry["evidence"]}"')
+    if not ledger["confirmed_skills"]:
+        lines.append("- none")
+
+    lines += ["", "KNOWLEDGE GAPS:"]
+    for topic, entry in ledger["gaps"].items():
+        turns = ", ".join(map(str, entry["turns"]))
+        lines.append(f'- {topic} (turns {turns}): candidate said "{entry["quote"]}"')
+        if entry["errors"]:
+            lines.append(f"  factual errors: {'; '.join(entry['errors'])}")
+        if entry["missing"]:
+            lines.append(f"  missing concepts: {'; '.join(entry['missing'])}")
+        if entry["hallucination"]:
+            lines.append("  hallucination detected")
+    if not ledger["gaps"]:
+        lines.append("- none")
+
+    soft = ledger["soft_skills"]
+    lines += ["", "SOFT SKILLS:"]
+    if soft["scored_turns"]:
+        lines.append(
+            f"- average clarity {soft['clarity_sum'] / soft['scored_turns']:.1f}/10, "
+            f"confidence {soft['confidence_sum'] / soft['scored_turns']:.1f}/10"
+        )
+    for field in ("honesty", "engagement"):
+        if soft[field]:
+            counts = ", ".join(f"{k}: {v}" for k, v in soft[field].items())
+            lines.append(f"- {field}: {counts}")
+    lines.append(
+        f"- off-topic attempts: {soft['off_topic']}, "
+        f"questions about the job: {soft['candidate_questions']}"
+    )
+    lines += [f"- {observation}" for observation in soft["observations"]]
+    return "\n".join(lines)
+
+
+def record_turn(state: InterviewState) -> dict[str, Any]:
+    """Graph node: add the turn the analyzers just evaluated to the ledger."""
+    answer = last_answer(state.get("messages", []))
+    if answer is None:
+        return {}
+    ledger = state.get("evidence_ledger") or empty_ledger()
+    ledger = update_ledger(
+        ledger,
+        state.get("turn_count") or ledger["turns"] + 1,
+        str(answer.content),
+        state.get("tech_analysis"),
+        state.get("behavioral_analysis"),
+        topic=state.get("current_topic"),
+    )
+    return {"evidence_ledger": ledger}
+
+
+async def arecord_turn(state: InterviewState) -> dict[str, Any]:
+    return record_turn(state)
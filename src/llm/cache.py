@@ -0,0 +1,169 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Any
+
+from langchain_core.caches import RETURN_VAL_TYPE, BaseCache
+from langchain_core.messages import message_to_dict, messages_from_dict
+from langchain_core.outputs import ChatGeneration, Generation
+
+
+def _encode(generations: RETURN_VAL_TYPE) -> str:
+    return json.dumps(
+        [
+            {"message": message_to_dict(g.message)}
+            if isinstance(g, ChatGeneration)
+            else {"text": g.text}
+            for g in generations
+        ],
+        ensure_ascii=False,
+    )
+
+
+def _decode(value: str) -> RETURN_VAL_TYPE:
+    generations = []
+    for item in json.loads(value):
+        if "message" in item:
+            (message,) = messages_from_dict([item["message"]])
+            generations.append(ChatGeneration(message=message))
+        else:
+            generations.append(Generation(text=item["text"]))
+    return generations
+
+
+class SQLiteLLMCache(BaseCache):
+    """
+    Content-addressed LLM response cache in a local SQLite file.
+
+    Entries are keyed by a hash of the fully rendered prompt plus the model
+    parameters (LangChain's llm_string), expire after `ttl` seconds and are
+    evicted least-recently-used first once `max_entries` is exceeded.
+    """
+
+    def __init__(
+        self,
+        path: str = ".llm_cache.sqlite",
+        ttl: float | None = 7 * 24 * 3600,
+        max_entries: int = 10_000,
+    ):
+        self.path = path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS llm_cache (
+                key TEXT PRIMARY KEY,
+                value TEXT NOT NULL,
+                created REAL NOT NULL,
+                accessed REAL NOT NULL
+            )
+            """
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS llm_cache_accessed ON llm_cache (accessed)"
+        )
+        self._conn.commit()
+
+    @staticmethod
+    def _key(prompt: str, llm_string: str) -> str:
+        return hashlib.sha256(f"{llm_string}\x00{prompt}".encode()).hexdigest()
+
+    def lookup(self, prompt: str, llm_string: str) -> RETURN_VAL_TYPE | None:
+        key = self._key(prompt, llm_string)
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, created FROM llm_cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            value, created = row
+            if self.ttl is not None and now - created > self.ttl:
+                self._conn.execute("DELETE FROM llm_cache WHERE key = ?", (key,))
+                self._conn.commit()
+                self.evictions += 1
+                self.misses += 1
+                return None
+            self._conn.execute(
+                "UPDATE llm_cache SET accessed = ? WHERE key = ?", (now, key)
+            )
+            self._conn.commit()
+            self.hits += 1
+        return _decode(value)
+
+    def update(self, prompt: str, llm_string: str, return_val: RETURN_VAL_TYPE) -> None:
+        key = self._key(prompt, llm_string)
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO llm_cache VALUES (?, ?, ?, ?)",
+                (key, _encode(return_val), now, now),
+            )
+            self._evict()
+            self._conn.commit()
+
+    def _evict(self):
+        (count,) = self._conn.execute("SELECT COUNT(*) FROM llm_cache").fetchone()
+        overflow = count - self.max_entries
+        if overflow > 0:
+            self._conn.execute(
+                "DELETE FROM llm_cache WHERE key IN "
+                "(SELECT key FROM llm_cache ORDER BY accessed LIMIT ?)",
+                (overflow,),
+            )
+            self.evictions += overflow
+
+    def clear(self, **kwargs: Any) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM llm_cache")
+            self._conn.commit()
+
+    def stats(self) -> dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+        }
+
+
+_shared_cache: SQLiteLLMCache | None = None
+
+
+def get_shared_cache() -> SQLiteLLMCache:
+    """Process-wide cache configured from LLM_CACHE_PATH / _TTL / _MAX_ENTRIES."""
+    global _shared_cache
+    if _shared_cache is None:
+        ttl = os.getenv("LLM_CACHE_TTL")
+        _shared_cache = SQLiteLLMCache(
+            path=os.getenv("LLM_CACHE_PATH", ".llm_cache.sqlite"),
+            ttl=float(ttl) if ttl else 7 * 24 * 3600,
+            max_entries=int(os.getenv("LLM_CACHE_MAX_ENTRIES", "10000")),
+        )
+    return _shared_cache
+
+
+def cache_enabled_for(agent: str, temperature: float) -> bool:
+    """
+    LLM_CACHE selects which agents are cached: "auto" (default) caches only
+    deterministic agents (temperature 0), "all" / "off" do what they say, and
+    a comma-separated list such as "technical,feedback" names agents.
+    """
+    setting = os.getenv("LLM_CACHE", "auto").strip().lower()
+    if setting == "auto":
+        return temperature == 0.0
+    if setting == "all":
+        return True
+    if setting in ("off", "none", ""):
+        return False
+    return agent in {name.strip() for name in setting.split(",")}
@@ -0,0 +1,251 @@
+import asyncio
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, AsyncIterator, Iterator, Literal
+
+from langchain_core.messages import AIMessage, AIMessageChunk, BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+
+from src.llm.wrappers import DelegatingChatModel
+
+_active_turn: ContextVar[tuple["Cassette", str] | None] = ContextVar(
+    "cassette_turn", default=None
+)
+
+
+class CassetteMiss(LookupError):
+    """Replay asked for a call that was never recorded."""
+
+
+def _prompt_sha(messages: list[BaseMessage]) -> str:
+    digest = hashlib.sha256()
+    for m in messages:
+        digest.update(f"{m.type}:{m.content}\n".encode())
+    return digest.hexdigest()[:16]
+
+
+class Cassette:
+    """
+    Recorded LLM traffic of one interview session, stored as
+    <directory>/<session_id>.json.
+
+    Calls are keyed by turn, agent and call index within that turn, so the
+    parallel analyzers replay correctly whatever order they run in. In
+    "replay" mode the recorded responses are served back either after their
+    original latency or immediately (latency="zero").
+
+    resume=True continues recording a session already on disk, if any,
+    instead of starting over; a turn recorded again replaces its earlier
+    calls.
+    """
+
+    def __init__(
+        self,
+        session_id: str,
+        directory: str = "cassettes",
+        mode: Literal["record", "replay"] = "record",
+        latency: Literal["original", "zero"] = "original",
+        resume: bool = False,
+    ):
+        self.session_id = session_id
+        self.path = os.path.join(directory, f"{session_id}.json")
+        self.mode = mode
+        self.latency = latency
+        self.data: dict[str, Any] = {
+            "session_id": session_id,
+            "inputs": {},
+            "calls": {},
+        }
+        if mode == "replay" or (resume and os.path.exists(self.path)):
+            with open(self.path, "r", encoding="utf-8") as f:
+                self.data = json.load(f)
+        self.replayed = 0
+        self.misses = 0
+        self.drift = 0  # replayed calls whose prompt no longer matches the recording
+        self._counters: dict[tuple[str, str], int] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def inputs(self) -> dict[str, str]:
+        """Candidate messages by turn, as recorded."""
+        return self.data["inputs"]
+
+    @contextmanager
+    def turn(self, turn: int | str, user_message: str | None = None):
+        """Attribute every LLM call made inside the block to `turn`."""
+        key = str(turn)
+        if self.mode == "record":
+            self._forget(key)
+            if user_message is not None:
+                self.data["inputs"][key] = user_message
+        token = _active_turn.set((self, key))
+        try:
+            yield self
+        finally:
+            _active_turn.reset(token)
+            if self.mode == "record":
+                self.save()
+
+    def _forget(self, turn: str):
+        """Drop what an earlier run recorded for `turn`."""
+        prefix = f"{turn}/"
+        with self._lock:
+            calls = self.data["calls"]
+            for key in [key for key in calls if key.startswith(prefix)]:
+                del calls[key]
+            for counter in [c for c in self._counters if c[0] == turn]:
+                del self._counters[counter]
+
+    def _call_key(self, turn: str, agent: str) -> str:
+        with self._lock:
+            index = self._counters.get((turn, agent), 0)
+            self._counters[turn, agent] = index + 1
+        return f"{turn}/{agent}/{index}"
+
+    def record(
+        self,
+        turn: str,
+        agent: str,
+        messages: list[BaseMessage],
+        content: str,
+        latency: float,
+    ):
+        key = self._call_key(turn, agent)
+        with self._lock:
+            self.data["calls"][key] = {
+                "prompt_sha": _prompt_sha(messages),
+                "content": content,
+                "latency": round(latency, 4),
+            }
+
+    def lookup(
+        self, turn: str, agent: str, messages: list[BaseMessage]
+    ) -> tuple[str, float]:
+        key = self._call_key(turn, agent)
+        call = self.data["calls"].get(key)
+        with self._lock:
+            if call is None:
+                self.misses += 1
+                raise CassetteMiss(f"No recorded call {key} in {self.path}")
+            self.replayed += 1
+            if call["prompt_sha"] != _prompt_sha(messages):
+                self.drift += 1
+        delay = call["latency"] if self.latency == "original" else 0.0
+        return call["content"], delay
+
+    def save(self):
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        with self._lock:
+            payload = json.dumps(self.data, indent=2, ensure_ascii=False)
+        with open(self.path, "w", encoding="utf-8") as f:
+            f.write(payload)
+
+    def stats(self) -> dict[str, int]:
+        return {"replayed": self.replayed, "misses": self.misses, "drift": self.drift}
+
+
+def _result(content: str) -> ChatResult:
+    return ChatResult(generations=[ChatGeneration(message=AIMessage(content=content))])
+
+
+def _chunks(content: str) -> Iterator[ChatGenerationChunk]:
+    for token in re.split(r"(\s+)", content):
+        if token:
+            yield ChatGenerationChunk(message=AIMessageChunk(content=token))
+
+
+class CassetteChatModel(DelegatingChatModel):
+    """
+    Records or replays calls while a Cassette.turn() block is active and
+    passes straight through to `inner` otherwise.
+    """
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs: Any):
+        active = _active_turn.get()
+        if active is None:
+            return super()._generate(messages, stop=stop, **kwargs)
+        cassette, turn = active
+        if cassette.mode == "replay":
+            content, delay = cassette.lookup(turn, self.agent, messages)
+            time.sleep(delay)
+            return _result(content)
+
+        started = time.perf_counter()
+        result = super()._generate(messages, stop=stop, **kwargs)
+        content = result.generations[0].message.content
+        cassette.record(
+            turn, self.agent, messages, content, time.perf_counter() - started
+        )
+        return result
+
+    async def _agenerate(self, messages, stop=None, run_manager=None, **kwargs: Any):
+        active = _active_turn.get()
+        if active is None:
+            return await super()._agenerate(messages, stop=stop, **kwargs)
+        cassette, turn = active
+        if cassette.mode == "replay":
+            content, delay = cassette.lookup(turn, self.agent, messages)
+            await asyncio.sleep(delay)
+            return _result(content)
+
+        started = time.perf_counter()
+        result = await super()._agenerate(messages, stop=stop, **kwargs)
+        content = result.generations[0].message.content
+        cassette.record(
+            turn, self.agent, messages, content, time.perf_counter() - started
+        )
+        return result
+
+    def _stream(
+        self, messages, stop=None, run_manager=None, **kwargs: Any
+    ) -> Iterator[ChatGenerationChunk]:
+        active = _active_turn.get()
+        if active is None:
+            yield from super()._stream(messages, stop=stop, **kwargs)
+            return
+        cassette, turn = active
+        if cassette.mode == "replay":
+            content, delay = cassette.lookup(turn, self.agent, messages)
+            time.sleep(delay)
+            yield from _chunks(content)
+            return
+
+        started = time.perf_counter()
+        parts = []
+        for chunk in super()._stream(messages, stop=stop, **kwargs):
+            parts.append(chunk.message.content)
+            yield chunk
+        cassette.record(
+            turn, self.agent, messages, "".join(parts), time.perf_counter() - started
+        )
+
+    async def _astream(
+        self, messages, stop=None, run_manager=None, **kwargs: Any
+    ) -> AsyncIterator[ChatGenerationChunk]:
+        active = _active_turn.get()
+        if active is None:
+            async for chunk in super()._astream(messages, stop=stop, **kwargs):
+                yield chunk
+            return
+        cassette, turn = active
+        if cassette.mode == "replay":
+            content, delay = cassette.lookup(turn, self.agent, messages)
+            await asyncio.sleep(delay)
+            for chunk in _chunks(content):
+                yield chunk
+            return
+
+        started = time.perf_counter()
+        parts = []
+        async for chunk in super()._astream(messages, stop=stop, **kwargs):
+            parts.append(chunk.message.content)
+            yield chunk
+        cassette.record(
+            turn, self.agent, messages, "".join(parts), time.perf_counter() - started
+        )
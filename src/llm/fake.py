@@ -0,0 +1,212 @@
+import asyncio
+import hashlib
+import itertools
+import json
+import random
+import re
+import time
+import types
+from typing import Any, AsyncIterator, Iterator, Literal, Union, get_args, get_origin
+
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk, BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+from pydantic import BaseModel, PrivateAttr
+
+FAKE_TOPICS = ["Python", "SQL", "Git", "HTTP", "Алгоритмы", "ООП"]
+
+FAKE_QUESTIONS = [
+    "Хорошо. Расскажите, как работают генераторы в Python?",
+    "Понятно. Чем отличается список от кортежа?",
+    "Спасибо. Как бы вы нашли медленный SQL-запрос?",
+    "Отлично. Что происходит при git rebase?",
+    "Интересно. Как устроен словарь в Python внутри?",
+]
+
+_NUMBER = re.compile(r"(?<![\d.])-?\d+(?:\.\d+)?")
+_QUOTED = re.compile(r"'([^']+)'")
+
+
+def _bounds(metadata: list[Any], description: str | None):
+    lo = next((m.ge for m in metadata if hasattr(m, "ge")), None)
+    hi = next((m.le for m in metadata if hasattr(m, "le")), None)
+    if lo is None or hi is None:
+        # Ranges like "1-10 score" or "-1 (easier), 0 (same), 1 (harder)"
+        # only live in the field description.
+        numbers = [float(n) for n in _NUMBER.findall(description or "")]
+        if len(numbers) >= 2:
+            lo = min(numbers) if lo is None else lo
+            hi = max(numbers) if hi is None else hi
+    return (0 if lo is None else lo), (1 if hi is None else hi)
+
+
+def _sample(annotation: Any, name: str, field: Any, rng: random.Random) -> Any:
+    origin = get_origin(annotation)
+    if origin is Literal:
+        return rng.choice(get_args(annotation))
+    if origin in (Union, types.UnionType):
+        options = [a for a in get_args(annotation) if a is not type(None)]
+        return _sample(options[0], name, field, rng)
+    if origin is list:
+        (item,) = get_args(annotation)
+        return [_sample(item, name, None, rng) for _ in range(rng.randint(0, 2))]
+    if isinstance(annotation, type) and issubclass(annotation, BaseModel):
+        return sample_schema(annotation, rng)
+
+    metadata = field.metadata if field is not None else []
+    description = field.description if field is not None else None
+    if annotation is bool:
+        return rng.random() < 0.5
+    if annotation is int:
+        lo, hi = _bounds(metadata, description)
+        return rng.randint(int(lo), int(hi))
+    if annotation is float:
+        lo, hi = _bounds(metadata, description)
+        return round(rng.uniform(lo, hi), 2)
+    if name in ("topic", "skill_name", "topics_covered", "missing_concepts"):
+        return rng.choice(FAKE_TOPICS)
+    # Enumerations such as "'honest', 'evasive', or 'deceptive'" are plain
+    # str fields with the allowed values quoted in the description.
+    choices = _QUOTED.findall(description or "")
+    if choices:
+        return rng.choice(choices)
+    return f"fake {name}"
+
+
+def sample_schema(schema: type[BaseModel], rng: random.Random) -> dict[str, Any]:
+    """Build a dict that validates against `schema`, drawing values from rng."""
+    return {
+        name: _sample(field.annotation, name, field, rng)
+        for name, field in schema.model_fields.items()
+    }
+
+
+class FakeBackendError(RuntimeError):
+    """A failure injected by FakeChatModel's `error_rate`."""
+
+
+# Numbers model instances, so each draws its own (reproducible) faults.
+_instances = itertools.count()
+
+
+class FakeChatModel(BaseChatModel):
+    """
+    Offline chat model for load tests and profiling. Replies are deterministic
+    for a given prompt and seed: schema-valid JSON when `response_schema` is set,
+    otherwise a canned interviewer question. Each call waits `latency` seconds
+    plus up to `jitter` seconds either way, plus `prompt_latency` seconds per
+    1000 prompt characters to mimic prefill cost.
+
+    `fixed_fields` pins top-level schema fields to given values instead of
+    sampling them, for benchmarks that need steadier analyses.
+
+    For fault tests a share of calls fails (`error_rate`) or stalls for
+    `stall_seconds` before answering (`stall_rate`). Faults are drawn per
+    call rather than per prompt, so a retried or hedged call can succeed.
+    Like a real client, the model gives up with TimeoutError once a call
+    has run `timeout` seconds.
+    """
+
+    model: str = "fake"
+    temperature: float = 0.0
+    response_schema: type[BaseModel] | None = None
+    latency: float = 0.0
+    jitter: float = 0.0
+    prompt_latency: float = 0.0
+    error_rate: float = 0.0
+    stall_rate: float = 0.0
+    stall_seconds: float = 30.0
+    timeout: float | None = None
+    fixed_fields: dict[str, Any] = {}
+    seed: int = 0
+
+    _faults: random.Random = PrivateAttr(default_factory=random.Random)
+
+    def model_post_init(self, context: Any) -> None:
+        super().model_post_init(context)
+        self._faults.seed(f"{self.seed}:{next(_instances)}")
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake"
+
+    def _rng(self, messages: list[BaseMessage]) -> random.Random:
+        digest = hashlib.sha256(str(self.seed).encode())
+        for m in messages:
+            digest.update(f"{m.type}:{m.content}".encode())
+        return random.Random(digest.hexdigest())
+
+    def _reply(self, rng: random.Random) -> str:
+        if self.response_schema is None:
+            return rng.choice(FAKE_QUESTIONS)
+        reply = sample_schema(self.response_schema, rng)
+        for name, value in self.fixed_fields.items():
+            if name in reply:
+                reply[name] = value
+        return json.dumps(reply, ensure_ascii=False)
+
+    def _delay(self, messages: list[BaseMessage], rng: random.Random) -> float:
+        prompt_chars = sum(len(str(m.content)) for m in messages)
+        prefill = self.prompt_latency * prompt_chars / 1000
+        return max(0.0, self.latency + prefill + rng.uniform(-self.jitter, self.jitter))
+
+    def _fault(self) -> tuple[float, bool]:
+        """Extra delay for this call and whether it then fails."""
+        draw = self._faults.random()
+        if draw < self.error_rate:
+            return 0.0, True
+        if draw < self.error_rate + self.stall_rate:
+            return self.stall_seconds, False
+        return 0.0, False
+
+    def _wait(self, seconds: float) -> float:
+        """How long a call that takes `seconds` runs before it ends or is cut off."""
+        return seconds if self.timeout is None else min(seconds, self.timeout)
+
+    def _outcome(self, seconds: float, fail: bool):
+        if self.timeout is not None and seconds > self.timeout:
+            raise TimeoutError(f"fake call cut off after {self.timeout}s")
+        if fail:
+            raise FakeBackendError("injected failure")
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs: Any):
+        rng = self._rng(messages)
+        stall, fail = self._fault()
+        seconds = self._delay(messages, rng) + stall
+        time.sleep(self._wait(seconds))
+        self._outcome(seconds, fail)
+        message = AIMessage(content=self._reply(rng))
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    async def _agenerate(self, messages, stop=None, run_manager=None, **kwargs: Any):
+        rng = self._rng(messages)
+        stall, fail = self._fault()
+        seconds = self._delay(messages, rng) + stall
+        await asyncio.sleep(self._wait(seconds))
+        self._outcome(seconds, fail)
+        message = AIMessage(content=self._reply(rng))
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    def _stream(
+        self, messages, stop=None, run_manager=None, **kwargs: Any
+    ) -> Iterator[ChatGenerationChunk]:
+        rng = self._rng(messages)
+        stall, fail = self._fault()
+        seconds = self._delay(messages, rng) + stall
+        time.sleep(self._wait(seconds))
+        self._outcome(seconds, fail)
+        for token in re.split(r"(\s+)", self._reply(rng)):
+            if token:
+                yield ChatGenerationChunk(message=AIMessageChunk(content=token))
+
+    async def _astream(
+        self, messages, stop=None, run_manager=None, **kwargs: Any
+    ) -> AsyncIterator[ChatGenerationChunk]:
+        rng = self._rng(messages)
+        stall, fail = self._fault()
+        seconds = self._delay(messages, rng) + stall
+        await asyncio.sleep(self._wait(seconds))
+        self._outcome(seconds, fail)
+        for token in re.split(r"(\s+)", self._reply(rng)):
+            if token:
+                yield ChatGenerationChunk(message=AIMessageChunk(content=token))
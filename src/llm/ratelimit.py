@@ -0,0 +1,448 @@
+import asyncio
+import heapq
+import itertools
+import os
+import sqlite3
+import threading
+import time
+from contextlib import asynccontextmanager, contextmanager
+from contextvars import ContextVar
+from typing import Any, AsyncIterator, Iterator
+
+from langchain_core.messages import BaseMessage
+from langchain_core.outputs import ChatResult
+
+from src.llm.wrappers import DelegatingChatModel
+from src.metrics import current
+from src.utils.tokens import estimate_tokens
+
+# Priority classes, highest first. The interviewer's reply is what a live
+# candidate waits for; feedback reports and speculative replies can wait.
+PRIORITIES = ("interactive", "analysis", "background")
+AGENT_PRIORITIES = {
+    "interviewer": "interactive",
+    "feedback": "background",
+    "feedback_map": "background",
+}  # every other agent: "analysis"
+
+# Share of each bucket a class has to leave in it. Within a process the
+# queue already serves higher classes first; the reserves keep lower
+# classes from draining a bucket that other processes share.
+RESERVES = {"interactive": 0.0, "analysis": 0.1, "background": 0.3}
+
+_priority: ContextVar[str | None] = ContextVar("llm_priority", default=None)
+
+
+@contextmanager
+def priority(name: str) -> Iterator[None]:
+    """Run the LLM calls made inside the block in priority class `name`."""
+    if name not in PRIORITIES:
+        raise ValueError(f"Unknown priority: {name}. Known: {list(PRIORITIES)}")
+    token = _priority.set(name)
+    try:
+        yield
+    finally:
+        _priority.reset(token)
+
+
+def priority_for(agent: str) -> str:
+    return _priority.get() or AGENT_PRIORITIES.get(agent, "analysis")
+
+
+class TokenBucket:
+    """
+    Requests and tokens per minute as two token buckets, refilled
+    continuously and holding at most a minute's worth. A limit of None is
+    not enforced.
+    """
+
+    def __init__(self, rpm: float | None = None, tpm: float | None = None):
+        self.limits = {"requests": rpm, "tokens": tpm}
+        self._levels = {name: limit for name, limit in self.limits.items() if limit}
+        self._updated = time.time()
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def _state(self) -> Iterator[dict[str, float]]:
+        with self._lock:
+            self._refill(self._levels, self._updated)
+            self._updated = time.time()
+            yield self._levels
+
+    def _refill(self, levels: dict[str, float], updated: float):
+        elapsed = max(0.0, time.time() - updated)
+        for name, level in levels.items():
+            limit = self.limits[name]
+            levels[name] = min(limit, level + elapsed * limit / 60)
+
+    def take(self, tokens: float, reserve: float = 0.0) -> float:
+        """
+        Take one request and `tokens` tokens if the buckets hold them on top
+        of `reserve` (a share of capacity to leave), returning 0. Otherwise
+        take nothing and return the seconds until they will.
+        """
+        cost = {"requests": 1, "tokens": tokens}
+        wait = 0.0
+        with self._state() as levels:
+            for name, level in levels.items():
+                limit = self.limits[name]
+                # A call bigger than the bucket goes once it is full and
+                # leaves it in debt.
+                need = min(cost[name], limit * (1 - reserve)) + limit * reserve
+                if level < need:
+                    wait = max(wait, (need - level) * 60 / limit)
+            if wait == 0.0:
+                for name in levels:
+                    levels[name] -= cost[name]
+        return wait
+
+    def reset(self):
+        """Fill the buckets back up."""
+        with self._state() as levels:
+            levels.update({name: self.limits[name] for name in levels})
+
+    def settle(self, tokens: float):
+        """Charge (or refund, if negative) tokens once a call's real size is known."""
+        if not self.limits["tokens"]:
+            return
+        with self._state() as levels:
+            levels["tokens"] -= tokens
+
+
+class SqliteTokenBucket(TokenBucket):
+    """TokenBucket kept in a SQLite file, shared by every process using it."""
+
+    def __init__(
+        self,
+        path: str = ".ratelimit.sqlite",
+        rpm: float | None = None,
+        tpm: float | None = None,
+    ):
+        super().__init__(rpm, tpm)
+        self.path = path
+        self._conn = sqlite3.connect(
+            path, check_same_thread=False, isolation_level=None, timeout=30
+        )
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS buckets (
+                name TEXT PRIMARY KEY,
+                level REAL NOT NULL,
+                updated REAL NOT NULL
+            )
+            """
+        )
+
+    @contextmanager
+    def _state(self) -> Iterator[dict[str, float]]:
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                rows = self._conn.execute(
+                    "SELECT name, level, updated FROM buckets"
+                ).fetchall()
+                stored = {name: level for name, level, _ in rows}
+                updated = max((row[2] for row in rows), default=time.time())
+                levels = {
+                    name: stored.get(name, limit)
+                    for name, limit in self.limits.items()
+                    if limit
+                }
+                self._refill(levels, updated)
+                yield levels
+                now = time.time()
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO buckets VALUES (?, ?, ?)",
+                    [(name, level, now) for name, level in levels.items()],
+                )
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+
+
+class _Ticket:
+    __slots__ = ("rank", "seq", "tokens", "reserve", "wake")
+
+    def __init__(self, rank: int, seq: int, tokens: float, reserve: float, wake):
+        self.rank = rank
+        self.seq = seq
+        self.tokens = tokens
+        self.reserve = reserve
+        self.wake = wake
+
+    def __lt__(self, other: "_Ticket") -> bool:
+        return (self.rank, self.seq) < (other.rank, other.seq)
+
+
+class Grant:
+    """A granted call slot. Set `tokens` to the call's real size before release."""
+
+    __slots__ = ("priority", "estimated", "tokens", "queue_wait_ms")
+
+    def __init__(self, priority: str, estimated: float, queue_wait_ms: float):
+        self.priority = priority
+        self.estimated = estimated
+        self.tokens: float | None = None
+        self.queue_wait_ms = queue_wait_ms
+
+
+class RateLimiter:
+    """
+    Admission control for LLM calls: requests and tokens per minute
+    (TokenBucket, optionally shared across processes) plus a cap on calls
+    in flight.
+
+    Waiting calls queue by priority class, then arrival; only the head of
+    the queue may take from the buckets, so a burst of background calls
+    cannot starve a live candidate's reply. A call is charged its prompt
+    plus `completion_tokens` up front and settled to its real size after.
+
+    Works for sync and async callers alike: both wait on the same queue.
+    """
+
+    # Longest a waiting head sleeps before looking at the buckets again;
+    # other processes sharing the buckets don't wake it.
+    poll_seconds = 0.5
+
+    def __init__(
+        self,
+        bucket: TokenBucket | None = None,
+        max_concurrency: int | None = None,
+        completion_tokens: int = 256,
+    ):
+        self.bucket = bucket or TokenBucket()
+        self.max_concurrency = max_concurrency
+        self.completion_tokens = completion_tokens
+        self.active = 0
+        self._queue: list[_Ticket] = []
+        self._seq = itertools.count()
+        self._lock = threading.Lock()
+        self._granted = dict.fromkeys(PRIORITIES, 0)
+        self._wait_ms = dict.fromkeys(PRIORITIES, 0.0)
+        self._max_wait_ms = dict.fromkeys(PRIORITIES, 0.0)
+
+    @property
+    def waiting(self) -> int:
+        """Calls queued for a slot right now."""
+        with self._lock:
+            return len(self._queue)
+
+    def _enqueue(self, priority: str, tokens: float, wake) -> _Ticket:
+        rank = PRIORITIES.index(priority)
+        ticket = _Ticket(rank, next(self._seq), tokens, RESERVES[priority], wake)
+        with self._lock:
+            heapq.heappush(self._queue, ticket)
+            if self._queue[0] is ticket:
+                self._wake_head()
+        return ticket
+
+    def _wake_head(self):
+        # Called with self._lock held.
+        if self._queue:
+            self._queue[0].wake()
+
+    def _try(self, ticket: _Ticket) -> float | None:
+        """0 when granted, else seconds to sleep (None: until woken)."""
+        with self._lock:
+            if self._queue[0] is not ticket:
+                return None
+            if self.max_concurrency and self.active >= self.max_concurrency:
+                return None
+            wait = self.bucket.take(ticket.tokens, ticket.reserve)
+            if wait:
+                return min(wait, self.poll_seconds)
+            heapq.heappop(self._queue)
+            self.active += 1
+            self._wake_head()
+            return 0.0
+
+    def _abandon(self, ticket: _Ticket):
+        with self._lock:
+            if ticket in self._queue:
+                self._queue.remove(ticket)
+                heapq.heapify(self._queue)
+                self._wake_head()
+
+    def _granted_after(self, priority: str, tokens: float, started: float) -> Grant:
+        waited_ms = (time.perf_counter() - started) * 1000
+        with self._lock:
+            self._granted[priority] += 1
+            self._wait_ms[priority] += waited_ms
+            self._max_wait_ms[priority] = max(self._max_wait_ms[priority], waited_ms)
+        metrics = current()
+        if metrics is not None:
+            metrics.queue_wait_ms += round(waited_ms, 1)
+        return Grant(priority, tokens, waited_ms)
+
+    def release(self, grant: Grant):
+        if grant.tokens is not None:
+            self.bucket.settle(grant.tokens - grant.estimated)
+        with self._lock:
+            self.active -= 1
+            self._wake_head()
+
+    @contextmanager
+    def slot(self, priority: str, prompt_tokens: int) -> Iterator[Grant]:
+        """Wait (blocking) for a call slot and hold it for the block."""
+        tokens = prompt_tokens + self.completion_tokens
+        started = time.perf_counter()
+        event = threading.Event()
+        ticket = self._enqueue(priority, tokens, event.set)
+        try:
+            while (wait := self._try(ticket)) != 0.0:
+                event.wait(wait)
+                event.clear()
+        except BaseException:
+            self._abandon(ticket)
+            raise
+        grant = self._granted_after(priority, tokens, started)
+        try:
+            yield grant
+        finally:
+            self.release(grant)
+
+    @asynccontextmanager
+    async def aslot(self, priority: str, prompt_tokens: int) -> AsyncIterator[Grant]:
+        """Wait for a call slot without blocking the event loop."""
+        tokens = prompt_tokens + self.completion_tokens
+        started = time.perf_counter()
+        loop = asyncio.get_running_loop()
+        event = asyncio.Event()
+        ticket = self._enqueue(
+            priority, tokens, lambda: loop.call_soon_threadsafe(event.set)
+        )
+        try:
+            while (wait := self._try(ticket)) != 0.0:
+                try:
+                    await asyncio.wait_for(event.wait(), wait)
+                except asyncio.TimeoutError:
+                    pass
+                event.clear()
+        except BaseException:
+            self._abandon(ticket)
+            raise
+        grant = self._granted_after(priority, tokens, started)
+        try:
+            yield grant
+        finally:
+            self.release(grant)
+
+    def reset(self):
+        """Refill the buckets and zero the counters, e.g. between benchmark runs."""
+        self.bucket.reset()
+        with self._lock:
+            self._granted = dict.fromkeys(PRIORITIES, 0)
+            self._wait_ms = dict.fromkeys(PRIORITIES, 0.0)
+            self._max_wait_ms = dict.fromkeys(PRIORITIES, 0.0)
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                "active": self.active,
+                "waiting": len(self._queue),
+                **{
+                    name: {
+                        "granted": self._granted[name],
+                        "avg_wait_ms": round(
+                            self._wait_ms[name] / self._granted[name], 1
+                        )
+                        if self._granted[name]
+                        else 0.0,
+                        "max_wait_ms": round(self._max_wait_ms[name], 1),
+                    }
+                    for name in PRIORITIES
+                },
+            }
+
+
+def _prompt_tokens(messages: list[BaseMessage]) -> int:
+    return estimate_tokens("".join(str(m.content) for m in messages))
+
+
+def _result_tokens(result: ChatResult) -> int:
+    message = result.generations[0].message
+    usage = getattr(message, "usage_metadata", None)
+    if usage:
+        return usage.get("input_tokens", 0) + usage.get("output_tokens", 0)
+    return estimate_tokens(str(message.content))
+
+
+class RateLimitedChatModel(DelegatingChatModel):
+    """
+    Passes every call to `inner` through a RateLimiter slot in the agent's
+    priority class. Sits under the response cache, so cache hits are free.
+    """
+
+    limiter: Any = None
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs: Any):
+        prompt = _prompt_tokens(messages)
+        with self.limiter.slot(priority_for(self.agent), prompt) as grant:
+            result = super()._generate(messages, stop=stop, **kwargs)
+            grant.tokens = prompt + _result_tokens(result)
+        return result
+
+    async def _agenerate(self, messages, stop=None, run_manager=None, **kwargs: Any):
+        prompt = _prompt_tokens(messages)
+        async with self.limiter.aslot(priority_for(self.agent), prompt) as grant:
+            result = await super()._agenerate(messages, stop=stop, **kwargs)
+            grant.tokens = prompt + _result_tokens(result)
+        return result
+
+    def _stream(self, messages, stop=None, run_manager=None, **kwargs: Any):
+        prompt = _prompt_tokens(messages)
+        with self.limiter.slot(priority_for(self.agent), prompt) as grant:
+            completion = 0
+            for chunk in super()._stream(messages, stop=stop, **kwargs):
+                completion += estimate_tokens(str(chunk.message.content))
+                yield chunk
+            grant.tokens = prompt + completion
+
+    async def _astream(self, messages, stop=None, run_manager=None, **kwargs: Any):
+        prompt = _prompt_tokens(messages)
+        async with self.limiter.aslot(priority_for(self.agent), prompt) as grant:
+            completion = 0
+            async for chunk in super()._astream(messages, stop=stop, **kwargs):
+                completion += estimate_tokens(str(chunk.message.content))
+                yield chunk
+            grant.tokens = prompt + completion
+
+
+_shared: RateLimiter | None = None
+_shared_lock = threading.Lock()
+
+
+def set_rate_limiter(limiter: RateLimiter | None):
+    """
+    Use `limiter` for every model created from now on instead of the one
+    from the environment. Like use_backend, call it before src.graph is
+    imported.
+    """
+    global _shared
+    with _shared_lock:
+        _shared = limiter
+
+
+def get_rate_limiter() -> RateLimiter | None:
+    """
+    Process-wide limiter from LLM_RPM / LLM_TPM / LLM_MAX_CONCURRENCY, or
+    None when none of them is set. With LLM_RATE_LIMIT_PATH the buckets
+    live in that SQLite file and are shared with other processes.
+    """
+    global _shared
+    if _shared is not None:
+        return _shared
+    rpm = float(os.getenv("LLM_RPM", "0")) or None
+    tpm = float(os.getenv("LLM_TPM", "0")) or None
+    concurrency = int(os.getenv("LLM_MAX_CONCURRENCY", "0")) or None
+    if not (rpm or tpm or concurrency):
+        return None
+    with _shared_lock:
+        if _shared is None:
+            path = os.getenv("LLM_RATE_LIMIT_PATH")
+            bucket = (
+                SqliteTokenBucket(path, rpm, tpm) if path else TokenBucket(rpm, tpm)
+            )
+            _shared = RateLimiter(bucket, max_concurrency=concurrency)
+    return _shared
@@ -0,0 +1,144 @@
+import math
+import os
+from typing import Any, Callable
+
+from langchain_core.language_models.chat_models import BaseChatModel
+from pydantic import BaseModel
+
+from src.llm.cache import cache_enabled_for, get_shared_cache
+from src.llm.cassette import CassetteChatModel
+from src.llm.ratelimit import RateLimitedChatModel, get_rate_limiter
+from src.llm.resilience import ResilientChatModel, policy_for
+from src.llm.routing import get_router, parse_pairs, routed_model
+from src.metrics import metrics_handler
+
+# factory(model_name, temperature, schema, **options) -> chat model. With
+# LLM_RESILIENCE on, options include `timeout`: the agent's latency budget
+# in seconds (None: no budget), to pass on to the backend's client so a
+# call the agent stopped waiting for doesn't keep running.
+BackendFactory = Callable[..., BaseChatModel]
+
+_BACKENDS: dict[str, BackendFactory] = {}
+_active: dict[str, Any] = {"name": None, "options": {}}
+
+
+def register_backend(name: str, factory: BackendFactory):
+    _BACKENDS[name] = factory
+
+
+def use_backend(name: str, **options: Any):
+    """
+    Select the backend for every model created from now on, overriding the
+    LLM_BACKEND env variable. Agents build their models in __init__, so call
+    this before src.graph is imported.
+    """
+    if name not in _BACKENDS:
+        raise ValueError(f"Unknown LLM backend: {name}. Known: {sorted(_BACKENDS)}")
+    _active["name"] = name
+    _active["options"] = options
+
+
+def get_backend_name() -> str:
+    return _active["name"] or os.getenv("LLM_BACKEND", "mistral")
+
+
+def get_chat_model(
+    agent: str,
+    model_name: str | None,
+    temperature: float,
+    schema: type[BaseModel] | None = None,
+    cache: bool | None = None,
+) -> BaseChatModel:
+    """
+    Build the chat model for an agent on the configured backend. With
+    `model_name` None each call goes to the model the router picks for the
+    agent and the running interview stage (see src.llm.routing). `schema` is
+    the Pydantic model the agent parses the reply into (None for free text);
+    offline backends use it to produce valid replies. `cache` forces the
+    response cache on or off; by default LLM_CACHE decides (see
+    cache_enabled_for).
+
+    The model is wrapped so calls can be recorded and replayed (see
+    src.llm.cassette), are rate limited if limits are configured
+    (src.llm.ratelimit) and, once the limiter grants a slot, get a latency
+    budget, hedging and a circuit breaker (src.llm.resilience;
+    LLM_RESILIENCE=off to skip), all below the cache. Time queued at the
+    limiter is therefore neither part of the budget nor a backend failure.
+    Structured agents don't stream: nobody reads their partial JSON.
+    """
+    name = get_backend_name()
+    if name not in _BACKENDS:
+        raise ValueError(f"Unknown LLM backend: {name}. Known: {sorted(_BACKENDS)}")
+    limiter = get_rate_limiter()
+    resilient = os.getenv("LLM_RESILIENCE", "on").strip().lower() != "off"
+    if cache is None:
+        cache = cache_enabled_for(agent, temperature)
+
+    def build(model_name: str) -> BaseChatModel:
+        options = dict(_active["options"])
+        if resilient:
+            options.setdefault("timeout", policy_for(agent, name).timeout)
+        model = _BACKENDS[name](model_name, temperature, schema, **options)
+        if resilient:
+            model = ResilientChatModel(
+                inner=model, agent=agent, backend=name, limiter=limiter
+            )
+        if limiter is not None:
+            model = RateLimitedChatModel(inner=model, agent=agent, limiter=limiter)
+        if cache:
+            model.cache = get_shared_cache()
+        return model
+
+    if model_name is None:
+        model = routed_model(agent, get_router(), build)
+    else:
+        model = build(model_name)
+    return CassetteChatModel(
+        inner=model,
+        agent=agent,
+        disable_streaming=schema is not None,
+        callbacks=[metrics_handler],
+    )
+
+
+def _mistral_backend(model_name, temperature, schema, timeout=None, **options):
+    from langchain_mistralai import ChatMistralAI
+
+    if timeout is not None:
+        options["timeout"] = math.ceil(timeout)  # the client takes whole seconds
+    return ChatMistralAI(model=model_name, temperature=temperature, **options)
+
+
+def _fake_backend(model_name, temperature, schema, **options):
+    from src.llm.fake import FakeChatModel
+
+    # Per-model latency ("codestral-latest=0.5,mistral-small-latest=0.2")
+    # lets routing tests tell the tiers apart.
+    model_latency = options.pop("model_latency", None) or {
+        model: float(seconds)
+        for model, seconds in parse_pairs(
+            os.getenv("LLM_FAKE_MODEL_LATENCY", "")
+        ).items()
+    }
+    if model_name in model_latency:
+        options["latency"] = model_latency[model_name]
+    options.setdefault("latency", float(os.getenv("LLM_FAKE_LATENCY", "0")))
+    options.setdefault("jitter", float(os.getenv("LLM_FAKE_JITTER", "0")))
+    options.setdefault(
+        "prompt_latency", float(os.getenv("LLM_FAKE_PROMPT_LATENCY", "0"))
+    )
+    options.setdefault("error_rate", float(os.getenv("LLM_FAKE_ERROR_RATE", "0")))
+    options.setdefault("stall_rate", float(os.getenv("LLM_FAKE_STALL_RATE", "0")))
+    options.setdefault(
+        "stall_seconds", float(os.getenv("LLM_FAKE_STALL_SECONDS", "30"))
+    )
+    return FakeChatModel(
+        model=model_name,
+        temperature=temperature,
+        response_schema=schema,
+        **options,
+    )
+
+
+register_backend("mistral", _mistral_backend)
+register_backend("fake", _fake_backend)
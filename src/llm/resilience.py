@@ -0,0 +1,503 @@
+import asyncio
+import contextvars
+import os
+import queue
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor
+from concurrent.futures import wait as wait_futures
+from typing import Any, AsyncIterator, Callable
+
+from src.llm.wrappers import DelegatingChatModel
+from src.metrics import record_hedge
+
+# Per-agent latency budgets in seconds; LLM_TIMEOUTS overrides them
+# ("interviewer=15,feedback=60") and LLM_TIMEOUT sets the rest.
+DEFAULT_TIMEOUTS = {"feedback": 90.0, "feedback_map": 60.0}
+
+
+class LLMTimeout(TimeoutError):
+    """An agent's call ran out of its latency budget."""
+
+
+class CircuitOpen(RuntimeError):
+    """The backend failed repeatedly; calls fail fast until it cools down."""
+
+
+class CircuitBreaker:
+    """
+    Opens after `failures` consecutive failed calls to a backend and then
+    rejects calls outright for `reset_seconds`. After that one trial call
+    goes through: success closes the circuit, failure opens it again.
+    """
+
+    def __init__(self, name: str, failures: int = 5, reset_seconds: float = 30.0):
+        self.name = name
+        self.failures = failures
+        self.reset_seconds = reset_seconds
+        self.state = "closed"
+        self.trips = 0
+        self.rejected = 0
+        self._failed = 0
+        self._opened = 0.0
+        self._lock = threading.Lock()
+
+    def admit(self):
+        with self._lock:
+            if self.state == "open" and (
+                time.monotonic() - self._opened >= self.reset_seconds
+            ):
+                self.state = "half_open"
+                return  # the trial call
+            if self.state != "closed":
+                self.rejected += 1
+                raise CircuitOpen(f"{self.name} backend circuit is open")
+
+    def success(self):
+        with self._lock:
+            self.state = "closed"
+            self._failed = 0
+
+    def failure(self):
+        with self._lock:
+            self._failed += 1
+            if self.state == "half_open" or self._failed >= self.failures:
+                if self.state != "open":
+                    self.trips += 1
+                self.state = "open"
+                self._opened = time.monotonic()
+
+    def abandon(self):
+        """A call ended without an outcome (cancelled); don't leave a trial hanging."""
+        with self._lock:
+            if self.state == "half_open":
+                self.state = "open"
+                self._opened = time.monotonic()
+
+    def stats(self) -> dict[str, Any]:
+        return {"state": self.state, "trips": self.trips, "rejected": self.rejected}
+
+
+class CallPolicy:
+    """
+    Latency budget and hedging for one agent's calls. Once `min_samples`
+    calls have succeeded, a call still running after their p95 gets a
+    duplicate request, and whichever answers first wins. Hedges are capped
+    at `hedge_ratio` of calls so a slow backend isn't flooded.
+    """
+
+    min_samples = 20
+
+    def __init__(
+        self,
+        agent: str,
+        timeout: float | None,
+        breaker: CircuitBreaker,
+        hedge_ratio: float = 0.1,
+    ):
+        self.agent = agent
+        self.timeout = timeout
+        self.breaker = breaker
+        self.hedge_ratio = hedge_ratio
+        self.calls = 0
+        self.hedges = 0
+        self.hedge_wins = 0
+        self.timeouts = 0
+        self._latencies: deque[float] = deque(maxlen=200)
+        self._lock = threading.Lock()
+
+    def p95(self) -> float | None:
+        with self._lock:
+            if len(self._latencies) < self.min_samples:
+                return None
+            ordered = sorted(self._latencies)
+        return ordered[int(len(ordered) * 0.95) - 1]
+
+    def start(self):
+        self.breaker.admit()
+        with self._lock:
+            self.calls += 1
+
+    def hedge_delay(self) -> float | None:
+        """Seconds to wait before hedging this call, or None not to hedge."""
+        if not self.hedge_ratio:
+            return None
+        return self.p95()
+
+    def take_hedge(self) -> bool:
+        with self._lock:
+            if self.hedges >= self.hedge_ratio * self.calls:
+                return False
+            self.hedges += 1
+        record_hedge()
+        return True
+
+    def succeeded(self, seconds: float, hedge_won: bool = False):
+        self.breaker.success()
+        with self._lock:
+            self._latencies.append(seconds)
+            self.hedge_wins += hedge_won
+
+    def failed(self, error: BaseException):
+        if isinstance(error, (asyncio.CancelledError, GeneratorExit)):
+            self.breaker.abandon()
+            return
+        if isinstance(error, LLMTimeout):
+            with self._lock:
+                self.timeouts += 1
+        self.breaker.failure()
+
+    def starved(self):
+        """
+        The call timed out waiting for a thread to run on: a local shortage
+        (see MAX_SYNC_CALLS), not a backend failure.
+        """
+        self.breaker.abandon()
+        with self._lock:
+            self.timeouts += 1
+
+    def stats(self) -> dict[str, Any]:
+        p95 = self.p95()
+        return {
+            "calls": self.calls,
+            "timeouts": self.timeouts,
+            "hedges": self.hedges,
+            "hedge_wins": self.hedge_wins,
+            "p95_ms": round(p95 * 1000, 1) if p95 is not None else None,
+        }
+
+
+_policies: dict[str, CallPolicy] = {}
+_breakers: dict[str, CircuitBreaker] = {}
+_lock = threading.Lock()
+
+
+def _timeouts() -> dict[str, float]:
+    timeouts = dict(DEFAULT_TIMEOUTS)
+    for item in os.getenv("LLM_TIMEOUTS", "").split(","):
+        if "=" in item:
+            agent, seconds = item.split("=", 1)
+            timeouts[agent.strip()] = float(seconds)
+    return timeouts
+
+
+def policy_for(agent: str, backend: str) -> CallPolicy:
+    """
+    The shared policy of `agent`'s calls to `backend`, configured from
+    LLM_TIMEOUT(S), LLM_HEDGE_RATIO and LLM_BREAKER_FAILURES / _RESET_SECONDS.
+    Agents on one backend share its circuit breaker.
+    """
+    with _lock:
+        key = f"{backend}:{agent}"
+        if key not in _policies:
+            if backend not in _breakers:
+                _breakers[backend] = CircuitBreaker(
+                    backend,
+                    failures=int(os.getenv("LLM_BREAKER_FAILURES", "5")),
+                    reset_seconds=float(os.getenv("LLM_BREAKER_RESET_SECONDS", "30")),
+                )
+            timeout = _timeouts().get(agent, float(os.getenv("LLM_TIMEOUT", "30")))
+            _policies[key] = CallPolicy(
+                agent,
+                timeout=timeout or None,
+                breaker=_breakers[backend],
+                hedge_ratio=float(os.getenv("LLM_HEDGE_RATIO", "0.1")),
+            )
+        return _policies[key]
+
+
+def reset_resilience():
+    """Forget latency history and breaker state, and re-read the settings."""
+    with _lock:
+        _policies.clear()
+        _breakers.clear()
+
+
+def resilience_stats() -> dict[str, Any]:
+    with _lock:
+        return {
+            "breakers": {name: b.stats() for name, b in _breakers.items()},
+            "agents": {key: p.stats() for key, p in _policies.items()},
+        }
+
+
+# Runs sync calls so they can be timed out and hedged. A timed-out call
+# keeps its thread until the backend returns, which the backend client's
+# own timeout (the same budget, see get_chat_model) bounds. At most
+# MAX_SYNC_CALLS run at once: a call that finds them all taken, e.g. by
+# abandoned calls, waits for a thread within its budget instead of queueing
+# behind them, and a hedge is only sent if a thread is free.
+MAX_SYNC_CALLS = 32
+_executor = ThreadPoolExecutor(
+    max_workers=MAX_SYNC_CALLS, thread_name_prefix="llm-call"
+)
+_sync_calls = threading.BoundedSemaphore(MAX_SYNC_CALLS)
+
+
+def _submit(fn: Callable[[], Any], timeout: float | None = None):
+    """
+    Run `fn` on a call thread, or return None if none frees up within
+    `timeout` seconds (None: wait as long as it takes).
+    """
+    slots = _sync_calls
+    if not slots.acquire(timeout=timeout):
+        return None
+    # Keep the caller's context: node metrics, rate-limit priority.
+    future = _executor.submit(contextvars.copy_context().run, fn)
+    future.add_done_callback(lambda _: slots.release())
+    return future
+
+
+_END = object()
+
+
+def _hedge_due(hedge, delay: float | None, remaining: float | None) -> bool:
+    """Whether the next wait ends by sending the hedge rather than timing out."""
+    return (
+        hedge is None and delay is not None and (remaining is None or delay < remaining)
+    )
+
+
+def _winner(done: set, pending: set):
+    """The attempt to answer with: the first success, or the last failure."""
+    for attempt in done:
+        if attempt.exception() is None or not pending:
+            return attempt
+    return None
+
+
+class ResilientChatModel(DelegatingChatModel):
+    """
+    Puts each call to `inner` under the agent's CallPolicy: a latency budget
+    (LLMTimeout), a hedged duplicate after the p95 and the backend's circuit
+    breaker (CircuitOpen). Errors propagate, so the agent's own fallback
+    runs, but at most after the budget instead of whenever the backend
+    gives up.
+
+    Streams are hedged on their first chunk, and that is the latency their
+    p95 is taken over; the whole stream still has to fit in the budget.
+    Sync streams are not hedged.
+
+    Sits inside the rate limiter's slot (see get_chat_model), so a hedge
+    rides on the slot of the call it duplicates; while other calls queue
+    at `limiter`, nothing is hedged.
+    """
+
+    backend: str = ""
+    limiter: Any = None
+
+    @property
+    def policy(self) -> CallPolicy:
+        return policy_for(self.agent, self.backend)
+
+    def _throttled(self) -> bool:
+        return self.limiter is not None and self.limiter.waiting > 0
+
+    # --- non-streaming ------------------------------------------------------
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs: Any):
+        policy = self.policy
+        policy.start()
+        started = time.monotonic()
+
+        def attempt(timeout: float | None):
+            return _submit(
+                lambda: DelegatingChatModel._generate(
+                    self, messages, stop=stop, **kwargs
+                ),
+                timeout,
+            )
+
+        first = attempt(self._remaining(policy, started))
+        if first is None:
+            self._no_thread(policy)
+        pending = {first}
+        hedge = None
+        delay = policy.hedge_delay()
+        try:
+            while True:
+                remaining = self._remaining(policy, started)
+                hedge_next = _hedge_due(hedge, delay, remaining)
+                done, pending = wait_futures(
+                    pending,
+                    timeout=delay if hedge_next else remaining,
+                    return_when=FIRST_COMPLETED,
+                )
+                winner = _winner(done, pending)
+                if winner is not None:
+                    result = winner.result()
+                    policy.succeeded(time.monotonic() - started, winner is hedge)
+                    return result
+                if done:
+                    continue  # one attempt failed, the other may still answer
+                if not hedge_next:
+                    raise LLMTimeout(f"{self.agent} call exceeded {policy.timeout}s")
+                delay = None
+                if not self._throttled() and policy.take_hedge():
+                    hedge = attempt(0)
+                    if hedge is not None:
+                        pending.add(hedge)
+        except BaseException as e:
+            policy.failed(e)
+            raise
+        finally:
+            for future in pending:
+                future.cancel()
+
+    async def _agenerate(self, messages, stop=None, run_manager=None, **kwargs: Any):
+        policy = self.policy
+        policy.start()
+        started = time.monotonic()
+
+        def attempt():
+            return asyncio.ensure_future(
+                DelegatingChatModel._agenerate(self, messages, stop=stop, **kwargs)
+            )
+
+        try:
+            task, hedge = await self._first_of(policy, started, attempt)
+            result = task.result()
+        except BaseException as e:
+            policy.failed(e)
+            raise
+        policy.succeeded(time.monotonic() - started, task is hedge)
+        return result
+
+    async def _first_of(self, policy: CallPolicy, started: float, attempt):
+        """
+        Run `attempt()` (a task factory), hedged after the p95, until one
+        attempt finishes without error, all have failed or the budget runs
+        out (LLMTimeout). Returns (finished task, hedge task or None); the
+        others are cancelled.
+        """
+        pending = {attempt()}
+        hedge = None
+        delay = policy.hedge_delay()
+        try:
+            while True:
+                remaining = self._remaining(policy, started)
+                hedge_next = _hedge_due(hedge, delay, remaining)
+                done, pending = await asyncio.wait(
+                    pending,
+                    timeout=delay if hedge_next else remaining,
+                    return_when=asyncio.FIRST_COMPLETED,
+                )
+                winner = _winner(done, pending)
+                if winner is not None:
+                    return winner, hedge
+                if done:
+                    continue
+                if not hedge_next:
+                    raise LLMTimeout(f"{self.agent} call exceeded {policy.timeout}s")
+                delay = None
+                if not self._throttled() and policy.take_hedge():
+                    hedge = attempt()
+                    pending.add(hedge)
+        finally:
+            for task in pending:
+                task.cancel()
+
+    def _no_thread(self, policy: CallPolicy):
+        policy.starved()
+        raise LLMTimeout(f"{self.agent} call found no free thread in {policy.timeout}s")
+
+    @staticmethod
+    def _remaining(policy: CallPolicy, started: float) -> float | None:
+        if policy.timeout is None:
+            return None
+        return max(0.0, policy.timeout - (time.monotonic() - started))
+
+    # --- streaming ----------------------------------------------------------
+
+    def _stream(self, messages, stop=None, run_manager=None, **kwargs: Any):
+        policy = self.policy
+        policy.start()
+        started = time.monotonic()
+        chunks: queue.Queue = queue.Queue()
+        cancelled = threading.Event()
+
+        def pump():
+            try:
+                for chunk in DelegatingChatModel._stream(
+                    self, messages, stop=stop, **kwargs
+                ):
+                    if cancelled.is_set():
+                        return
+                    chunks.put(chunk)
+                chunks.put(_END)
+            except Exception as e:
+                chunks.put(e)
+
+        if _submit(pump, self._remaining(policy, started)) is None:
+            self._no_thread(policy)
+        first = True
+        try:
+            while True:
+                try:
+                    item = chunks.get(timeout=self._remaining(policy, started))
+                except queue.Empty:
+                    raise LLMTimeout(
+                        f"{self.agent} call exceeded {policy.timeout}s"
+                    ) from None
+                if item is _END:
+                    break
+                if isinstance(item, Exception):
+                    raise item
+                if first:
+                    policy.succeeded(time.monotonic() - started)
+                    first = False
+                yield item
+        except BaseException as e:
+            cancelled.set()
+            policy.failed(e)
+            raise
+        if first:
+            policy.succeeded(time.monotonic() - started)
+
+    async def _astream(self, messages, stop=None, run_manager=None, **kwargs: Any):
+        policy = self.policy
+        policy.start()
+        started = time.monotonic()
+        streams: dict[asyncio.Task, AsyncIterator] = {}
+
+        def attempt():
+            stream = DelegatingChatModel._astream(self, messages, stop=stop, **kwargs)
+            task = asyncio.ensure_future(stream.__anext__())
+            streams[task] = stream
+            return task
+
+        stream = None
+        try:
+            try:
+                task, hedge = await self._first_of(policy, started, attempt)
+                first = task.result()
+            except StopAsyncIteration:
+                policy.succeeded(time.monotonic() - started)
+                return
+            stream = streams.pop(task)
+            policy.succeeded(time.monotonic() - started, task is hedge)
+            yield first
+            while True:
+                try:
+                    chunk = await asyncio.wait_for(
+                        stream.__anext__(), self._remaining(policy, started)
+                    )
+                except StopAsyncIteration:
+                    break
+                except asyncio.TimeoutError:
+                    raise LLMTimeout(
+                        f"{self.agent} call exceeded {policy.timeout}s"
+                    ) from None
+                yield chunk
+        except BaseException as e:
+            policy.failed(e)
+            raise
+        finally:
+            for task, other in streams.items():
+                # A losing stream may still be inside __anext__.
+                task.cancel()
+                await asyncio.gather(task, return_exceptions=True)
+                await other.aclose()
+            if stream is not None:
+                await stream.aclose()
@@ -0,0 +1,387 @@
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, AsyncIterator, Callable, Iterator
+
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import BaseMessage
+from langchain_core.outputs import ChatGenerationChunk, ChatResult
+
+from src.llm.wrappers import DelegatingChatModel, _as_chunk, backend_run_manager
+from src.metrics import current
+
+log = logging.getLogger(__name__)
+
+STAGES = ("intro", "main", "code", "behavioral", "closing")
+
+# Models from most capable to fastest. An adaptive downgrade moves an agent
+# one step towards the end; models outside the list are never swapped.
+DEFAULT_TIERS = ("mistral-large-latest", "codestral-latest", "mistral-small-latest")
+
+# Latency objectives in seconds for the agents a live candidate waits on;
+# agents without one are never downgraded.
+DEFAULT_SLOS = {
+    "interviewer": 4.0,
+    "technical": 8.0,
+    "behavioral": 8.0,
+    "strategy": 8.0,
+    "fused": 10.0,
+}
+
+_stage: ContextVar[str | None] = ContextVar("llm_stage", default=None)
+
+
+@contextmanager
+def stage(name: str | None) -> Iterator[None]:
+    """Route the LLM calls made inside the block for interview stage `name`."""
+    token = _stage.set(name)
+    try:
+        yield
+    finally:
+        _stage.reset(token)
+
+
+def parse_pairs(value: str) -> dict[str, str]:
+    """Parse "key=value,key=value" settings such as LLM_ROUTES."""
+    pairs = {}
+    for item in value.split(","):
+        if "=" in item:
+            key, setting = item.split("=", 1)
+            pairs[key.strip()] = setting.strip()
+    return pairs
+
+
+class Decision:
+    """Which model serves one call, and why."""
+
+    def __init__(self, agent: str, base: str, model: str, reason: str, level: int):
+        self.agent = agent
+        self.base = base  # the model the routing table asks for
+        self.model = model
+        self.reason = reason  # "routed", "downgraded" or "probe"
+        self.level = level  # tiers below `base` the agent currently runs at
+
+    def __str__(self) -> str:
+        if self.reason == "routed":
+            return self.model
+        return f"{self.model} ({self.reason}, asked for {self.base})"
+
+
+class Router:
+    """
+    Picks the model for an agent's call from a routing table: per agent,
+    optionally per interview stage ("technical@code=codestral-latest"),
+    else `default`. Without routes every agent runs on `default`.
+
+    In adaptive mode the router also watches each agent's latency (an
+    exponential moving average per model; first chunk for streams). When
+    it goes over the agent's SLO the agent moves one tier towards the
+    faster models, further if that is still too slow. Every `probe_every`
+    calls one goes to the tier above; once that tier's average is back
+    under `recover_ratio` of the SLO, the agent moves back up. Each route
+    (agent and the model the table asks for) keeps its own level.
+    """
+
+    alpha = 0.3  # weight of the newest sample in the moving average
+    min_samples = 3
+    probe_every = 10
+    recover_ratio = 0.8
+
+    def __init__(
+        self,
+        default: str = "codestral-latest",
+        routes: dict[str, str] | None = None,
+        tiers: tuple[str, ...] = DEFAULT_TIERS,
+        slos: dict[str, float] | None = None,
+        adaptive: bool = False,
+    ):
+        self.default = default
+        self.routes = dict(routes or {})
+        self.tiers = tuple(tiers)
+        self.slos = dict(DEFAULT_SLOS if slos is None else slos)
+        self.adaptive = adaptive
+        self.downgrades = 0
+        self.recoveries = 0
+        # Per route, i.e. agent and the model the table asks for.
+        self._levels: dict[tuple[str, str], int] = {}
+        self._since_probe: dict[tuple[str, str], int] = {}
+        self._latency: dict[tuple[str, str], float] = {}
+        self._samples: dict[tuple[str, str], int] = {}
+        self._lock = threading.Lock()
+
+    def model_for(self, agent: str, stage_name: str | None = None) -> str:
+        """The model the table assigns to `agent` in `stage_name`."""
+        if stage_name is not None:
+            routed = self.routes.get(f"{agent}@{stage_name}")
+            if routed:
+                return routed
+        return self.routes.get(agent, self.default)
+
+    def candidates(self, agent: str) -> set[str]:
+        """Every model a call of `agent` may be routed to."""
+        models = {self.model_for(agent, name) for name in (None, *STAGES)}
+        if self.adaptive and agent in self.slos:
+            for model in list(models):
+                models.update(self._chain(model))
+        return models
+
+    def _chain(self, base: str) -> tuple[str, ...]:
+        if base not in self.tiers:
+            return (base,)
+        return self.tiers[self.tiers.index(base) :]
+
+    def choose(self, agent: str, stage_name: str | None = None) -> Decision:
+        base = self.model_for(agent, stage_name)
+        if not self.adaptive or agent not in self.slos:
+            return Decision(agent, base, base, "routed", 0)
+        chain = self._chain(base)
+        route = (agent, base)
+        with self._lock:
+            level = self._levels.get(route, 0)
+            since_probe = self._since_probe.get(route, 0) + 1
+            if level and since_probe >= self.probe_every:
+                self._since_probe[route] = 0
+                return Decision(agent, base, chain[level - 1], "probe", level)
+            self._since_probe[route] = since_probe
+        reason = "downgraded" if level else "routed"
+        return Decision(agent, base, chain[level], reason, level)
+
+    def observe(self, decision: Decision, seconds: float):
+        """Feed the latency of a finished call back into adaptive routing."""
+        agent = decision.agent
+        slo = self.slos.get(agent)
+        if not self.adaptive or slo is None:
+            return
+        chain = self._chain(decision.base)
+        route = (agent, decision.base)
+        key = (agent, decision.model)
+        with self._lock:
+            previous = self._latency.get(key)
+            latency = self._latency[key] = (
+                seconds
+                if previous is None
+                else self.alpha * seconds + (1 - self.alpha) * previous
+            )
+            samples = self._samples[key] = self._samples.get(key, 0) + 1
+            level = self._levels.get(route, 0)
+            if decision.level != level:
+                return  # the route moved while this call ran
+            if (
+                decision.reason != "probe"
+                and samples >= self.min_samples
+                and latency > slo
+                and level < len(chain) - 1
+            ):
+                self._levels[route] = level + 1
+                self._since_probe[route] = 0
+                self.downgrades += 1
+                log.warning(
+                    "%s downgraded to %s: %s averages %.1fs, SLO %.1fs",
+                    agent,
+                    chain[level + 1],
+                    decision.model,
+                    latency,
+                    slo,
+                )
+            elif decision.reason == "probe" and latency < slo * self.recover_ratio:
+                self._levels[route] = level - 1
+                self.recoveries += 1
+                log.info(
+                    "%s back on %s: averages %.1fs, SLO %.1fs",
+                    agent,
+                    decision.model,
+                    latency,
+                    slo,
+                )
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                "adaptive": self.adaptive,
+                "downgrades": self.downgrades,
+                "recoveries": self.recoveries,
+                "levels": {
+                    f"{agent}:{base}": level
+                    for (agent, base), level in self._levels.items()
+                    if level
+                },
+                "latency_ms": {
+                    f"{agent}:{model}": round(seconds * 1000, 1)
+                    for (agent, model), seconds in self._latency.items()
+                },
+            }
+
+
+class RoutedChatModel(DelegatingChatModel):
+    """
+    Sends each call of one agent to the model the router picks for the
+    running stage (see stage()). `models` holds the candidates by name;
+    `inner` is the agent's default one. The choice goes into the running
+    node's metrics (routes, downgrades).
+    """
+
+    router: Any = None
+    models: dict[str, BaseChatModel] = {}
+
+    def _route(self) -> tuple[Decision, BaseChatModel]:
+        decision = self.router.choose(self.agent, _stage.get())
+        metrics = current()
+        if metrics is not None:
+            metrics.routes.append(str(decision))
+            metrics.downgrades += decision.reason == "downgraded"
+        return decision, self.models[decision.model]
+
+    def _observe(self, decision: Decision, started: float, error: BaseException | None):
+        # Errors say nothing about speed, but a call that timed out was slow.
+        if error is None or isinstance(error, TimeoutError):
+            self.router.observe(decision, time.perf_counter() - started)
+
+    def _generate(
+        self, messages: list[BaseMessage], stop=None, run_manager=None, **kwargs: Any
+    ) -> ChatResult:
+        decision, model = self._route()
+        started, error = time.perf_counter(), None
+        try:
+            return model._generate_with_cache(
+                messages, stop=stop, run_manager=backend_run_manager(model), **kwargs
+            )
+        except BaseException as e:
+            error = e
+            raise
+        finally:
+            self._observe(decision, started, error)
+
+    async def _agenerate(
+        self, messages: list[BaseMessage], stop=None, run_manager=None, **kwargs: Any
+    ) -> ChatResult:
+        decision, model = self._route()
+        started, error = time.perf_counter(), None
+        try:
+            return await model._agenerate_with_cache(
+                messages,
+                stop=stop,
+                run_manager=backend_run_manager(model, asynchronous=True),
+                **kwargs,
+            )
+        except BaseException as e:
+            error = e
+            raise
+        finally:
+            self._observe(decision, started, error)
+
+    def _stream(
+        self, messages: list[BaseMessage], stop=None, run_manager=None, **kwargs: Any
+    ) -> Iterator[ChatGenerationChunk]:
+        decision, model = self._route()
+        run_manager = backend_run_manager(model)
+        started = time.perf_counter()
+        if type(model)._stream is BaseChatModel._stream:
+            result = model._generate_with_cache(
+                messages, stop=stop, run_manager=run_manager, **kwargs
+            )
+            chunks = iter([_as_chunk(result)])
+        else:
+            chunks = model._stream(
+                messages, stop=stop, run_manager=run_manager, **kwargs
+            )
+        first = True
+        try:
+            for chunk in chunks:
+                if first:
+                    first = False
+                    self._observe(decision, started, None)
+                yield chunk
+        except TimeoutError as e:
+            if first:
+                self._observe(decision, started, e)
+            raise
+
+    async def _astream(
+        self, messages: list[BaseMessage], stop=None, run_manager=None, **kwargs: Any
+    ) -> AsyncIterator[ChatGenerationChunk]:
+        decision, model = self._route()
+        run_manager = backend_run_manager(model, asynchronous=True)
+        started = time.perf_counter()
+        first = True
+        try:
+            if type(model)._astream is BaseChatModel._astream:
+                result = await model._agenerate_with_cache(
+                    messages, stop=stop, run_manager=run_manager, **kwargs
+                )
+                first = False
+                self._observe(decision, started, None)
+                yield _as_chunk(result)
+                return
+            async for chunk in model._astream(
+                messages, stop=stop, run_manager=run_manager, **kwargs
+            ):
+                if first:
+                    first = False
+                    self._observe(decision, started, None)
+                yield chunk
+        except TimeoutError as e:
+            if first:
+                self._observe(decision, started, e)
+            raise
+
+
+_shared: Router | None = None
+_shared_lock = threading.Lock()
+
+
+def set_router(router: Router | None):
+    """
+    Use `router` for every model created from now on instead of the one
+    from the environment. Like use_backend, call it before src.graph is
+    imported.
+    """
+    global _shared
+    with _shared_lock:
+        _shared = router
+
+
+def get_router() -> Router:
+    """
+    Process-wide router configured from LLM_MODEL (default model),
+    LLM_ROUTES ("agent=model,agent@stage=model"), LLM_MODEL_TIERS (most
+    capable first), LLM_SLOS ("agent=seconds") and LLM_ROUTING ("static"
+    or "adaptive").
+    """
+    global _shared
+    with _shared_lock:
+        if _shared is None:
+            slos = dict(DEFAULT_SLOS)
+            slos.update(
+                (agent, float(seconds))
+                for agent, seconds in parse_pairs(os.getenv("LLM_SLOS", "")).items()
+            )
+            tiers = os.getenv("LLM_MODEL_TIERS")
+            _shared = Router(
+                default=os.getenv("LLM_MODEL", "codestral-latest"),
+                routes=parse_pairs(os.getenv("LLM_ROUTES", "")),
+                tiers=(
+                    tuple(t.strip() for t in tiers.split(",") if t.strip())
+                    if tiers
+                    else DEFAULT_TIERS
+                ),
+                slos=slos,
+                adaptive=os.getenv("LLM_ROUTING", "static").strip().lower()
+                == "adaptive",
+            )
+        return _shared
+
+
+def routed_model(
+    agent: str, router: Router, build: Callable[[str], BaseChatModel]
+) -> BaseChatModel:
+    """A RoutedChatModel over `build(model)` for each of the agent's candidates."""
+    models = {model: build(model) for model in sorted(router.candidates(agent))}
+    return RoutedChatModel(
+        inner=models[router.model_for(agent)],
+        agent=agent,
+        router=router,
+        models=models,
+    )
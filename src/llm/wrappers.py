@@ -0,0 +1,109 @@
+import uuid
+from typing import Any, AsyncIterator, Iterator
+
+from langchain_core.callbacks import (
+    AsyncCallbackManagerForLLMRun,
+    CallbackManagerForLLMRun,
+)
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessageChunk, BaseMessage
+from langchain_core.outputs import ChatGenerationChunk, ChatResult
+
+from src.metrics import retry_handler
+
+
+class DelegatingChatModel(BaseChatModel):
+    """
+    Base for layers that add behaviour around another chat model's calls
+    (recording, rate limiting, ...). Subclasses override the underscored
+    hooks and call super() to reach `inner`.
+
+    Only the outermost model talks to LangChain callbacks, so inner layers
+    get no run manager: streamed tokens are reported once, and the inner
+    model's own cache is still consulted on non-streaming calls. The
+    backend model below the last layer gets one that only counts its
+    client's own retries (see backend_run_manager).
+    """
+
+    inner: BaseChatModel | None = None
+    agent: str = ""
+
+    @property
+    def _llm_type(self) -> str:
+        # Reuse the inner identity so cache keys don't depend on the wrappers.
+        return self.inner._llm_type if self.inner is not None else "delegating"
+
+    @property
+    def _identifying_params(self) -> dict[str, Any]:
+        return self.inner._identifying_params if self.inner is not None else {}
+
+    def _inner_streams(self) -> bool:
+        return type(self.inner)._stream is not BaseChatModel._stream
+
+    def _generate(
+        self, messages: list[BaseMessage], stop=None, run_manager=None, **kwargs: Any
+    ) -> ChatResult:
+        return self.inner._generate_with_cache(
+            messages, stop=stop, run_manager=backend_run_manager(self.inner), **kwargs
+        )
+
+    async def _agenerate(
+        self, messages: list[BaseMessage], stop=None, run_manager=None, **kwargs: Any
+    ) -> ChatResult:
+        return await self.inner._agenerate_with_cache(
+            messages,
+            stop=stop,
+            run_manager=backend_run_manager(self.inner, asynchronous=True),
+            **kwargs,
+        )
+
+    def _stream(
+        self, messages: list[BaseMessage], stop=None, run_manager=None, **kwargs: Any
+    ) -> Iterator[ChatGenerationChunk]:
+        run_manager = backend_run_manager(self.inner)
+        if not self._inner_streams():
+            result = self.inner._generate_with_cache(
+                messages, stop=stop, run_manager=run_manager, **kwargs
+            )
+            yield _as_chunk(result)
+            return
+        yield from self.inner._stream(
+            messages, stop=stop, run_manager=run_manager, **kwargs
+        )
+
+    async def _astream(
+        self, messages: list[BaseMessage], stop=None, run_manager=None, **kwargs: Any
+    ) -> AsyncIterator[ChatGenerationChunk]:
+        run_manager = backend_run_manager(self.inner, asynchronous=True)
+        if not self._inner_streams():
+            result = await self.inner._agenerate_with_cache(
+                messages, stop=stop, run_manager=run_manager, **kwargs
+            )
+            yield _as_chunk(result)
+            return
+        async for chunk in self.inner._astream(
+            messages, stop=stop, run_manager=run_manager, **kwargs
+        ):
+            yield chunk
+
+
+def backend_run_manager(model: BaseChatModel, asynchronous: bool = False):
+    """
+    The run manager a layer passes to `model`: None for another layer, and
+    for a backend model one that reports nothing but the retries its client
+    makes on its own (on_retry, e.g. ChatMistralAI's max_retries) to the
+    running node's metrics.
+    """
+    if isinstance(model, DelegatingChatModel):
+        return None
+    manager = (
+        AsyncCallbackManagerForLLMRun if asynchronous else CallbackManagerForLLMRun
+    )
+    return manager(
+        run_id=uuid.uuid4(), handlers=[retry_handler], inheritable_handlers=[]
+    )
+
+
+def _as_chunk(result: ChatResult) -> ChatGenerationChunk:
+    message = result.generations[0].message
+    return ChatGenerationChunk(message=AIMessageChunk(content=message.content))
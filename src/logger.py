@@ -1,46 +1,331 @@
+import atexit
+import json
+import logging
+import os
+import queue
+import threading
+import time
+from typing import IO, Any, Callable, Literal
+
 from pydantic import BaseModel, Field
 
+from src.metrics import NodeMetrics
+
+FsyncPolicy = Literal["never", "batch", "always"]
+
+log = logging.getLogger(__name__)
+
 
 class TurnLog(BaseModel):
     turn_id: int
     agent_visible_message: str
     user_message: str
     internal_thoughts: str
+    ttft_ms: float | None = None  # time to first visible reply token
+    metrics: dict[str, NodeMetrics] | None = None  # per graph node
 
 
 class InterviewSession(BaseModel):
     participant_name: str
     turns: list[TurnLog] = Field(default_factory=list)
     final_feedback: str | None = None
+    feedback_metrics: NodeMetrics | None = None
+
+
+def format_internal_thoughts(state: dict[str, Any]) -> str:
+    """The agents' reasoning for a turn, as logged in TurnLog.internal_thoughts."""
+    tech = state.get("tech_analysis") or {}
+    behav = state.get("behavioral_analysis") or {}
+    if not isinstance(tech, dict):
+        tech = {}
+    if not isinstance(behav, dict):
+        behav = {}
+    return (
+        f"[Наблюдатель/Технический]: {tech.get('reasoning', 'Н/Д')} - "
+        f"Галлюцинация: {tech.get('hallucination_detected', False)} - "
+        f"Пропущенные концепции: {tech.get('missing_concepts', [])} "
+        f"[Наблюдатель/Поведенческий]: {behav.get('observation', 'Н/Д')} - "
+        f"Честность: {behav.get('honesty_flag', 'Н/Д')} - "
+        f"Оффтопик: {behav.get('off_topic_attempt', False)} "
+        f"[Стратег → Интервьюер]: {state.get('strategy_directive', 'Н/Д')}"
+    )
+
+
+def read_event_log(path: str) -> InterviewSession:
+    """Rebuild a session by replaying its event log (one JSON record per line)."""
+    session = InterviewSession(participant_name="Candidate")
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            event = json.loads(line)
+            kind = event["event"]
+            if kind == "participant":
+                session.participant_name = event["participant_name"]
+            elif kind == "turn":
+                session.turns.append(TurnLog.model_validate(event["turn"]))
+            elif kind == "feedback":
+                session.final_feedback = event["final_feedback"]
+                if event.get("feedback_metrics"):
+                    session.feedback_metrics = NodeMetrics.model_validate(
+                        event["feedback_metrics"]
+                    )
+    return session
+
+
+def compact_event_log(events_path: str, json_path: str):
+    """Export an event log to the interview_log.json shape."""
+    session = read_event_log(events_path)
+    with open(json_path, "w", encoding="utf-8") as f:
+        f.write(session.model_dump_json(indent=2, exclude_none=True))
+
+
+class LogWriter:
+    """
+    Performs log file I/O on a daemon thread, in submission order.
+
+    Appends queued back to back for the same file are joined into a single
+    write (and a single fsync). The queue is bounded: when the disk falls
+    behind, submit() blocks the producer instead of buffering without limit,
+    and the time spent blocked is counted in stats(). Pending work is flushed
+    at interpreter exit.
+    """
+
+    def __init__(self, max_pending: int = 1024, batch_size: int = 128):
+        self.batch_size = batch_size
+        self._queue: queue.Queue = queue.Queue(maxsize=max_pending)
+        self._lock = threading.Lock()
+        self.batches = 0
+        self.jobs = 0
+        self.blocked_ms = 0.0
+        self.errors = 0
+        self._thread = threading.Thread(
+            target=self._run, name="session-log-writer", daemon=True
+        )
+        self._thread.start()
+        atexit.register(self.flush)
+
+    def submit(self, job: Callable[[], Any]):
+        """Run `job` on the writer thread after everything submitted before it."""
+        try:
+            self._queue.put_nowait(job)
+        except queue.Full:
+            started = time.perf_counter()
+            self._queue.put(job)
+            with self._lock:
+                self.blocked_ms += (time.perf_counter() - started) * 1000
+
+    def append(self, f: IO[str], line: str, sync: bool = False):
+        self.submit(_Append(f, line, sync))
+
+    def flush(self):
+        """Block until every submitted job has been written."""
+        self._queue.join()
+
+    def _run(self):
+        while True:
+            batch = [self._queue.get()]
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            try:
+                self._write(batch)
+            except Exception as e:
+                with self._lock:
+                    self.errors += 1
+                log.exception("Session log write failed: %s", e)
+            finally:
+                with self._lock:
+                    self.batches += 1
+                    self.jobs += len(batch)
+                for _ in batch:
+                    self._queue.task_done()
+
+    @staticmethod
+    def _write(batch: list):
+        pending: list[_Append] = []
+
+        def write_pending():
+            if not pending:
+                return
+            f = pending[0].f
+            f.write("".join(a.line for a in pending))
+            f.flush()
+            if any(a.sync for a in pending):
+                os.fsync(f.fileno())
+            pending.clear()
+
+        for job in batch:
+            if isinstance(job, _Append):
+                if pending and pending[0].f is not job.f:
+                    write_pending()
+                pending.append(job)
+            else:
+                write_pending()
+                job()
+        write_pending()
+
+    def stats(self) -> dict[str, float]:
+        with self._lock:
+            return {
+                "pending": self._queue.qsize(),
+                "jobs": self.jobs,
+                "batches": self.batches,
+                "blocked_ms": round(self.blocked_ms, 1),
+                "errors": self.errors,
+            }
+
+
+class _Append:
+    __slots__ = ("f", "line", "sync")
+
+    def __init__(self, f: IO[str], line: str, sync: bool):
+        self.f = f
+        self.line = line
+        self.sync = sync
+
+
+_shared_writer: LogWriter | None = None
+_shared_writer_lock = threading.Lock()
+
+
+def get_log_writer() -> LogWriter | None:
+    """
+    Process-wide background writer, or None when LOG_WRITER=sync.
+    LOG_QUEUE_SIZE bounds the number of pending writes.
+    """
+    global _shared_writer
+    if os.getenv("LOG_WRITER", "background") == "sync":
+        return None
+    with _shared_writer_lock:
+        if _shared_writer is None:
+            _shared_writer = LogWriter(
+                max_pending=int(os.getenv("LOG_QUEUE_SIZE", "1024"))
+            )
+        return _shared_writer
 
 
 class SessionLogger:
-    def __init__(self, filename: str = "interview_log.json"):
+    """
+    Logs a session as an append-only event log next to `filename`
+    (interview_log.json -> interview_log.jsonl): one record per turn, feedback
+    or participant change, so each event costs O(event) bytes. save_log()
+    compacts the session into the `filename` JSON document.
+
+    fsync: "always" syncs every event, "batch" (default) syncs on save_log,
+    "never" leaves it to the OS.
+
+    With a LogWriter the disk writes happen on its thread and the logging
+    calls return immediately; flush() waits for them.
+
+    resume=True continues the session already in the event log, if any,
+    instead of starting over.
+    """
+
+    def __init__(
+        self,
+        filename: str = "interview_log.json",
+        fsync: FsyncPolicy | None = None,
+        writer: LogWriter | None = None,
+        resume: bool = False,
+    ):
         self.filename = filename
+        self.writer = writer
+        self.events_path = os.path.splitext(filename)[0] + ".jsonl"
+        self.fsync: FsyncPolicy = fsync or os.getenv("LOG_FSYNC", "batch")
+        self.bytes_written = 0
         self.session: InterviewSession | None = None
-        self._start_new_session_if_needed()
+        self._events = None
+        self._mode = "w"
+        if resume and os.path.exists(self.events_path):
+            self.session = read_event_log(self.events_path)
+            self._mode = "a"
+        else:
+            self._start_new_session_if_needed()
 
     def _start_new_session_if_needed(self):
         self.session = InterviewSession(participant_name="Candidate")
 
+    def _append(self, event: dict[str, Any]):
+        if self._events is None:
+            # A new logger starts a new session, as the JSON log always did;
+            # after close() it reopens where it left off.
+            self._events = open(self.events_path, self._mode, encoding="utf-8")
+            self._mode = "a"
+        line = json.dumps(event, ensure_ascii=False) + "\n"
+        self.bytes_written += len(line.encode("utf-8"))
+        sync = self.fsync == "always"
+        if self.writer is not None:
+            self.writer.append(self._events, line, sync)
+            return
+        self._events.write(line)
+        self._events.flush()
+        if sync:
+            os.fsync(self._events.fileno())
+
     def start_session(self, participant_name: str):
+        self.set_participant(participant_name)
+
+    def set_participant(self, participant_name: str):
         self.session.participant_name = participant_name
-        self.save_log()
+        self._append({"event": "participant", "participant_name": participant_name})
 
-    def log_turn(self, turn_id: int, agent_msg: str, user_msg: str, thoughts: str):
+    def log_turn(
+        self,
+        turn_id: int,
+        agent_msg: str,
+        user_msg: str,
+        thoughts: str,
+        ttft_ms: float | None = None,
+        metrics: dict[str, Any] | None = None,
+    ):
         turn = TurnLog(
             turn_id=turn_id,
             agent_visible_message=agent_msg,
             user_message=user_msg,
             internal_thoughts=thoughts,
+            ttft_ms=ttft_ms,
+            metrics=metrics,
         )
         self.session.turns.append(turn)
-        self.save_log()
+        self._append({"event": "turn", "turn": turn.model_dump(exclude_none=True)})
 
-    def log_feedback(self, feedback: str):
+    def log_feedback(self, feedback: str, metrics: NodeMetrics | None = None):
         self.session.final_feedback = feedback
-        self.save_log()
+        self.session.feedback_metrics = metrics
+        event = {"event": "feedback", "final_feedback": feedback}
+        if metrics is not None:
+            event["feedback_metrics"] = metrics.model_dump()
+        self._append(event)
 
     def save_log(self):
+        """Compact the session into `filename` in the interview_log.json shape."""
+        # Serialized here so the export reflects the session as of this call.
+        payload = self.session.model_dump_json(indent=2, exclude_none=True)
+        self.bytes_written += len(payload.encode("utf-8"))
+        self.submit(lambda: self._export(payload))
+
+    def _export(self, payload: str):
+        if self._events is not None and self.fsync != "never":
+            os.fsync(self._events.fileno())
         with open(self.filename, "w", encoding="utf-8") as f:
-            f.write(self.session.model_dump_json(indent=2, exclude_none=True))
+            f.write(payload)
+
+    def submit(self, job: Callable[[], Any]):
+        """Run `job` once this logger's earlier writes are on disk."""
+        if self.writer is not None:
+            self.writer.submit(job)
+        else:
+            job()
+
+    def flush(self):
+        if self.writer is not None:
+            self.writer.flush()
+
+    def close(self):
+        if self._events is not None:
+            self.flush()
+            self._events.close()
+            self._events = None
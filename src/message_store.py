@@ -0,0 +1,186 @@
+import threading
+import uuid
+from collections.abc import Iterable, Iterator, Sequence
+from typing import overload
+
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage, SystemMessage
+
+_MESSAGE_TYPES: dict[str, type[BaseMessage]] = {
+    "human": HumanMessage,
+    "ai": AIMessage,
+    "system": SystemMessage,
+}
+
+# chat roles as Streamlit names them
+ROLES = {"human": "user", "ai": "assistant", "system": "system"}
+
+
+class StoredMessage:
+    """
+    What the store keeps of a message: its id, type and text. Response
+    metadata, usage and tool fields of model replies are dropped; nothing
+    downstream of the graph reads them. Has the `type` and `content`
+    attributes the agents and renderers use, so views can be read like
+    message lists.
+    """
+
+    __slots__ = ("id", "type", "content")
+
+    def __init__(self, id: str, type: str, content: str):
+        self.id = id
+        self.type = type
+        self.content = content
+
+    @classmethod
+    def of(cls, message: "BaseMessage | StoredMessage") -> "StoredMessage":
+        if isinstance(message, StoredMessage):
+            return message
+        content = message.content
+        if not isinstance(content, str):
+            content = str(content)
+        return cls(message.id or uuid.uuid4().hex, message.type, content)
+
+    @property
+    def role(self) -> str:
+        return ROLES.get(self.type, self.type)
+
+    def to_message(self) -> BaseMessage:
+        return _MESSAGE_TYPES[self.type](content=self.content, id=self.id)
+
+    def __repr__(self) -> str:
+        return f"StoredMessage({self.type}: {self.content[:40]!r})"
+
+
+class MessageStore:
+    """
+    Append-only record list shared by the successive views of a session.
+    Views only ever see a prefix of it, so appending never disturbs them.
+    """
+
+    __slots__ = ("records", "_index", "_lock")
+
+    def __init__(self, records: Iterable[StoredMessage] = ()):
+        self.records: list[StoredMessage] = list(records)
+        self._index: dict[str, int] = {r.id: i for i, r in enumerate(self.records)}
+        self._lock = threading.Lock()
+
+    def get(self, message_id: str) -> StoredMessage | None:
+        i = self._index.get(message_id)
+        return self.records[i] if i is not None else None
+
+
+class MessageView(Sequence):
+    """
+    The conversation as one state sees it: the first `len(view)` records of
+    a MessageStore. Views are immutable; adding messages returns a new view.
+
+    Extending the newest view of a store appends to the store in place, so
+    a turn costs O(new messages) instead of copying the history. Extending
+    an older view (a fork: speculative branches, a retried turn) copies the
+    record pointers once into a new store; the records themselves are
+    shared.
+    """
+
+    __slots__ = ("_store", "_length")
+
+    def __init__(self, messages: Iterable[BaseMessage | StoredMessage] = ()):
+        self._store = MessageStore(StoredMessage.of(m) for m in messages)
+        self._length = len(self._store.records)
+
+    @classmethod
+    def over(cls, store: MessageStore, length: int) -> "MessageView":
+        """The view of the first `length` records of `store`."""
+        if length > len(store.records):
+            raise ValueError(f"store holds {len(store.records)} messages, not {length}")
+        view = cls.__new__(cls)
+        view._store = store
+        view._length = length
+        return view
+
+    @property
+    def store(self) -> MessageStore:
+        return self._store
+
+    def __len__(self) -> int:
+        return self._length
+
+    @overload
+    def __getitem__(self, index: int) -> StoredMessage: ...
+
+    @overload
+    def __getitem__(self, index: slice) -> list[StoredMessage]: ...
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return self._store.records[: self._length][index]
+        if index < 0:
+            index += self._length
+        if not 0 <= index < self._length:
+            raise IndexError("message index out of range")
+        return self._store.records[index]
+
+    def __iter__(self) -> Iterator[StoredMessage]:
+        records = self._store.records
+        for i in range(self._length):
+            yield records[i]
+
+    def __repr__(self) -> str:
+        return f"MessageView({self._length} messages)"
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, MessageView) and other._store is self._store:
+            return other._length == self._length
+        return NotImplemented
+
+    __hash__ = None
+
+    def __contains__(self, message_id) -> bool:
+        i = self._store._index.get(getattr(message_id, "id", message_id))
+        return i is not None and i < self._length
+
+    def extend(self, messages: Iterable[BaseMessage | StoredMessage]) -> "MessageView":
+        """This view followed by `messages`."""
+        new = [StoredMessage.of(m) for m in messages]
+        store = self._store
+        with store._lock:
+            if len(store.records) != self._length:
+                store = MessageStore(store.records[: self._length])
+            records, index = store.records, store._index
+            for record in new:
+                if record.id in index:
+                    # A model reply replayed from a cache can repeat an id.
+                    record = StoredMessage(
+                        uuid.uuid4().hex, record.type, record.content
+                    )
+                index[record.id] = len(records)
+                records.append(record)
+            return MessageView.over(store, len(records))
+
+    def fork(self) -> "MessageView":
+        """
+        The same messages over a store of their own: extending the fork
+        never appends to this view's store, even when this view is the
+        newest one.
+        """
+        return MessageView.over(MessageStore(self), self._length)
+
+    def __add__(self, messages: Iterable[BaseMessage | StoredMessage]) -> "MessageView":
+        return self.extend(messages)
+
+    def to_messages(self) -> list[BaseMessage]:
+        """Materialize real message objects, e.g. to pass to a chat model."""
+        return [record.to_message() for record in self]
+
+
+def append_messages(
+    left: "MessageView | list", right: "MessageView | Iterable[BaseMessage]"
+) -> MessageView:
+    """State reducer for `messages`: O(1) per appended message."""
+    if not isinstance(left, MessageView):
+        left = MessageView(left)
+    if isinstance(right, MessageView):
+        if not left or (right.store is left.store and len(right) >= len(left)):
+            return right
+    elif isinstance(right, (BaseMessage, StoredMessage)):
+        right = [right]
+    return left.extend(right)
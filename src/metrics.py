@@ -0,0 +1,222 @@
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Iterator, Protocol
+
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.exceptions import OutputParserException
+from pydantic import BaseModel
+
+from src.utils.tokens import estimate_tokens
+
+
+class NodeMetrics(BaseModel):
+    """What one graph node (or the feedback generator) cost in a single turn."""
+
+    wall_ms: float = 0.0
+    llm_calls: int = 0
+    prompt_chars: int = 0
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    retries: int = 0  # attempts a backend client repeated on its own
+    llm_errors: int = 0
+    parse_failures: int = 0
+    fast_path: int = 0  # decisions made locally instead of by an LLM call
+    queue_wait_ms: float = 0.0  # time LLM calls waited for the rate limiter
+    hedges: int = 0  # duplicate LLM requests sent because the first was slow
+    fallbacks: int = 0  # agent results replaced by a fallback after an error
+    partial_failures: int = 0  # parts of a result lost to an error (map steps)
+    downgrades: int = 0  # LLM calls moved to a faster model to meet the SLO
+    routes: list[str] = []  # the model each LLM call went to (src.llm.routing)
+
+
+class MetricsSink(Protocol):
+    def emit(self, node: str, metrics: NodeMetrics) -> None: ...
+
+
+class CounterRegistry:
+    """In-process running totals per node, safe to share between threads."""
+
+    FIELDS = [
+        name
+        for name, field in NodeMetrics.model_fields.items()
+        if field.annotation in (int, float)
+    ]
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._totals: dict[str, dict[str, float]] = {}
+        self._runs: dict[str, int] = {}
+
+    def emit(self, node: str, metrics: NodeMetrics) -> None:
+        with self._lock:
+            totals = self._totals.setdefault(node, dict.fromkeys(self.FIELDS, 0))
+            for field in self.FIELDS:
+                totals[field] += getattr(metrics, field)
+            self._runs[node] = self._runs.get(node, 0) + 1
+
+    def snapshot(self) -> dict[str, dict[str, float]]:
+        with self._lock:
+            return {
+                node: {"runs": self._runs[node], **totals}
+                for node, totals in self._totals.items()
+            }
+
+
+class PrometheusTextfileSink:
+    """
+    Keeps counters like CounterRegistry and rewrites `path` in Prometheus text
+    format after every emit, for node_exporter's textfile collector.
+    """
+
+    def __init__(self, path: str, prefix: str = "interview"):
+        self.path = path
+        self.prefix = prefix
+        self.counters = CounterRegistry()
+
+    def emit(self, node: str, metrics: NodeMetrics) -> None:
+        self.counters.emit(node, metrics)
+        lines = []
+        snapshot = self.counters.snapshot()
+        for field in ["runs", *CounterRegistry.FIELDS]:
+            name = f"{self.prefix}_node_{field}_total"
+            lines.append(f"# TYPE {name} counter")
+            for node_name, totals in sorted(snapshot.items()):
+                lines.append(f'{name}{{node="{node_name}"}} {totals[field]}')
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write("\n".join(lines) + "\n")
+        os.replace(tmp_path, self.path)
+
+
+registry = CounterRegistry()
+_sinks: list[MetricsSink] = [registry]
+if os.getenv("METRICS_PROMETHEUS_FILE"):
+    _sinks.append(PrometheusTextfileSink(os.environ["METRICS_PROMETHEUS_FILE"]))
+
+_current: ContextVar[NodeMetrics | None] = ContextVar("node_metrics", default=None)
+
+log = logging.getLogger(__name__)
+
+
+def add_sink(sink: MetricsSink):
+    _sinks.append(sink)
+
+
+def current() -> NodeMetrics | None:
+    """Metrics of the node running in this context, if any."""
+    return _current.get()
+
+
+@contextmanager
+def track(node: str) -> Iterator[NodeMetrics]:
+    """
+    Collect metrics for everything run inside the block under `node`: wall
+    time here, LLM call stats via MetricsCallbackHandler. Emitted to every
+    sink when the block exits.
+    """
+    metrics = NodeMetrics()
+    token = _current.set(metrics)
+    started = time.perf_counter()
+    try:
+        yield metrics
+    finally:
+        metrics.wall_ms = round((time.perf_counter() - started) * 1000, 1)
+        _current.reset(token)
+        for sink in _sinks:
+            sink.emit(node, metrics)
+
+
+def record_error(error: Exception, agent: str = "agent"):
+    """
+    Count an agent-level failure against the running node, which then
+    answers with a fallback, and log the degraded path.
+    """
+    log.warning("%s fell back after %s: %s", agent, type(error).__name__, error)
+    metrics = _current.get()
+    if metrics is None:
+        return
+    metrics.fallbacks += 1
+    if isinstance(error, OutputParserException):
+        metrics.parse_failures += 1
+
+
+def record_partial_failure(error: Exception, agent: str = "agent"):
+    """
+    Count a part of the running node's result that was lost to an error
+    while the rest still went through, and log it.
+    """
+    log.warning("%s lost a part after %s: %s", agent, type(error).__name__, error)
+    metrics = _current.get()
+    if metrics is not None:
+        metrics.partial_failures += 1
+
+
+def record_hedge():
+    """Count a duplicate LLM request sent by the running node."""
+    metrics = _current.get()
+    if metrics is not None:
+        metrics.hedges += 1
+
+
+def record_fast_path():
+    """Count a decision the running node made without calling the LLM."""
+    metrics = _current.get()
+    if metrics is not None:
+        metrics.fast_path += 1
+
+
+class MetricsCallbackHandler(BaseCallbackHandler):
+    """Attributes every chat model call to the node tracked in its context."""
+
+    run_inline = True
+
+    def on_chat_model_start(self, serialized, messages, **kwargs: Any) -> None:
+        metrics = _current.get()
+        if metrics is None:
+            return
+        text = "".join(str(m.content) for batch in messages for m in batch)
+        metrics.llm_calls += 1
+        metrics.prompt_chars += len(text)
+        metrics.prompt_tokens += estimate_tokens(text)
+
+    def on_llm_end(self, response, **kwargs: Any) -> None:
+        metrics = _current.get()
+        if metrics is None:
+            return
+        for generations in response.generations:
+            for generation in generations:
+                message = getattr(generation, "message", None)
+                usage = getattr(message, "usage_metadata", None)
+                if usage:
+                    metrics.completion_tokens += usage.get("output_tokens", 0)
+                else:
+                    metrics.completion_tokens += estimate_tokens(generation.text)
+
+    def on_llm_error(self, error: BaseException, **kwargs: Any) -> None:
+        metrics = _current.get()
+        if metrics is not None:
+            metrics.llm_errors += 1
+
+
+class RetryCallbackHandler(BaseCallbackHandler):
+    """
+    Counts the retries a backend client makes within one call (its on_retry
+    hook) against the node tracked in its context. Backend models get it
+    from src.llm.wrappers.backend_run_manager; the outermost model's
+    callbacks never see those retries.
+    """
+
+    run_inline = True
+
+    def on_retry(self, retry_state: Any, **kwargs: Any) -> None:
+        metrics = _current.get()
+        if metrics is not None:
+            metrics.retries += 1
+
+
+metrics_handler = MetricsCallbackHandler()
+retry_handler = RetryCallbackHandler()
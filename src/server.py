@@ -0,0 +1,211 @@
+"""
+Headless interview API around the turn graph, for many concurrent candidates.
+
+    POST /sessions                      {"name"?} -> {"session_id"}
+    GET  /sessions/<id>                 state summary and messages
+    POST /sessions/<id>/turns           {"message"} -> NDJSON event stream
+    POST /sessions/<id>/finish          -> {"report", "feedback_mode", "log"}
+    WS   /sessions/<id>/ws              {"message"} or {"type": "finish"}
+    GET  /health
+
+A turn streams one JSON object per line: {"event": "node", "node"} when a
+graph node finishes, {"event": "token", "text"} for each chunk of the
+interviewer's reply, and finally {"event": "reply", "turn", "message", ...}.
+The WebSocket sends the same events as messages, and {"event": "report", ...}
+after a finish request.
+
+    python -m src.server --port 8000
+    python -m src.server --workers 4    # sessions spread over 4 processes
+"""
+
+import argparse
+import asyncio
+import json
+import os
+from typing import Any
+
+import tornado.web
+import tornado.websocket
+from dotenv import load_dotenv
+from tornado.iostream import StreamClosedError
+
+# Agents pick their LLM backend when src.graph is imported.
+load_dotenv()
+
+from src.service import InterviewService, SessionNotFound  # noqa: E402
+from src.workers import WorkerPool  # noqa: E402
+
+SESSION = r"([0-9a-f]{32})"
+
+
+def event_payload(kind: str, payload: Any) -> dict[str, Any]:
+    if kind == "node":
+        return {"event": "node", "node": payload}
+    if kind == "token":
+        return {"event": "token", "text": payload}
+    return {"event": kind, **payload}
+
+
+class ServiceHandler(tornado.web.RequestHandler):
+    def initialize(self, service: InterviewService):
+        self.service = service
+
+    def json_body(self) -> dict[str, Any]:
+        if not self.request.body:
+            return {}
+        try:
+            body = json.loads(self.request.body)
+        except ValueError:
+            raise tornado.web.HTTPError(400, reason="body is not JSON") from None
+        if not isinstance(body, dict):
+            raise tornado.web.HTTPError(400, reason="body must be a JSON object")
+        return body
+
+    def write_json(self, payload: dict[str, Any], status: int = 200):
+        self.set_status(status)
+        self.set_header("Content-Type", "application/json; charset=utf-8")
+        self.finish(json.dumps(payload, ensure_ascii=False))
+
+    def require(self, session_id: str):
+        if not self.service.exists(session_id):
+            raise tornado.web.HTTPError(404, reason="unknown session")
+
+    def write_error(self, status_code: int, **kwargs: Any):
+        self.set_header("Content-Type", "application/json; charset=utf-8")
+        self.finish(json.dumps({"error": self._reason}))
+
+
+class SessionsHandler(ServiceHandler):
+    async def post(self):
+        session_id = await self.service.start(self.json_body().get("name"))
+        self.write_json({"session_id": session_id}, status=201)
+
+
+class SessionHandler(ServiceHandler):
+    async def get(self, session_id: str):
+        try:
+            self.write_json(await self.service.summary(session_id))
+        except SessionNotFound:
+            raise tornado.web.HTTPError(404, reason="unknown session") from None
+
+
+class TurnHandler(ServiceHandler):
+    async def post(self, session_id: str):
+        self.require(session_id)
+        message = self.json_body().get("message")
+        if not isinstance(message, str) or not message.strip():
+            raise tornado.web.HTTPError(400, reason="message is required")
+
+        self.set_header("Content-Type", "application/x-ndjson; charset=utf-8")
+        events = self.service.turn(session_id, message)
+        try:
+            async for kind, payload in events:
+                line = json.dumps(event_payload(kind, payload), ensure_ascii=False)
+                self.write(line + "\n")
+                await self.flush()
+        except StreamClosedError:
+            # The candidate went away; the turn is already saved or abandoned.
+            return
+        except Exception as e:
+            # Headers are already out, so report the failure in the stream.
+            self.write(json.dumps({"event": "error", "error": str(e)}) + "\n")
+        finally:
+            await events.aclose()
+        self.finish()
+
+
+class FinishHandler(ServiceHandler):
+    async def post(self, session_id: str):
+        self.require(session_id)
+        self.write_json(await self.service.finish(session_id))
+
+
+class HealthHandler(ServiceHandler):
+    def get(self):
+        self.write_json({"status": "ok", **self.service.stats()})
+
+
+class SessionSocket(tornado.websocket.WebSocketHandler):
+    def initialize(self, service: InterviewService):
+        self.service = service
+
+    def open(self, session_id: str):
+        self.session_id = session_id
+        if not self.service.exists(session_id):
+            self.close(4404, "unknown session")
+
+    async def on_message(self, raw: str | bytes):
+        # Tornado waits for this coroutine before delivering the next
+        # message, so a session's turns arrive one after another.
+        try:
+            request = json.loads(raw)
+        except ValueError:
+            request = {}
+        try:
+            if request.get("type") == "finish":
+                result = await self.service.finish(self.session_id)
+                await self.write_message(json.dumps({"event": "report", **result}))
+            elif isinstance(request.get("message"), str):
+                async for kind, payload in self.service.turn(
+                    self.session_id, request["message"]
+                ):
+                    await self.write_message(
+                        json.dumps(event_payload(kind, payload), ensure_ascii=False)
+                    )
+            else:
+                await self.write_message(
+                    json.dumps({"event": "error", "error": "message is required"})
+                )
+        except tornado.websocket.WebSocketClosedError:
+            pass
+        except Exception as e:
+            await self.write_message(json.dumps({"event": "error", "error": str(e)}))
+
+
+def make_app(
+    service: InterviewService | WorkerPool | None = None,
+) -> tornado.web.Application:
+    service = service or InterviewService()
+    kwargs = {"service": service}
+    return tornado.web.Application(
+        [
+            (r"/health", HealthHandler, kwargs),
+            (r"/sessions", SessionsHandler, kwargs),
+            (rf"/sessions/{SESSION}", SessionHandler, kwargs),
+            (rf"/sessions/{SESSION}/turns", TurnHandler, kwargs),
+            (rf"/sessions/{SESSION}/finish", FinishHandler, kwargs),
+            (rf"/sessions/{SESSION}/ws", SessionSocket, kwargs),
+        ]
+    )
+
+
+async def serve(host: str, port: int, workers: int = 0):
+    if workers:
+        service = WorkerPool(workers)
+        await service.start_workers()
+        where = f" ({service.size} workers)"
+    else:
+        service, where = InterviewService(), ""
+    make_app(service).listen(port, address=host)
+    print(f"Interview API listening on http://{host}:{port}{where}")
+    await asyncio.Event().wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--host", default=os.getenv("SERVER_HOST", "127.0.0.1"))
+    parser.add_argument(
+        "--port", type=int, default=int(os.getenv("SERVER_PORT", "8000"))
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=int(os.getenv("SERVER_WORKERS", "0")),
+        help="worker processes, 0 to run sessions in the server process",
+    )
+    args = parser.parse_args()
+    asyncio.run(serve(args.host, args.port, args.workers))
+
+
+if __name__ == "__main__":
+    main()
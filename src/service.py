@@ -0,0 +1,222 @@
+import asyncio
+import json
+import os
+import re
+import time
+import uuid
+from typing import Any, AsyncIterator
+
+from langchain_core.messages import HumanMessage
+
+from src.agents.feedback import FeedbackGenerator
+from src.llm.ratelimit import get_rate_limiter
+from src.llm.resilience import resilience_stats
+from src.llm.routing import get_router
+from src.logger import SessionLogger, format_internal_thoughts, get_log_writer
+from src.metrics import track
+from src.profile_parser import update_profile_from_message
+from src.session_store import SessionStore, get_session_store
+from src.state import initial_state, stage_for_turn
+from src.utils.formatter import beautify_log_file
+
+SESSION_ID = re.compile(r"[0-9a-f]{32}")
+
+
+class SessionNotFound(KeyError):
+    pass
+
+
+class _Session:
+    __slots__ = ("logger", "lock", "touched")
+
+    def __init__(self, logger: SessionLogger):
+        self.logger = logger
+        self.lock = asyncio.Lock()  # one turn at a time per session
+        self.touched = time.monotonic()
+
+
+class InterviewService:
+    """
+    The interview flow of src/app.py without the UI, for many concurrent
+    sessions on one event loop: start a session, run turns (streaming the
+    graph's events), finish with the report.
+
+    Session state lives in a SessionStore, so it can outlive this object.
+    Each session logs to its own `<log_dir>/<session_id>.json`. Sessions
+    idle for `idle_seconds` close their log; the next request reopens it
+    where it left off.
+    """
+
+    def __init__(
+        self,
+        store: SessionStore | None = None,
+        log_dir: str | None = None,
+        feedback: FeedbackGenerator | None = None,
+        idle_seconds: float | None = 1800,
+    ):
+        self.store = store or get_session_store()
+        self.log_dir = log_dir or os.getenv("SESSION_LOG_DIR", "logs")
+        os.makedirs(self.log_dir, exist_ok=True)
+        self.feedback = feedback or FeedbackGenerator()
+        self.idle_seconds = idle_seconds
+        self._sessions: dict[str, _Session] = {}
+
+    def log_path(self, session_id: str) -> str:
+        return os.path.join(self.log_dir, f"{session_id}.json")
+
+    def exists(self, session_id: str) -> bool:
+        if not SESSION_ID.fullmatch(session_id):
+            return False
+        if session_id in self._sessions:
+            return True
+        events = os.path.splitext(self.log_path(session_id))[0] + ".jsonl"
+        return os.path.exists(events)
+
+    def _session(self, session_id: str, new: bool = False) -> _Session:
+        session = self._sessions.get(session_id)
+        if session is None:
+            if not new and not self.exists(session_id):
+                raise SessionNotFound(session_id)
+            logger = SessionLogger(
+                self.log_path(session_id), writer=get_log_writer(), resume=not new
+            )
+            session = self._sessions[session_id] = _Session(logger)
+        session.touched = time.monotonic()
+        return session
+
+    async def start(
+        self, participant_name: str | None = None, session_id: str | None = None
+    ) -> str:
+        self.evict_idle()
+        session_id = session_id or uuid.uuid4().hex
+        self._session(session_id, new=True).logger.start_session(
+            participant_name or "Кандидат"
+        )
+        return session_id
+
+    async def turn(
+        self, session_id: str, message: str
+    ) -> AsyncIterator[tuple[str, Any]]:
+        """
+        Run the candidate's `message` through the graph. Yields ("node", name)
+        and ("token", text) as they happen, then ("reply", summary) with the
+        interviewer's message and the turn's timings.
+        """
+        session = self._session(session_id)
+        async with session.lock:
+            state = self.store.load(session_id) or initial_state()
+            turn_id = state["turn_count"] + 1
+            update: dict[str, Any] = {
+                "messages": [HumanMessage(content=message)],
+                "turn_count": turn_id,
+                "interview_stage": stage_for_turn(turn_id),
+            }
+            if turn_id <= 2:
+                profile = update_profile_from_message(
+                    state.get("candidate_profile", {}), message
+                )
+                update["candidate_profile"] = profile
+                if profile.get("name"):
+                    session.logger.set_participant(profile["name"])
+
+            started = time.perf_counter()
+            ttft_ms = None
+            final_state = None
+            async for kind, payload in self.store.astream_turn(session_id, update):
+                if kind == "state":
+                    final_state = payload
+                    continue
+                if kind == "token" and ttft_ms is None:
+                    ttft_ms = (time.perf_counter() - started) * 1000
+                yield kind, payload
+            turn_ms = (time.perf_counter() - started) * 1000
+            if ttft_ms is None:
+                ttft_ms = turn_ms
+
+            reply = final_state["messages"][-1].content
+            session.logger.log_turn(
+                turn_id,
+                reply,
+                message,
+                format_internal_thoughts(final_state),
+                ttft_ms=round(ttft_ms, 1),
+                metrics=final_state.get("node_metrics"),
+            )
+            session.touched = time.monotonic()
+            yield (
+                "reply",
+                {
+                    "turn": turn_id,
+                    "message": reply,
+                    "stage": final_state.get("interview_stage"),
+                    "topic": final_state.get("current_topic"),
+                    "difficulty": final_state.get("difficulty_level"),
+                    "ttft_ms": round(ttft_ms, 1),
+                    "turn_ms": round(turn_ms, 1),
+                },
+            )
+
+    async def finish(self, session_id: str) -> dict[str, Any]:
+        """Generate the final report and write the session's log."""
+        session = self._session(session_id)
+        async with session.lock:
+            state = self.store.load(session_id) or initial_state()
+            with track("feedback") as metrics:
+                result = await self.feedback.agenerate(state)
+            report = result.get("feedback_report")
+            logger = session.logger
+            if report:
+                logger.log_feedback(
+                    json.dumps(report, indent=2, ensure_ascii=False), metrics=metrics
+                )
+            logger.save_log()
+            logger.submit(lambda: beautify_log_file(logger.filename))
+            return {
+                "report": report,
+                "feedback_mode": result.get("feedback_mode"),
+                "log": logger.filename,
+            }
+
+    async def summary(self, session_id: str) -> dict[str, Any]:
+        if not self.exists(session_id):
+            raise SessionNotFound(session_id)
+        state = self.store.load(session_id) or initial_state()
+        return {
+            "session_id": session_id,
+            "turn_count": state["turn_count"],
+            "stage": state.get("interview_stage"),
+            "topic": state.get("current_topic"),
+            "difficulty": state.get("difficulty_level"),
+            "messages": [
+                {"role": m.role, "content": m.content} for m in state["messages"]
+            ],
+        }
+
+    def evict_idle(self) -> int:
+        """Close the logs of sessions idle for `idle_seconds`."""
+        if self.idle_seconds is None:
+            return 0
+        cutoff = time.monotonic() - self.idle_seconds
+        idle = [
+            session_id
+            for session_id, session in self._sessions.items()
+            if session.touched < cutoff and not session.lock.locked()
+        ]
+        for session_id in idle:
+            self._sessions.pop(session_id).logger.close()
+        return len(idle)
+
+    def stats(self) -> dict[str, Any]:
+        stats = {"open_sessions": len(self._sessions), "store": self.store.stats()}
+        limiter = get_rate_limiter()
+        if limiter is not None:
+            stats["rate_limit"] = limiter.stats()
+        stats["resilience"] = resilience_stats()
+        stats["routing"] = get_router().stats()
+        return stats
+
+    def close(self):
+        """Close every session's log; sessions reopen them on their next turn."""
+        for session in self._sessions.values():
+            session.logger.close()
+        self._sessions.clear()
@@ -0,0 +1,119 @@
+import os
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Any, AsyncIterator, Callable
+
+from src.checkpoint import get_checkpointer
+from src.graph import astream_turn, load_session
+from src.state import InterviewState, initial_state
+
+
+class SessionStore(ABC):
+    """
+    Where the interview state of server sessions lives between turns.
+
+    A turn hands the store only what it changes (the candidate's message,
+    turn counter, stage, profile); the store combines it with the session's
+    state, runs the graph and keeps the result.
+    """
+
+    @abstractmethod
+    def load(self, session_id: str) -> InterviewState | None:
+        """The session's latest state, or None if it has not had a turn yet."""
+
+    @abstractmethod
+    def astream_turn(
+        self, session_id: str, update: dict[str, Any]
+    ) -> AsyncIterator[tuple[str, Any]]:
+        """Run one turn, yielding astream_turn's events, and save its state."""
+
+    def delete(self, session_id: str):
+        pass
+
+    def stats(self) -> dict[str, Any]:
+        return {}
+
+
+class CheckpointSessionStore(SessionStore):
+    """Sessions as threads of the SQLite-checkpointed graph (src/checkpoint.py)."""
+
+    def load(self, session_id: str) -> InterviewState | None:
+        return load_session(session_id)
+
+    async def astream_turn(self, session_id, update):
+        if self.load(session_id) is None:
+            update = {**initial_state(), **update}
+        async for event in astream_turn(update, thread_id=session_id):
+            yield event
+
+    def delete(self, session_id: str):
+        get_checkpointer().delete_thread(session_id)
+
+    def stats(self) -> dict[str, Any]:
+        return get_checkpointer().stats()
+
+
+class MemorySessionStore(SessionStore):
+    """
+    Sessions in a dict, run on the stateless graph. Nothing survives a
+    restart; sessions idle for `idle_seconds` are dropped.
+    """
+
+    def __init__(self, idle_seconds: float | None = 1800):
+        self.idle_seconds = idle_seconds
+        self.evictions = 0
+        self._states: OrderedDict[str, tuple[float, InterviewState]] = OrderedDict()
+
+    def load(self, session_id: str) -> InterviewState | None:
+        entry = self._states.get(session_id)
+        return entry[1] if entry is not None else None
+
+    async def astream_turn(self, session_id, update):
+        state = self.load(session_id) or initial_state()
+        state = {
+            **state,
+            **update,
+            "messages": state["messages"] + update.get("messages", []),
+        }
+        async for kind, payload in astream_turn(state):
+            if kind == "state":
+                self._states[session_id] = (time.monotonic(), payload)
+                self._states.move_to_end(session_id)
+                self._evict_idle()
+            yield kind, payload
+
+    def _evict_idle(self):
+        if self.idle_seconds is None:
+            return
+        cutoff = time.monotonic() - self.idle_seconds
+        while self._states:
+            session_id, (touched, _) = next(iter(self._states.items()))
+            if touched > cutoff:
+                break
+            del self._states[session_id]
+            self.evictions += 1
+
+    def delete(self, session_id: str):
+        self._states.pop(session_id, None)
+
+    def stats(self) -> dict[str, Any]:
+        return {"cached_threads": len(self._states), "evictions": self.evictions}
+
+
+_STORES: dict[str, Callable[[], SessionStore]] = {
+    "checkpoint": CheckpointSessionStore,
+    "memory": MemorySessionStore,
+}
+
+
+def register_session_store(name: str, factory: Callable[[], SessionStore]):
+    _STORES[name] = factory
+
+
+def get_session_store(name: str | None = None) -> SessionStore:
+    """A new store of the kind named, by default SESSION_STORE ("checkpoint")."""
+    name = name or os.getenv("SESSION_STORE", "checkpoint")
+    if name not in _STORES:
+        raise ValueError(f"Unknown session store: {name}. Known: {sorted(_STORES)}")
+    return _STORES[name]()
@@ -0,0 +1,238 @@
+import asyncio
+import threading
+from concurrent.futures import Future
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Awaitable, Callable
+
+from langchain_core.messages import HumanMessage
+
+from src.llm.ratelimit import priority
+from src.message_store import append_messages
+from src.llm.routing import stage
+from src.state import InterviewState
+
+Branch = str  # "correct" | "wrong"
+
+# Only branches whose reply doesn't depend on what the candidate actually
+# said. A question about the job, an off-topic remark or a hallucination
+# has to be answered in its own words, so those turns are never served.
+# A reply is only served when the strategy took the step and difficulty
+# change the branch assumed (the rules in src/agents/strategy.py).
+
+BRANCHES: dict[Branch, dict[str, Any]] = {
+    "correct": {
+        "message": "(Кандидат ответил верно и уверенно.)",
+        "directive": "The candidate answered well. Ask a harder question about {topic}.",
+        "next_step": "ask_question",
+        "difficulty_change": 1,
+    },
+    "wrong": {
+        "message": "(Кандидат ответил неверно или неуверенно.)",
+        "directive": "The candidate is struggling with {topic}. Give a short hint "
+        "and ask a simpler question.",
+        "next_step": "hint",
+        "difficulty_change": -1,
+    },
+}
+
+_active: ContextVar["Speculator | None"] = ContextVar("speculator", default=None)
+
+_loop: asyncio.AbstractEventLoop | None = None
+_loop_lock = threading.Lock()
+
+
+def _background_loop() -> asyncio.AbstractEventLoop:
+    """Event loop on a daemon thread that outlives any single request."""
+    global _loop
+    with _loop_lock:
+        if _loop is None:
+            _loop = asyncio.new_event_loop()
+            threading.Thread(
+                target=_loop.run_forever, name="speculation", daemon=True
+            ).start()
+        return _loop
+
+
+def branch_difficulty(difficulty: int, branch: Branch) -> int:
+    """The difficulty `branch` moves to from `difficulty`, on the 1-5 scale."""
+    return max(1, min(5, difficulty + BRANCHES[branch]["difficulty_change"]))
+
+
+def branch_for(state: InterviewState) -> Branch | None:
+    """Which speculated branch the analyzed turn fell on, if any."""
+    tech = state.get("tech_analysis") or {}
+    behav = state.get("behavioral_analysis") or {}
+    if "error" in tech or "error" in behav:
+        return None
+    if (
+        behav.get("off_topic_attempt")
+        or behav.get("candidate_question")
+        or tech.get("hallucination_detected")
+    ):
+        return None
+    if tech.get("is_correct") is True:
+        return "correct"
+    if tech.get("is_correct") is False:
+        return "wrong"
+    return None
+
+
+class Speculator:
+    """
+    Pre-generates the interviewer's next reply for the main branches while
+    the candidate is still typing.
+
+    start() launches one reply per branch on a background event loop, from
+    the current topic and difficulty and a stand-in for the candidate's
+    answer. During the next turn, inside serving(), the interviewer takes
+    the reply for the branch the analysis landed on, provided the strategy
+    kept the topic, took the branch's step and difficulty, and the reply is
+    already finished; take() never waits. When the block exits, the
+    remaining speculations are cancelled.
+
+    Each branch forks the message history, so the stand-in answer never
+    reaches the session's store.
+    """
+
+    def __init__(
+        self,
+        compose: Callable[[InterviewState], Awaitable[dict[str, Any]]],
+        branches: list[Branch] | None = None,
+    ):
+        self.compose = compose
+        self.branches = branches or list(BRANCHES)
+        self._pending: dict[Branch, Future] = {}
+        self._turn: int | None = None
+        self._topic: str | None = None
+        self._difficulty = 1
+        self._lock = threading.Lock()
+        self.started = 0
+        self.hits = 0
+        self.misses = 0
+        self.wasted = 0  # finished but unused
+        self.cancelled = 0  # stopped before finishing
+
+    def _branch_state(self, state: InterviewState, branch: Branch) -> InterviewState:
+        spec = BRANCHES[branch]
+        topic = state.get("current_topic") or "General"
+        answer = HumanMessage(content=spec["message"])
+        return {
+            **state,
+            "messages": append_messages(state["messages"].fork(), [answer]),
+            "strategy_directive": spec["directive"].format(topic=topic),
+            "strategy_next_step": spec["next_step"],
+            "difficulty_level": branch_difficulty(
+                state.get("difficulty_level", 1), branch
+            ),
+        }
+
+    def start(self, state: InterviewState):
+        """Speculate on the turn after `state`, dropping older speculations."""
+        self.cancel()
+        loop = _background_loop()
+        with self._lock:
+            self._turn = state.get("turn_count", 0) + 1
+            self._topic = state.get("current_topic")
+            self._difficulty = state.get("difficulty_level", 1)
+            for branch in self.branches:
+                self._pending[branch] = asyncio.run_coroutine_threadsafe(
+                    self._speculate(self._branch_state(state, branch)), loop
+                )
+                self.started += 1
+
+    async def _speculate(self, state: InterviewState) -> dict[str, Any]:
+        # Nobody waits for a guess: live calls go first at the rate limiter.
+        with priority("background"), stage(state.get("interview_stage")):
+            return await self.compose(state)
+
+    def _claim(self, state: InterviewState) -> Future | None:
+        with self._lock:
+            if not self._pending or state.get("turn_count") != self._turn:
+                return None
+            branch = branch_for(state)
+            if branch is None or not self._decided_as(state, branch):
+                self.misses += 1
+                return None
+            future = self._pending.pop(branch, None)
+            if future is not None and not future.done():
+                # Still queued or running at background priority: waiting
+                # for it would put the live reply behind the rate limiter's
+                # lowest class. Compose it fresh at interactive priority.
+                future.cancel()
+                self.cancelled += 1
+                future = None
+            if future is None:
+                self.misses += 1
+            return future
+
+    def _decided_as(self, state: InterviewState, branch: Branch) -> bool:
+        """Whether the strategy's decision is the one `branch` was composed for."""
+        return (
+            state.get("current_topic") == self._topic
+            and state.get("strategy_next_step") == BRANCHES[branch]["next_step"]
+            and state.get("difficulty_level")
+            == branch_difficulty(self._difficulty, branch)
+        )
+
+    def _hit(self, result: dict[str, Any]) -> dict[str, Any] | None:
+        if not result.get("messages"):
+            return None
+        with self._lock:
+            self.hits += 1
+        return result
+
+    def take(self, state: InterviewState) -> dict[str, Any] | None:
+        future = self._claim(state)
+        if future is None:
+            return None
+        try:
+            return self._hit(future.result())
+        except Exception:
+            return None
+
+    async def atake(self, state: InterviewState) -> dict[str, Any] | None:
+        # Only finished speculations are served, so this never blocks.
+        return self.take(state)
+
+    def cancel(self):
+        with self._lock:
+            for future in self._pending.values():
+                if future.done():
+                    self.wasted += 1
+                else:
+                    future.cancel()
+                    self.cancelled += 1
+            self._pending.clear()
+
+    @contextmanager
+    def serving(self):
+        """Offer speculated replies to the interviewer for the duration of a turn."""
+        token = _active.set(self)
+        try:
+            yield self
+        finally:
+            _active.reset(token)
+            self.cancel()
+
+    def stats(self) -> dict[str, float]:
+        with self._lock:
+            decided = self.hits + self.misses
+            return {
+                "started": self.started,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / decided if decided else 0.0,
+                "wasted": self.wasted,
+                "cancelled": self.cancelled,
+            }
+
+
+def take_speculation(state: InterviewState) -> dict[str, Any] | None:
+    speculator = _active.get()
+    return speculator.take(state) if speculator is not None else None
+
+
+async def atake_speculation(state: InterviewState) -> dict[str, Any] | None:
+    speculator = _active.get()
+    return await speculator.atake(state) if speculator is not None else None
@@ -1,14 +1,19 @@
-from typing import Any, TypedDict, Annotated
+from typing import Any, Sequence, TypedDict, Annotated
 import operator
+
 from langchain_core.messages import BaseMessage
 
+from src.message_store import MessageView, append_messages
+
 
 class InterviewState(TypedDict):
     """
     Global state for the interview process.
     """
 
-    messages: Annotated[list[BaseMessage], operator.add]
+    # Views over the session's append-only message store: each step appends
+    # in place instead of concatenating the history (see src/message_store.py).
+    messages: Annotated[MessageView, append_messages]
     candidate_profile: dict[str, Any]  # Skills, confidence, gaps, name, position
     interview_stage: str  # 'intro', 'main', 'code', 'behavioral', 'closing'
     current_topic: str | None
@@ -18,4 +23,57 @@ class InterviewState(TypedDict):
     tech_analysis: dict[str, Any] | None
     behavioral_analysis: dict[str, Any] | None
     strategy_directive: str | None
+    strategy_next_step: str | None  # StrategyDecision.next_step
     strategy_reasoning: str | None  # Reasoning behind strategy decisions
+
+    # Pipelined topology only: the reply drafted before this turn's analysis
+    # finished, and whether the analysis made the interviewer redo it.
+    draft_reply: str | None
+    reply_preempted: bool
+
+    # Per-session evidence for the final report (see src/ledger.py), updated
+    # once per turn so the report doesn't have to re-read the transcript.
+    evidence_ledger: dict[str, Any]
+
+    # node -> NodeMetrics dump (wall_ms, prompt/completion tokens, failures)
+    node_metrics: Annotated[dict[str, dict[str, Any]], operator.or_]
+
+
+def initial_state() -> InterviewState:
+    """State of a fresh interview, before the candidate introduces themselves."""
+    return {
+        "messages": MessageView(),
+        "candidate_profile": {},
+        "interview_stage": "intro",
+        "current_topic": "Знакомство",
+        "turn_count": 0,
+        "difficulty_level": 1,
+        "tech_analysis": {},
+        "behavioral_analysis": {},
+        "strategy_directive": "Ожидание представления кандидата...",
+        "strategy_next_step": None,
+        "strategy_reasoning": None,
+        "evidence_ledger": {},
+        "node_metrics": {},
+    }
+
+
+def stage_for_turn(turn: int) -> str:
+    if turn == 1:
+        return "intro"
+    elif turn <= 5:
+        return "main"
+    elif turn <= 8:
+        return "behavioral"
+    return "closing"
+
+
+def last_answer(messages: Sequence[BaseMessage]) -> BaseMessage | None:
+    """
+    The candidate's latest message, or None before the first one. Searches
+    from the end, so a turn doesn't pay for the whole history.
+    """
+    for message in reversed(messages):
+        if message.type == "human":
+            return message
+    return None
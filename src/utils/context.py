@@ -0,0 +1,107 @@
+import os
+import re
+from functools import lru_cache
+
+from langchain_core.messages import BaseMessage
+
+from src.utils.tokens import estimate_tokens
+from src.utils.transcript import Transcript, transcript_for
+
+# Prompt history budgets in estimated tokens, per agent. Override with
+# CONTEXT_BUDGET_<AGENT>, e.g. CONTEXT_BUDGET_INTERVIEWER=3000.
+DEFAULT_BUDGETS = {
+    "technical": 1200,
+    "behavioral": 1200,
+    "fused": 1500,
+    "interviewer": 1600,
+    "feedback": 8000,
+}
+
+# Share of the budget reserved for recent messages kept word for word; the
+# rest holds one-line summaries of older ones.
+VERBATIM_SHARE = 0.7
+SUMMARY_CHARS = 160
+
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s")
+
+
+def budget_for(agent: str) -> int:
+    override = os.getenv(f"CONTEXT_BUDGET_{agent.upper()}")
+    return int(override) if override else DEFAULT_BUDGETS.get(agent, 1500)
+
+
+@lru_cache(maxsize=4096)
+def _tokens(text: str) -> int:
+    return estimate_tokens(text)
+
+
+def clip(text: str, budget: int) -> str:
+    """Fit text into `budget` tokens, keeping its beginning and its end."""
+    tokens = _tokens(text)
+    if tokens <= budget:
+        return text
+    keep = max(1, int(len(text) * budget / tokens))
+    head = keep * 2 // 3
+    return f"{text[:head]} … [truncated] … {text[len(text) - (keep - head) :]}"
+
+
+@lru_cache(maxsize=4096)
+def _summary(kind: str, content: str) -> str:
+    """Extractive one-liner: the first sentence, capped at SUMMARY_CHARS."""
+    text = " ".join(content.split())
+    first = _SENTENCE_END.split(text, maxsplit=1)[0]
+    if len(first) > SUMMARY_CHARS:
+        first = first[: SUMMARY_CHARS - 1] + "…"
+    elif len(first) < len(text):
+        first += " …"
+    return f"{kind} (summary): {first}"
+
+
+def render_history(messages: list[BaseMessage], budget: int) -> str:
+    """
+    Render the conversation for a prompt within `budget` estimated tokens.
+    The most recent messages are kept verbatim (the newest one clipped if it
+    alone is too long), older ones are replaced by cached one-line summaries,
+    and whatever still doesn't fit is left out with a marker.
+
+    Rendering goes through the conversation's Transcript, so each message is
+    formatted and counted once per session and agents with the same budget
+    share the result within a turn.
+    """
+    transcript = transcript_for(messages)
+    with transcript.lock:
+        transcript.sync(messages)
+        return transcript.cached(
+            ("history", budget), lambda: _render(messages, transcript, budget)
+        )
+
+
+def _render(messages: list[BaseMessage], transcript: Transcript, budget: int) -> str:
+    verbatim_budget = int(budget * VERBATIM_SHARE)
+    n = len(transcript)
+    i = transcript.tail_start(verbatim_budget)
+    if i < n:
+        recent = transcript.view(i)
+        used = transcript.tokens_between(i, n)
+    elif n:
+        recent = clip(transcript.lines[-1], verbatim_budget)
+        used = _tokens(recent)
+        i = n - 1
+    else:
+        return ""
+
+    older: list[str] = []
+    while i > 0:
+        message = messages[i - 1]
+        line = _summary(message.type, str(message.content))
+        cost = _tokens(line)
+        if used + cost > budget:
+            break
+        older.append(line)
+        used += cost
+        i -= 1
+
+    lines = [f"[{i} earlier messages omitted]"] if i else []
+    lines += reversed(older)
+    lines.append(recent)
+    return "\n".join(lines)
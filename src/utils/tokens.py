@@ -0,0 +1,14 @@
+import re
+
+_PIECES = re.compile(r"\w+|[^\w\s]")
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Cheap local estimate of the model's token count: words and punctuation,
+    with long words split into subword pieces of ~3.5 characters. Close
+    enough for Latin and Cyrillic text to budget prompts.
+    """
+    if not text:
+        return 0
+    return sum(max(1, round(len(piece) / 3.5)) for piece in _PIECES.findall(text))
@@ -0,0 +1,111 @@
+import threading
+from bisect import bisect_left
+from collections import OrderedDict
+from typing import Callable
+
+from langchain_core.messages import BaseMessage
+
+from src.utils.tokens import estimate_tokens
+
+MAX_SESSIONS = 256
+
+
+def render_message(message: BaseMessage) -> str:
+    return f"{message.type}: {message.content}"
+
+
+class Transcript:
+    """
+    Rendered form of one conversation, kept in step with its message list.
+
+    Each message is rendered and token-counted once, when sync() first sees
+    it; prefix sums of the token counts make budget windows a binary search.
+    Derived views are cached until the transcript changes, so agents asking
+    for the same view in the same turn share one join.
+
+    Callers that sync and then read must hold `lock` across both: states
+    forked from the same history (parallel speculations) sync the same
+    Transcript to different tails.
+    """
+
+    def __init__(self):
+        self.lines: list[str] = []
+        self.tokens: list[int] = []
+        self._prefix: list[int] = [0]  # tokens in lines[:i]
+        self._messages: list[BaseMessage] = []
+        self._views: dict[tuple, str] = {}
+        self.lock = threading.RLock()
+
+    def __len__(self) -> int:
+        return len(self.lines)
+
+    @property
+    def total_tokens(self) -> int:
+        return self._prefix[-1]
+
+    def sync(self, messages: list[BaseMessage]) -> "Transcript":
+        """Match `messages`, re-rendering only past their common prefix."""
+        with self.lock:
+            # Histories only grow, so if position k-1 holds the same message
+            # object, the first k positions do. Usually 0 or 1 steps back.
+            k = min(len(self.lines), len(messages))
+            while k and messages[k - 1] is not self._messages[k - 1]:
+                k -= 1
+            if k == len(self.lines) == len(messages):
+                return self
+            del self.lines[k:], self.tokens[k:], self._messages[k:]
+            del self._prefix[k + 1 :]
+            for message in messages[k:]:
+                line = render_message(message)
+                tokens = estimate_tokens(line)
+                self.lines.append(line)
+                self.tokens.append(tokens)
+                self._prefix.append(self._prefix[-1] + tokens)
+                self._messages.append(message)
+            self._views.clear()
+            return self
+
+    def tokens_between(self, start: int, end: int) -> int:
+        return self._prefix[end] - self._prefix[start]
+
+    def tail_start(self, budget: int) -> int:
+        """First index of the longest run of final lines within `budget` tokens."""
+        end = len(self.lines)
+        return bisect_left(self._prefix, self._prefix[end] - budget, 0, end)
+
+    def view(self, start: int = 0) -> str:
+        """lines[start:] joined, cached until the transcript changes."""
+        return self.cached(("lines", start), lambda: "\n".join(self.lines[start:]))
+
+    def cached(self, key: tuple, build: Callable[[], str]) -> str:
+        """A derived view of the current transcript, built once per key."""
+        with self.lock:
+            value = self._views.get(key)
+            if value is None:
+                value = self._views[key] = build()
+            return value
+
+
+_transcripts: OrderedDict[int, tuple[BaseMessage, Transcript]] = OrderedDict()
+_lock = threading.Lock()
+
+
+def transcript_for(messages: list[BaseMessage]) -> Transcript:
+    """
+    The Transcript of the conversation `messages` belongs to, synced to it.
+    A conversation is identified by its first message object, which every
+    later state of the same session shares.
+    """
+    if not messages:
+        return Transcript()
+    first = messages[0]
+    with _lock:
+        entry = _transcripts.get(id(first))
+        if entry is None or entry[0] is not first:
+            entry = (first, Transcript())
+            _transcripts[id(first)] = entry
+            if len(_transcripts) > MAX_SESSIONS:
+                _transcripts.popitem(last=False)
+        else:
+            _transcripts.move_to_end(id(first))
+    return entry[1].sync(messages)
@@ -0,0 +1,311 @@
+import asyncio
+import itertools
+import multiprocessing
+import os
+import threading
+import uuid
+from typing import Any, AsyncIterator
+
+from dotenv import load_dotenv
+
+from src.service import SESSION_ID, SessionNotFound
+
+# What a worker may be asked to run; everything else is refused.
+_METHODS = ("start", "turn", "finish", "summary", "stats", "evict_idle")
+
+
+class WorkerError(RuntimeError):
+    pass
+
+
+def _serve(conn, store: str, log_dir: str | None):
+    """Entry point of a worker process: an InterviewService on its own loop."""
+    # A spawned worker starts from scratch: configure it like src/server.py
+    # before the agents are built.
+    load_dotenv()
+    from src.service import InterviewService
+    from src.session_store import get_session_store
+
+    service = InterviewService(store=get_session_store(store), log_dir=log_dir)
+    asyncio.run(_WorkerLoop(conn, service).run())
+
+
+class _WorkerLoop:
+    """
+    The worker side of the pipe. Requests are (request_id, method, args);
+    each runs as its own task, and answers go back as (request_id, kind,
+    payload) with kind "event" (a turn's events), "done", "missing" or
+    "error". ("stop",) finishes the running requests and exits.
+    """
+
+    def __init__(self, conn, service):
+        self.conn = conn
+        self.service = service
+
+    async def run(self):
+        loop = asyncio.get_running_loop()
+        stopped = asyncio.Event()
+        tasks: set[asyncio.Task] = set()
+
+        def dispatch(message):
+            if message is None:
+                stopped.set()
+                return
+            task = loop.create_task(self.handle(*message))
+            tasks.add(task)
+            task.add_done_callback(tasks.discard)
+
+        def read():
+            while True:
+                try:
+                    message = self.conn.recv()
+                except (EOFError, OSError):
+                    message = ("stop",)
+                stop = message[0] == "stop"
+                loop.call_soon_threadsafe(dispatch, None if stop else message)
+                if stop:
+                    return
+
+        threading.Thread(target=read, name="worker-reader", daemon=True).start()
+        self.send(None, "ready", os.getpid())
+        await stopped.wait()
+        while tasks:
+            await asyncio.gather(*tasks, return_exceptions=True)
+        self.service.close()
+        self.conn.close()
+
+    def send(self, request_id: int | None, kind: str, payload: Any):
+        try:
+            self.conn.send((request_id, kind, payload))
+        except (BrokenPipeError, OSError):
+            pass  # the front process is gone
+
+    async def handle(self, request_id: int, method: str, args: tuple):
+        try:
+            if method not in _METHODS:
+                raise WorkerError(f"Unknown method: {method}")
+            if method == "turn":
+                async for event in self.service.turn(*args):
+                    self.send(request_id, "event", event)
+                result = None
+            else:
+                result = getattr(self.service, method)(*args)
+                if asyncio.iscoroutine(result):
+                    result = await result
+            self.send(request_id, "done", result)
+        except SessionNotFound as e:
+            self.send(request_id, "missing", str(e))
+        except Exception as e:
+            self.send(request_id, "error", f"{type(e).__name__}: {e}")
+
+
+class _Worker:
+    """The front side of one worker process: its pipe and open requests."""
+
+    def __init__(self, index: int, ctx, store: str, log_dir: str | None):
+        self.index = index
+        self.loop = asyncio.get_running_loop()
+        self.conn, child = ctx.Pipe()
+        self.process = ctx.Process(
+            target=_serve,
+            args=(child, store, log_dir),
+            name=f"interview-worker-{index}",
+            daemon=True,
+        )
+        self.process.start()
+        child.close()
+        self.pending: dict[int, asyncio.Queue] = {}
+        self.ready = asyncio.Event()
+        self.closed = asyncio.Event()
+        self.draining = False
+        self._ids = itertools.count()
+        threading.Thread(
+            target=self._read, name=f"worker-{index}-reader", daemon=True
+        ).start()
+
+    def _read(self):
+        try:
+            while True:
+                try:
+                    request_id, kind, payload = self.conn.recv()
+                except (EOFError, OSError):
+                    break
+                self.loop.call_soon_threadsafe(self._deliver, request_id, kind, payload)
+            self.loop.call_soon_threadsafe(self._close)
+        except RuntimeError:
+            pass  # the front's event loop is already closed
+
+    def _deliver(self, request_id: int | None, kind: str, payload: Any):
+        if kind == "ready":
+            self.ready.set()
+            return
+        queue = self.pending.get(request_id)
+        if queue is not None:
+            queue.put_nowait((kind, payload))
+
+    def _close(self):
+        # The worker exited or crashed: whatever it was running is lost.
+        for queue in self.pending.values():
+            queue.put_nowait(("error", f"worker {self.index} exited"))
+        self.pending.clear()
+        self.conn.close()
+        self.ready.set()  # nobody should wait for a worker that died starting
+        self.closed.set()
+
+    @property
+    def alive(self) -> bool:
+        return not self.closed.is_set() and self.process.is_alive()
+
+    def request(self, method: str, args: tuple) -> tuple[int, asyncio.Queue]:
+        request_id = next(self._ids)
+        queue = self.pending[request_id] = asyncio.Queue()
+        self.conn.send((request_id, method, args))
+        return request_id, queue
+
+    def stop(self):
+        self.draining = True
+        try:
+            self.conn.send(("stop",))
+        except (BrokenPipeError, OSError):
+            pass
+
+
+class WorkerPool:
+    """
+    Runs sessions in `workers` processes (by default one per core), each an
+    InterviewService on its own event loop, so agent orchestration, JSON
+    parsing and validation of different sessions don't share one GIL. Has
+    InterviewService's interface, so src/server.py can front either.
+
+    Sessions are sticky: a session's id picks its worker, which holds its
+    loggers and the checkpointer's in-memory copy of its history. The
+    state itself is in the session store, so a worker that crashes or is
+    restarted (see restart) comes back without losing sessions; only the
+    requests it was running at that moment fail. With the "memory" store
+    sessions die with their worker.
+    """
+
+    def __init__(
+        self,
+        workers: int | None = None,
+        store: str | None = None,
+        log_dir: str | None = None,
+    ):
+        self.size = workers or os.cpu_count() or 1
+        self.store = store or os.getenv("SESSION_STORE", "checkpoint")
+        self.log_dir = log_dir or os.getenv("SESSION_LOG_DIR", "logs")
+        os.makedirs(self.log_dir, exist_ok=True)
+        self.restarts = 0
+        self._ctx = multiprocessing.get_context("spawn")
+        self._workers: list[_Worker | None] = [None] * self.size
+        self._started: set[str] = set()
+
+    def route(self, session_id: str) -> int:
+        return int(session_id[:8], 16) % self.size
+
+    async def _worker(self, index: int) -> _Worker:
+        worker = self._workers[index]
+        while worker is not None and worker.draining and worker.alive:
+            await worker.closed.wait()
+            worker = self._workers[index]  # another request may have respawned it
+        if worker is None or not worker.alive:
+            if worker is not None:
+                self.restarts += 1
+            worker = self._workers[index] = _Worker(
+                index, self._ctx, self.store, self.log_dir
+            )
+        return worker
+
+    async def _stream(
+        self, session_id: str, method: str, *args: Any
+    ) -> AsyncIterator[tuple[str, Any]]:
+        worker = await self._worker(self.route(session_id))
+        try:
+            request_id, queue = worker.request(method, args)
+        except OSError:
+            raise WorkerError(f"worker {worker.index} exited") from None
+        try:
+            while True:
+                kind, payload = await queue.get()
+                if kind == "missing":
+                    raise SessionNotFound(session_id)
+                if kind == "error":
+                    raise WorkerError(payload)
+                yield kind, payload
+                if kind == "done":
+                    return
+        finally:
+            worker.pending.pop(request_id, None)
+
+    async def _call(self, session_id: str, method: str, *args: Any) -> Any:
+        result = None
+        async for kind, payload in self._stream(session_id, method, *args):
+            if kind == "done":
+                result = payload
+        return result
+
+    def exists(self, session_id: str) -> bool:
+        if not SESSION_ID.fullmatch(session_id):
+            return False
+        if session_id in self._started:
+            return True
+        events = os.path.join(self.log_dir, f"{session_id}.jsonl")
+        return os.path.exists(events)
+
+    async def start(
+        self, participant_name: str | None = None, session_id: str | None = None
+    ) -> str:
+        session_id = session_id or uuid.uuid4().hex
+        await self._call(session_id, "start", participant_name, session_id)
+        self._started.add(session_id)
+        return session_id
+
+    async def turn(
+        self, session_id: str, message: str
+    ) -> AsyncIterator[tuple[str, Any]]:
+        events = self._stream(session_id, "turn", session_id, message)
+        async for kind, payload in events:
+            if kind == "event":
+                yield payload
+
+    async def finish(self, session_id: str) -> dict[str, Any]:
+        return await self._call(session_id, "finish", session_id)
+
+    async def summary(self, session_id: str) -> dict[str, Any]:
+        return await self._call(session_id, "summary", session_id)
+
+    async def start_workers(self):
+        """Start every worker now and wait until they take requests."""
+        workers = [await self._worker(index) for index in range(self.size)]
+        await asyncio.gather(*(w.ready.wait() for w in workers))
+
+    async def restart(self, index: int | None = None):
+        """
+        Restart one worker, or all of them one after another. A worker
+        finishes its running requests first; its new requests wait.
+        """
+        for i in range(self.size) if index is None else [index]:
+            worker = self._workers[i]
+            if worker is None or not worker.alive:
+                continue
+            worker.stop()
+            await worker.closed.wait()
+            await self._worker(i)
+
+    async def close(self):
+        workers = [w for w in self._workers if w is not None and w.alive]
+        for worker in workers:
+            worker.stop()
+        await asyncio.gather(*(w.closed.wait() for w in workers))
+        for worker in workers:
+            worker.process.join(timeout=5)
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "workers": self.size,
+            "alive": sum(1 for w in self._workers if w is not None and w.alive),
+            "restarts": self.restarts,
+            "open_requests": sum(
+                len(w.pending) for w in self._workers if w is not None
+            ),
+        }
@@ -0,0 +1,6 @@
+import os
+
+# Tests never reach a real LLM: agents get the offline fake model, and
+# nothing is cached or rate limited between tests.
+os.environ["LLM_BACKEND"] = "fake"
+os.environ["LLM_CACHE"] = "off"
@@ -0,0 +1,31 @@
+import json
+
+from langchain_core.messages import HumanMessage
+
+from src.llm.cassette import Cassette, CassetteChatModel
+from src.llm.fake import FakeChatModel
+
+MODEL = CassetteChatModel(inner=FakeChatModel(), agent="interviewer")
+
+
+def record_turn(cassette: Cassette, turn: int, answer: str, calls: int = 1):
+    with cassette.turn(turn, user_message=answer):
+        for _ in range(calls):
+            MODEL.invoke([HumanMessage(answer)])
+
+
+def test_resumed_recording_keeps_the_earlier_turns(tmp_path):
+    record_turn(Cassette("s1", directory=str(tmp_path)), 1, "Привет")
+    record_turn(Cassette("s1", directory=str(tmp_path), resume=True), 2, "Про GIL")
+
+    replay = Cassette("s1", directory=str(tmp_path), mode="replay")
+    assert replay.inputs == {"1": "Привет", "2": "Про GIL"}
+    assert sorted(replay.data["calls"]) == ["1/interviewer/0", "2/interviewer/0"]
+
+
+def test_a_turn_recorded_again_replaces_its_calls(tmp_path):
+    record_turn(Cassette("s1", directory=str(tmp_path)), 1, "Привет", calls=2)
+    record_turn(Cassette("s1", directory=str(tmp_path), resume=True), 1, "Привет")
+
+    with open(tmp_path / "s1.json", encoding="utf-8") as f:
+        assert list(json.load(f)["calls"]) == ["1/interviewer/0"]
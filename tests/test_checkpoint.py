@@ -0,0 +1,107 @@
+from typing import Annotated, TypedDict
+
+from langchain_core.messages import AIMessage, HumanMessage
+from langgraph.graph import END, START, StateGraph
+
+from src.checkpoint import SessionCheckpointer
+from src.message_store import MessageView, append_messages
+
+CONFIG = {"configurable": {"thread_id": "s1"}}
+
+
+class EchoState(TypedDict):
+    messages: Annotated[MessageView, append_messages]
+
+
+def echo(state: EchoState) -> dict:
+    return {"messages": [AIMessage(f"Вы сказали: {state['messages'][-1].content}")]}
+
+
+def graph(checkpointer: SessionCheckpointer):
+    workflow = StateGraph(EchoState)
+    workflow.add_node("echo", echo)
+    workflow.add_edge(START, "echo")
+    workflow.add_edge("echo", END)
+    return workflow.compile(checkpointer=checkpointer)
+
+
+def say(app, text: str, config=CONFIG) -> dict:
+    return app.invoke({"messages": [HumanMessage(text)]}, config)
+
+
+def stored(checkpointer: SessionCheckpointer) -> list[str]:
+    with checkpointer.cursor(transaction=False) as cur:
+        rows = cur.execute(
+            "SELECT content FROM messages WHERE thread_id = 's1' ORDER BY seq"
+        ).fetchall()
+    return [content for (content,) in rows]
+
+
+def test_writes_each_message_once(tmp_path):
+    checkpointer = SessionCheckpointer(str(tmp_path / "ck.sqlite"))
+    app = graph(checkpointer)
+
+    say(app, "один")
+    say(app, "два")
+
+    assert stored(checkpointer) == [
+        "один",
+        "Вы сказали: один",
+        "два",
+        "Вы сказали: два",
+    ]
+    with checkpointer.cursor(transaction=False) as cur:
+        (blob,) = cur.execute(
+            "SELECT checkpoint FROM checkpoints ORDER BY rowid DESC LIMIT 1"
+        ).fetchone()
+    assert "Вы сказали".encode() not in blob
+
+
+def test_rehydrates_an_evicted_session(tmp_path):
+    path = str(tmp_path / "ck.sqlite")
+    checkpointer = SessionCheckpointer(path)
+    app = graph(checkpointer)
+    say(app, "один")
+
+    checkpointer.evict("s1")
+    assert checkpointer.cached_threads() == 0
+    state = app.get_state(CONFIG).values
+    assert [m.content for m in state["messages"]] == ["один", "Вы сказали: один"]
+
+    # a fresh process only has the database
+    cold = graph(SessionCheckpointer(path))
+    result = say(cold, "два")
+    assert [m.content for m in result["messages"]][-1] == "Вы сказали: два"
+    assert len(result["messages"]) == 4
+
+
+def test_evicts_idle_sessions(tmp_path):
+    checkpointer = SessionCheckpointer(str(tmp_path / "ck.sqlite"), idle_seconds=0)
+    say(graph(checkpointer), "один")
+
+    assert checkpointer.cached_threads() == 0
+    assert checkpointer.evictions > 0
+
+
+def test_a_fork_replaces_the_abandoned_messages(tmp_path):
+    checkpointer = SessionCheckpointer(str(tmp_path / "ck.sqlite"))
+    app = graph(checkpointer)
+    say(app, "один")
+    first = app.get_state(CONFIG).config
+    say(app, "два")
+
+    # resume from the end of the first turn and answer differently
+    result = say(app, "три", first)
+
+    assert [m.content for m in result["messages"]][-2:] == [
+        "три",
+        "Вы сказали: три",
+    ]
+    assert stored(checkpointer) == [
+        "один",
+        "Вы сказали: один",
+        "три",
+        "Вы сказали: три",
+    ]
+    checkpointer.evict("s1")
+    assert len(app.get_state(CONFIG).values["messages"]) == 4
@@ -0,0 +1,77 @@
+from langchain_core.messages import AIMessage, HumanMessage
+from langchain_core.runnables import RunnableLambda
+
+from src.agents.feedback import FeedbackGenerator
+from src.ledger import update_ledger
+from src.message_store import MessageView
+from src.metrics import track
+from src.state import initial_state
+
+ANSWER = "Декораторы оборачивают функцию и добавляют поведение без её изменения."
+
+
+def interview(turns: int, ledger_turns: int) -> dict:
+    state = initial_state()
+    messages = []
+    for _ in range(turns):
+        messages += [AIMessage("Расскажите про декораторы."), HumanMessage(ANSWER)]
+    state["messages"] = MessageView(messages)
+    state["turn_count"] = turns
+    ledger = None
+    for turn in range(1, ledger_turns + 1):
+        ledger = update_ledger(ledger, turn, ANSWER, {"is_correct": True}, {})
+    state["evidence_ledger"] = ledger or {}
+    return state
+
+
+def plan_mode(state: dict) -> str | None:
+    generator = FeedbackGenerator(mode="auto", map_reduce_tokens=200)
+    plan = generator._plan(state)
+    return plan and plan[0]
+
+
+def test_auto_uses_a_ledger_that_covers_every_turn():
+    assert plan_mode(interview(turns=12, ledger_turns=12)) == "ledger"
+
+
+def test_auto_reads_a_long_transcript_the_ledger_missed():
+    assert plan_mode(interview(turns=12, ledger_turns=3)) == "map_reduce"
+    assert plan_mode(interview(turns=12, ledger_turns=0)) == "map_reduce"
+
+
+def test_auto_uses_one_call_for_a_short_transcript():
+    assert plan_mode(interview(turns=1, ledger_turns=0)) == "single"
+
+
+def test_nothing_to_rate_before_the_first_answer():
+    assert plan_mode(initial_state()) is None
+
+
+def failing_map(_):
+    raise RuntimeError("map call failed")
+
+
+def test_map_reduce_falls_back_when_every_part_fails():
+    generator = FeedbackGenerator(mode="map_reduce", chunk_tokens=50)
+    generator.map_chain = RunnableLambda(failing_map)
+
+    with track("feedback") as metrics:
+        report = generator.generate(interview(turns=6, ledger_turns=0))
+
+    assert report["feedback_report"]["error"] == "map call failed"
+    assert metrics.fallbacks == 1
+
+
+def test_map_reduce_reports_the_parts_it_lost():
+    generator = FeedbackGenerator(mode="map_reduce")
+    part = {
+        "confirmed_skills": [{"skill_name": "Декораторы", "evidence": ANSWER}],
+        "knowledge_gaps": [],
+    }
+
+    with track("feedback") as metrics:
+        inputs = generator._reduce_inputs("Алекс", [RuntimeError("timeout"), part])
+
+    assert "Декораторы" in inputs["evidence"]
+    assert metrics.partial_failures == 1
+    assert metrics.fallbacks == 0
@@ -0,0 +1,51 @@
+from langchain_core.messages import AIMessage, HumanMessage
+
+from src.ledger import empty_ledger, record_turn, update_ledger
+from src.message_store import MessageView
+
+# What TechnicalEvaluator / FusedAnalyzer / BehavioralAnalyst return when
+# their LLM call fails.
+TECH_FALLBACK = {"error": "timed out", "is_correct": False}
+BEHAV_FALLBACK = {"error": "timed out"}
+
+
+def test_fallback_analysis_is_not_evidence():
+    ledger = update_ledger(
+        None, 1, "Декоратор оборачивает функцию.", TECH_FALLBACK, BEHAV_FALLBACK
+    )
+
+    assert ledger["turns"] == 1
+    assert ledger["gaps"] == {}
+    assert ledger["confirmed_skills"] == {}
+    assert ledger["soft_skills"]["scored_turns"] == 0
+
+
+def test_wrong_answer_is_a_gap():
+    tech = {"is_correct": False, "topics_covered": ["Python"]}
+
+    ledger = update_ledger(None, 1, "Список неизменяемый.", tech, {})
+
+    assert ledger["gaps"]["Python"]["quote"] == "Список неизменяемый."
+
+
+def test_record_turn_uses_the_latest_answer():
+    state = {
+        "messages": MessageView(
+            [
+                AIMessage("Расскажите о себе."),
+                HumanMessage("Я Алекс."),
+                AIMessage("Что такое GIL?"),
+                HumanMessage("Глобальная блокировка интерпретатора."),
+                AIMessage("Верно."),
+            ]
+        ),
+        "turn_count": 2,
+        "evidence_ledger": empty_ledger(),
+        "tech_analysis": {"is_correct": True, "topics_covered": ["Python"]},
+        "behavioral_analysis": {},
+    }
+
+    ledger = record_turn(state)["evidence_ledger"]
+
+    skill = ledger["confirmed_skills"]["Python"]
+    assert skill == {"evidence": "Глобальная блокировка интерпретатора.", "turns": [2]}
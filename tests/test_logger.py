@@ -0,0 +1,28 @@
+import json
+
+from src.logger import LogWriter, SessionLogger, read_event_log
+
+
+def test_a_closed_log_reopens_where_it_left_off(tmp_path):
+    logger = SessionLogger(str(tmp_path / "s1.json"), writer=LogWriter())
+    logger.start_session("Алекс")
+    logger.log_turn(1, "Что такое GIL?", "Привет", "")
+    logger.close()
+
+    logger.log_turn(2, "Расскажите про asyncio.", "Глобальная блокировка", "")
+    logger.close()
+
+    session = read_event_log(logger.events_path)
+    assert session.participant_name == "Алекс"
+    assert [turn.turn_id for turn in session.turns] == [1, 2]
+
+
+def test_close_writes_out_the_pending_export(tmp_path):
+    logger = SessionLogger(str(tmp_path / "s1.json"), writer=LogWriter())
+    logger.start_session("Алекс")
+    logger.log_feedback('{"grade": "Junior"}')
+    logger.save_log()
+    logger.close()
+
+    exported = json.loads((tmp_path / "s1.json").read_text(encoding="utf-8"))
+    assert exported["final_feedback"] == '{"grade": "Junior"}'
@@ -0,0 +1,60 @@
+from langchain_core.messages import AIMessage, HumanMessage
+
+from src.message_store import MessageView, append_messages
+
+
+def conversation() -> MessageView:
+    return MessageView(
+        [HumanMessage("Привет", id="h1"), AIMessage("Здравствуйте", id="a1")]
+    )
+
+
+def test_extending_the_newest_view_appends_in_place():
+    view = conversation()
+
+    longer = append_messages(view, [HumanMessage("Расскажите о себе", id="h2")])
+
+    assert longer.store is view.store
+    assert len(view) == 2
+    assert [m.id for m in longer] == ["h1", "a1", "h2"]
+
+
+def test_extending_an_older_view_forks_it():
+    view = conversation()
+    newer = view + [HumanMessage("Первый ответ", id="h2")]
+
+    retried = view + [HumanMessage("Второй ответ", id="h3")]
+
+    assert retried.store is not newer.store
+    assert [m.content for m in newer][-1] == "Первый ответ"
+    assert [m.content for m in retried][-1] == "Второй ответ"
+    # the forked store shares the records themselves
+    assert retried[0] is newer[0]
+
+
+def test_a_fork_never_appends_to_the_original_store():
+    view = conversation()
+
+    branch = append_messages(view.fork(), [AIMessage("Ветка", id="a2")])
+
+    assert len(view.store.records) == 2
+    assert branch.store is not view.store
+    assert "a2" in branch and "a2" not in view
+
+
+def test_reducer_takes_a_longer_view_of_the_same_store():
+    view = conversation()
+    longer = view + [HumanMessage("Дальше", id="h2")]
+
+    assert append_messages(view, longer) is longer
+    assert append_messages([], longer) is longer
+
+
+def test_repeated_ids_get_fresh_ones():
+    view = conversation()
+
+    longer = append_messages(view, AIMessage("Здравствуйте", id="a1"))
+
+    assert len(longer) == 3
+    assert longer[2].id != "a1"
+    assert longer.store.get("a1") is longer[1]
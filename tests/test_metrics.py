@@ -0,0 +1,49 @@
+import asyncio
+from typing import Any
+
+from langchain_core.messages import HumanMessage
+
+from src.llm.fake import FakeChatModel
+from src.llm.resilience import ResilientChatModel
+from src.llm.wrappers import DelegatingChatModel
+from src.metrics import track
+
+
+class RetryingChatModel(FakeChatModel):
+    """A backend whose client retried every call once, as ChatMistralAI reports it."""
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs: Any):
+        if run_manager:
+            run_manager.on_retry(None)
+        return super()._generate(messages, stop=stop, **kwargs)
+
+    async def _agenerate(self, messages, stop=None, run_manager=None, **kwargs: Any):
+        if run_manager:
+            await run_manager.on_retry(None)
+        return await super()._agenerate(messages, stop=stop, **kwargs)
+
+
+def test_backend_client_retries_reach_the_node_metrics():
+    model = DelegatingChatModel(inner=RetryingChatModel(), agent="technical")
+
+    with track("technical") as metrics:
+        model.invoke([HumanMessage("Что такое GIL?")])
+
+    assert metrics.retries == 1
+
+
+def test_retries_are_counted_below_the_resilience_layer():
+    model = DelegatingChatModel(
+        inner=ResilientChatModel(inner=RetryingChatModel(), agent="technical"),
+        agent="technical",
+    )
+
+    async def call():
+        with track("technical") as metrics:
+            await model.ainvoke([HumanMessage("Что такое GIL?")])
+        return metrics
+
+    assert asyncio.run(call()).retries == 1
+    with track("technical") as metrics:
+        model.invoke([HumanMessage("Что такое GIL?")])
+    assert metrics.retries == 1
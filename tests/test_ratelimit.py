@@ -0,0 +1,52 @@
+import threading
+import time
+
+from src.llm.ratelimit import RateLimiter, TokenBucket
+
+
+def wait_until(condition, timeout: float = 2.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.01)
+
+
+def test_serves_waiting_calls_by_priority_then_arrival():
+    limiter = RateLimiter(max_concurrency=1)
+    order = []
+
+    def call(priority: str, name: str):
+        with limiter.slot(priority, 10):
+            order.append(name)
+
+    arrivals = [
+        ("background", "report"),
+        ("analysis", "strategy"),
+        ("background", "speculation"),
+        ("interactive", "reply"),
+    ]
+    threads = []
+    with limiter.slot("analysis", 10):
+        for priority, name in arrivals:
+            thread = threading.Thread(target=call, args=(priority, name))
+            thread.start()
+            threads.append(thread)
+            wait_until(lambda: limiter.waiting == len(threads))
+    for thread in threads:
+        thread.join(2)
+
+    assert order == ["reply", "strategy", "report", "speculation"]
+    stats = limiter.stats()
+    assert stats["background"]["granted"] == 2
+    assert stats["active"] == stats["waiting"] == 0
+
+
+def test_lower_classes_leave_a_reserve_in_the_bucket():
+    bucket = TokenBucket(rpm=10)
+    for _ in range(7):
+        assert bucket.take(0) == 0.0
+
+    # 3 requests left: below the background reserve, above analysis'
+    assert bucket.take(0, reserve=0.3) > 0
+    assert bucket.take(0, reserve=0.1) == 0.0
+    assert bucket.take(0) == 0.0
@@ -0,0 +1,154 @@
+import asyncio
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+from langchain_core.messages import HumanMessage
+
+from src.llm import ratelimit, registry, resilience
+from src.llm.fake import FakeBackendError, FakeChatModel
+from src.llm.ratelimit import RateLimiter
+from src.llm.resilience import (
+    CallPolicy,
+    CircuitBreaker,
+    CircuitOpen,
+    LLMTimeout,
+    ResilientChatModel,
+    reset_resilience,
+    resilience_stats,
+)
+
+
+def faults(*draws: float) -> SimpleNamespace:
+    """Stands in for FakeChatModel's fault rng, drawing `draws` in order."""
+    return SimpleNamespace(random=iter(draws).__next__)
+
+
+def test_breaker_opens_and_lets_one_trial_call_through():
+    breaker = CircuitBreaker("fake", failures=2, reset_seconds=0.1)
+    breaker.failure()
+    breaker.admit()
+    breaker.failure()
+
+    assert breaker.state == "open"
+    with pytest.raises(CircuitOpen):
+        breaker.admit()
+
+    time.sleep(0.15)
+    breaker.admit()
+    assert breaker.state == "half_open"
+    with pytest.raises(CircuitOpen):
+        breaker.admit()  # only one trial at a time
+    breaker.failure()
+    assert breaker.state == "open"
+
+    time.sleep(0.15)
+    breaker.admit()
+    breaker.success()
+    assert breaker.stats() == {"state": "closed", "trips": 2, "rejected": 2}
+
+
+def test_failing_backend_trips_the_breaker(monkeypatch):
+    monkeypatch.setenv("LLM_BREAKER_FAILURES", "2")
+    monkeypatch.setenv("LLM_BREAKER_RESET_SECONDS", "0.2")
+    reset_resilience()
+    backend = FakeChatModel(error_rate=1.0)
+    model = ResilientChatModel(inner=backend, agent="technical", backend="flaky")
+
+    for _ in range(2):
+        with pytest.raises(FakeBackendError):
+            model.invoke([HumanMessage("Вопрос")])
+    with pytest.raises(CircuitOpen):
+        model.invoke([HumanMessage("Вопрос")])
+
+    time.sleep(0.25)
+    backend.error_rate = 0.0
+    assert model.invoke([HumanMessage("Вопрос")]).content
+    assert resilience_stats()["breakers"]["flaky"]["state"] == "closed"
+    reset_resilience()
+
+
+def test_hedge_answers_for_a_stalled_call(monkeypatch):
+    monkeypatch.setenv("LLM_TIMEOUT", "3")
+    monkeypatch.setenv("LLM_HEDGE_RATIO", "1")
+    monkeypatch.setattr(CallPolicy, "min_samples", 3)
+    reset_resilience()
+    backend = FakeChatModel(latency=0.05, stall_rate=0.5, stall_seconds=2.0)
+    # Three quick calls to learn the p95, then one that stalls and its hedge.
+    backend._faults = faults(0.9, 0.9, 0.9, 0.0, 0.9)
+    model = ResilientChatModel(inner=backend, agent="technical", backend="fake")
+
+    async def calls():
+        for i in range(3):
+            await model.ainvoke([HumanMessage(f"Вопрос {i}")])
+        started = time.perf_counter()
+        reply = await model.ainvoke([HumanMessage("Последний вопрос")])
+        return reply, time.perf_counter() - started
+
+    reply, seconds = asyncio.run(calls())
+
+    assert reply.content
+    assert seconds < 1.0
+    stats = resilience_stats()["agents"]["fake:technical"]
+    assert (stats["hedges"], stats["hedge_wins"]) == (1, 1)
+    reset_resilience()
+
+
+def test_time_queued_at_the_limiter_is_not_part_of_the_budget(monkeypatch):
+    monkeypatch.setenv("LLM_TIMEOUT", "0.5")
+    monkeypatch.setenv("LLM_HEDGE_RATIO", "0")
+    monkeypatch.setitem(registry._active, "options", {"latency": 0.3})
+    monkeypatch.setattr(ratelimit, "_shared", RateLimiter(max_concurrency=1))
+    reset_resilience()
+    model = registry.get_chat_model("technical", "codestral-latest", 0.0)
+
+    async def both():
+        # The second call waits ~0.3s for the slot, then runs ~0.3s.
+        return await asyncio.gather(
+            *(model.ainvoke([HumanMessage(f"Вопрос {i}")]) for i in range(2))
+        )
+
+    replies = asyncio.run(both())
+
+    stats = resilience_stats()
+    assert len(replies) == 2
+    assert stats["agents"]["fake:technical"]["timeouts"] == 0
+    assert stats["breakers"]["fake"]["state"] == "closed"
+    reset_resilience()
+
+
+def test_sync_calls_in_flight_are_capped(monkeypatch):
+    monkeypatch.setenv("LLM_TIMEOUT", "0.2")
+    monkeypatch.setenv("LLM_HEDGE_RATIO", "0")
+    monkeypatch.setenv("LLM_BREAKER_FAILURES", "2")
+    monkeypatch.setattr(resilience, "_sync_calls", threading.BoundedSemaphore(1))
+    reset_resilience()
+    # A backend that stalls well past the budget and has no timeout of its own.
+    model = ResilientChatModel(
+        inner=FakeChatModel(latency=2.0), agent="technical", backend="stalled"
+    )
+
+    started = time.perf_counter()
+    for i in range(2):
+        with pytest.raises(LLMTimeout):
+            model.invoke([HumanMessage(f"Вопрос {i}")])
+
+    # The second call didn't queue behind the abandoned first one, and not
+    # finding a thread isn't held against the backend.
+    assert time.perf_counter() - started < 1.0
+    stats = resilience_stats()
+    assert stats["agents"]["stalled:technical"]["timeouts"] == 2
+    assert stats["breakers"]["stalled"]["state"] == "closed"
+    reset_resilience()
+
+
+def test_backend_client_gets_the_budget_as_its_timeout(monkeypatch):
+    monkeypatch.setenv("LLM_TIMEOUTS", "technical=3")
+    reset_resilience()
+    model = registry.get_chat_model("technical", "codestral-latest", 0.0)
+
+    backend = model.inner.inner
+    assert isinstance(backend, FakeChatModel)
+    assert backend.timeout == 3.0
+    reset_resilience()
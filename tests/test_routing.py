@@ -0,0 +1,21 @@
+from src.llm.routing import STAGES, Router
+
+
+def test_every_agent_stays_on_the_default_model_without_routes():
+    router = Router(default="codestral-latest")
+    for agent in ("interviewer", "technical", "behavioral", "strategy"):
+        for stage_name in (None, *STAGES):
+            assert router.model_for(agent, stage_name) == "codestral-latest"
+
+
+def test_configured_routes_override_the_default_per_agent_and_stage():
+    router = Router(
+        default="codestral-latest",
+        routes={
+            "behavioral": "mistral-small-latest",
+            "interviewer@closing": "mistral-small-latest",
+        },
+    )
+    assert router.model_for("behavioral") == "mistral-small-latest"
+    assert router.model_for("interviewer", "closing") == "mistral-small-latest"
+    assert router.model_for("interviewer", "main") == "codestral-latest"
@@ -0,0 +1,99 @@
+import asyncio
+import time
+
+from langchain_core.messages import AIMessage, HumanMessage
+
+from src.speculation import Speculator
+from src.state import initial_state
+
+CORRECT = {"is_correct": True}
+
+
+def next_turn(
+    state: dict,
+    tech: dict,
+    behav: dict,
+    next_step: str = "ask_question",
+    difficulty_change: int = 1,
+) -> dict:
+    return {
+        **state,
+        "turn_count": state["turn_count"] + 1,
+        "tech_analysis": tech,
+        "behavioral_analysis": behav,
+        "strategy_next_step": next_step,
+        "difficulty_level": state["difficulty_level"] + difficulty_change,
+    }
+
+
+def speculator(delay: float) -> Speculator:
+    async def compose(state):
+        await asyncio.sleep(delay)
+        return {"messages": [AIMessage("Хорошо, усложним вопрос.")]}
+
+    return Speculator(compose)
+
+
+def test_serves_a_finished_reply():
+    spec = speculator(0)
+    state = initial_state()
+    spec.start(state)
+    time.sleep(0.1)
+
+    result = spec.take(next_turn(state, CORRECT, {}))
+
+    assert result["messages"][0].content == "Хорошо, усложним вопрос."
+    assert spec.stats()["hits"] == 1
+
+
+def test_never_waits_for_an_unfinished_reply():
+    spec = speculator(5)
+    state = initial_state()
+    spec.start(state)
+
+    started = time.perf_counter()
+    result = spec.take(next_turn(state, CORRECT, {}))
+
+    assert result is None
+    assert time.perf_counter() - started < 1
+    assert spec.stats()["cancelled"] == 1
+    spec.cancel()
+
+
+def test_candidate_question_is_not_served():
+    spec = speculator(0)
+    state = initial_state()
+    spec.start(state)
+    time.sleep(0.1)
+
+    turn = next_turn(state, CORRECT, {"candidate_question": True})
+
+    assert spec.take(turn) is None
+    spec.cancel()
+
+
+def test_reply_is_not_served_when_the_strategy_decided_otherwise():
+    spec = speculator(0)
+    state = initial_state()
+    spec.start(state)
+    time.sleep(0.1)
+
+    # A correct answer, but the director wrapped up instead of going harder.
+    turn = next_turn(state, CORRECT, {}, next_step="wrap_up", difficulty_change=0)
+
+    assert spec.take(turn) is None
+    assert spec.stats()["misses"] == 1
+    spec.cancel()
+
+
+def test_branches_fork_the_message_history():
+    spec = speculator(0)
+    state = initial_state()
+    state["messages"] = state["messages"] + [HumanMessage("Привет, я Алекс")]
+    store = state["messages"].store
+    spec.start(state)
+    time.sleep(0.1)
+
+    assert len(store.records) == 1
+    assert len(state["messages"] + [AIMessage("Здравствуйте!")]) == 2
+    spec.cancel()
@@ -0,0 +1,67 @@
+import pytest
+
+from src.agents.strategy import OPEN_TOPICS, decide_by_rules
+
+GOOD_TECH = {"is_correct": True, "confidence_score": 0.9}
+GOOD_BEHAV = {"confidence_score": 8}
+WRONG_TECH = {"is_correct": False, "confidence_score": 0.2}
+
+
+def state(tech: dict, behav: dict, **overrides) -> dict:
+    return {
+        "current_topic": "Python GIL",
+        "turn_count": 3,
+        "difficulty_level": 3,
+        "tech_analysis": tech,
+        "behavioral_analysis": behav,
+        **overrides,
+    }
+
+
+def next_step(decision: dict | None) -> str | None:
+    return decision and decision["next_step"]
+
+
+def test_rules_apply_in_priority_order():
+    tech = {**GOOD_TECH, "hallucination_detected": True}
+    behav = {**GOOD_BEHAV, "candidate_question": True, "off_topic_attempt": True}
+
+    def decide(**overrides):
+        return next_step(decide_by_rules(state(tech, behav, **overrides)))
+
+    assert decide(turn_count=11) == "answer_candidate_question"
+    behav["candidate_question"] = False
+    assert decide(turn_count=11) == "dig_deeper"
+    tech["hallucination_detected"] = False
+    assert decide(turn_count=11) == "ask_question"
+    behav["off_topic_attempt"] = False
+    assert decide(turn_count=11) == "wrap_up"
+    assert decide() == "ask_question"
+
+
+def test_adjusts_difficulty():
+    harder = decide_by_rules(state(GOOD_TECH, GOOD_BEHAV))
+    easier = decide_by_rules(state(WRONG_TECH, GOOD_BEHAV))
+
+    assert (harder["next_step"], harder["difficulty_change"]) == ("ask_question", 1)
+    assert (easier["next_step"], easier["difficulty_change"]) == ("hint", -1)
+
+
+def test_leaves_the_edges_of_the_scale_to_the_llm():
+    assert decide_by_rules(state(GOOD_TECH, GOOD_BEHAV, difficulty_level=5)) is None
+    assert decide_by_rules(state(WRONG_TECH, GOOD_BEHAV, difficulty_level=1)) is None
+
+
+@pytest.mark.parametrize("topic", sorted(OPEN_TOPICS))
+def test_leaves_open_topics_to_the_llm(topic):
+    behav = {**GOOD_BEHAV, "candidate_question": True}
+
+    assert decide_by_rules(state(GOOD_TECH, behav, current_topic=topic)) is None
+
+
+def test_leaves_missing_or_failed_analysis_to_the_llm():
+    assert decide_by_rules(state({}, GOOD_BEHAV)) is None
+    assert decide_by_rules(state(GOOD_TECH, {"error": "timeout"})) is None
+    # neither confident nor wrong
+    middling = {"is_correct": True, "confidence_score": 0.5}
+    assert decide_by_rules(state(middling, {"confidence_score": 5})) is None